@@ -0,0 +1,117 @@
+import os
+
+import pygame
+
+import assets.balatro_cards_data as sheets
+from assets.balatro_cards_data import CARD_HEI, CARD_WID
+from enums import Rank, Suit
+
+# Every card face the GUI draws, framed and scaled to display size once and
+# packed into one surface. Row n holds the fronts of Suit(n) by rank, and the
+# last row holds the card back and the joker faces. Cards are handed shared
+# subsurfaces of it, so making or flipping a card never draws or allocates.
+
+ATLAS_PATH = "assets/card_atlas.png"
+ATLAS_SIZE = (CARD_WID * len(Rank), CARD_HEI * (len(Suit) + 1))
+EXTRAS_ROW = len(Suit)
+BACK_COL, JOKER_FRONT_COL, JOKER_BACK_COL = 0, 1, 2
+SOURCES = ("assets/balatro_cards.png", "assets/balatro_decks.png", __file__)
+
+_atlas: pygame.surface.Surface | None = None
+_regions: dict[tuple[int, int], pygame.surface.Surface] = {}
+
+
+def _framed(face: pygame.surface.Surface) -> pygame.surface.Surface:
+    """Draws face on a blank card with rounded, bordered corners"""
+    card = pygame.Surface((CARD_WID, CARD_HEI), pygame.SRCALPHA)
+    card_rect = card.get_rect()
+    pygame.draw.rect(card, pygame.Color("grey90"), card_rect, border_radius=7)
+    pygame.draw.rect(card, pygame.Color("grey70"), card_rect, width=1, border_radius=7)
+    card.blit(face, (0, 0))
+    return card
+
+
+def _converted(surface: pygame.surface.Surface) -> pygame.surface.Surface:
+    """Converts to the display's pixel format, if there is a display yet"""
+    if pygame.display.get_surface() is None:
+        return surface
+    try:
+        return surface.convert_alpha()
+    except pygame.error:  # OpenGL windows have no pixel format to convert to
+        return surface
+
+
+def build_atlas() -> pygame.surface.Surface:
+    """Draws every card face into a new atlas"""
+    atlas = pygame.Surface(ATLAS_SIZE, pygame.SRCALPHA)
+    for suit in Suit:
+        for rank in Rank:
+            front = sheets.get_cardf_sprite(suit, rank)
+            atlas.blit(_framed(front), (rank.value * CARD_WID, suit.value * CARD_HEI))
+    # Framing clips the back to the card's size, like GUICardBase always did
+    joker_front, joker_back = sheets.get_joker_sprites()
+    extras = {
+        BACK_COL: sheets.get_cardb_sprite(),
+        JOKER_FRONT_COL: joker_front,
+        JOKER_BACK_COL: joker_back,
+    }
+    for col, face in extras.items():
+        atlas.blit(_framed(face), (col * CARD_WID, EXTRAS_ROW * CARD_HEI))
+    return _converted(atlas)
+
+
+def save_atlas(path: str = ATLAS_PATH) -> None:
+    """Writes the atlas to disk, building it first if needed"""
+    pygame.image.save(get_atlas(), path)
+
+
+def load_atlas(path: str = ATLAS_PATH) -> bool:
+    """
+    Uses an atlas written by save_atlas, unless it's missing, the wrong size
+    or older than the sprite sheets or this module
+
+    Returns (bool): True if the atlas was loaded
+    """
+    global _atlas
+    try:
+        saved_time = os.path.getmtime(path)
+        if any(os.path.getmtime(source) > saved_time for source in SOURCES):
+            return False
+        atlas = pygame.image.load(path)
+    except (OSError, pygame.error):
+        return False
+    if atlas.get_size() != ATLAS_SIZE:
+        return False
+    _atlas = _converted(atlas)
+    _regions.clear()
+    return True
+
+
+def get_atlas() -> pygame.surface.Surface:
+    """Gets the atlas, building it the first time it's needed"""
+    global _atlas
+    if _atlas is None:
+        _atlas = build_atlas()
+    return _atlas
+
+
+def _region(row: int, col: int) -> pygame.surface.Surface:
+    """Gets the shared subsurface of one card in the atlas"""
+    region = _regions.get((row, col))
+    if region is None:
+        rect = pygame.Rect((col * CARD_WID, row * CARD_HEI), (CARD_WID, CARD_HEI))
+        region = _regions[(row, col)] = get_atlas().subsurface(rect)
+    return region
+
+
+def card_front(suit: Suit, rank: Rank) -> pygame.surface.Surface:
+    return _region(suit.value, rank.value)
+
+
+def card_back() -> pygame.surface.Surface:
+    return _region(EXTRAS_ROW, BACK_COL)
+
+
+def joker_sprites() -> tuple[pygame.surface.Surface, pygame.surface.Surface]:
+    """Gets the front and back of a joker"""
+    return _region(EXTRAS_ROW, JOKER_FRONT_COL), _region(EXTRAS_ROW, JOKER_BACK_COL)
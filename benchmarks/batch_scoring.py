@@ -0,0 +1,72 @@
+"""
+Benchmarks batch_scoring.score_batch against scoring the same selections one
+at a time through BlindLogic.play_hand, and checks that both agree on hand
+type and score for every selection
+
+Usage (from the repo root):
+    python -m benchmarks.batch_scoring [--hands 200] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+
+from state_logic.batch_scoring import hand_subsets, score_batch
+from state_logic.blind_logic import BlindLogic
+from state_logic.carddata import CardData
+from state_logic.game_manager import GameManagerLogic, generate_deck
+from state_logic.jokerdata import JokerData
+
+
+def scalar_score(
+    manager: GameManagerLogic, jokers: list[JokerData], cards: list[CardData]
+) -> tuple[int, int]:
+    """Plays cards in a throwaway blind. Returns (hand type rank, score)"""
+    manager.blinds = [2**62]  # Unbeatable, so the hand never ends the blind
+    manager.held_jokers = tuple(jokers)
+    blind = BlindLogic(manager, verbose=False)
+    blind.hand = [card.deal_copy(idx) for idx, card in enumerate(cards)]
+    for card in blind.hand:
+        blind.select_card(card)
+    _, hand_type, _ = blind.play_hand()
+    return hand_type.rank, blind.score
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch scoring benchmark")
+    parser.add_argument("--hands", type=int, default=200, help="8 card hands to try")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    manager = GameManagerLogic(rng)
+    deck = generate_deck()
+    batch_time = scalar_time = 0.0
+    selections = 0
+    for _ in range(args.hands):
+        hand = rng.sample(deck, 8)
+        jokers = rng.sample(manager.all_jokers, rng.randint(0, 5))
+        start = time.perf_counter()
+        ids, mask, picks = hand_subsets(hand)
+        scores = score_batch(ids, mask, manager.levels, jokers)
+        batch_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for row, pick in enumerate(picks):
+            cards = [hand[idx] for idx in pick]
+            hand_type, score = scalar_score(manager, jokers, cards)
+            if (hand_type, score) != (scores.hand_types[row], scores.score[row]):
+                raise AssertionError(
+                    f"Mismatch for {cards} with {jokers}: scalar {hand_type}, "
+                    f"{score}, batch {scores.hand_types[row]}, {scores.score[row]}"
+                )
+        scalar_time += time.perf_counter() - start
+        selections += len(picks)
+
+    print(f"{selections} selections agree")
+    print(f"  batch:  {selections / batch_time:10.0f} selections/sec")
+    print(f"  scalar: {selections / scalar_time:10.0f} selections/sec (incl. blind setup)")
+
+
+if __name__ == "__main__":
+    main()
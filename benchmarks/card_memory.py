@@ -0,0 +1,64 @@
+"""
+Memory benchmark for live cards. Builds 1M dealt CardData copies and reports
+how much memory they hold, next to the same fields stored in a per-instance
+__dict__ (how CardData was laid out before it was slotted)
+
+Usage (from the repo root):
+    python -m benchmarks.card_memory [--cards 1000000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from state_logic.carddata import CardData
+from state_logic.game_manager import generate_deck
+
+
+class DictCard:
+    """CardData's fields without __slots__, for comparison"""
+
+    def __init__(self, card: CardData):
+        self.edition = card.edition
+        self.face = card.face
+        self.id = card.id
+        self.uid = card.uid
+        self.chips = card.chips
+        self.selected = False
+        self.enhances = card.enhances
+        self.seal = card.seal
+        self.deck_idx = None
+
+
+def measure(label: str, num_cards: int, make) -> None:
+    """Prints bytes per card and build time for num_cards cards from make"""
+    deck = generate_deck()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    cards = [make(deck[idx % len(deck)], idx % len(deck)) for idx in range(num_cards)]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    list_bytes = num_cards * 8  # The list's own pointers
+    per_card = (current - list_bytes) / num_cards
+    print(
+        f"{label:>10}: {(current - list_bytes) / 2**20:8.1f} MiB, "
+        f"{per_card:6.1f} B/card, built in {elapsed:.2f}s"
+    )
+    del cards
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Live card memory benchmark")
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{args.cards} live cards")
+    measure("slotted", args.cards, lambda card, idx: card.deal_copy(idx))
+    measure("__dict__", args.cards, lambda card, idx: DictCard(card))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Counts the surfaces the GUI makes each frame, to check that steady frames
+(like dragging a card around) don't allocate. Counts surfaces made with
+pygame.Surface, pygame.transform and text rasterized by CachedFont. Run as a
+script, it drags a card across a headless hand and prints what it counted
+
+Usage (from the repo root):
+    python -m benchmarks.frame_allocs [--frames 240]
+"""
+
+import argparse
+import functools
+import os
+
+import pygame
+
+from states.gui_elements.fonts import CachedFont
+
+# pygame.transform functions that return a new surface
+TRANSFORMS = (
+    "flip",
+    "scale",
+    "scale_by",
+    "smoothscale",
+    "smoothscale_by",
+    "rotate",
+    "rotozoom",
+)
+
+
+class FrameAllocations:
+    """
+    Counts surface allocations per frame while active. Swaps pygame.Surface
+    and the pygame.transform functions for counting versions, so only code
+    that looks them up at call time (all of ours) is counted. Surfaces pygame
+    makes internally, like Surface.copy, aren't seen
+
+    Usage:
+        with FrameAllocations() as allocs:
+            ...  # call allocs.end_frame() after every frame
+        allocs.per_frame  # surfaces made in each frame
+    """
+
+    per_frame: list[int]
+    count: int  # Surfaces made in the current frame
+    _rasterized: int  # CachedFont.rasterized at the start of the frame
+    _originals: dict[str, object]
+
+    def __init__(self):
+        self.per_frame = []
+        self.count = 0
+        self._rasterized = 0
+        self._originals = {}
+
+    def __enter__(self) -> "FrameAllocations":
+        original = pygame.Surface
+        counter = self
+
+        class CountedSurface(original):  # type: ignore[valid-type, misc]
+            def __init__(self, *args, **kwargs):
+                counter.count += 1
+                super().__init__(*args, **kwargs)
+
+        self._originals["Surface"] = original
+        pygame.Surface = pygame.surface.Surface = CountedSurface  # type: ignore[misc]
+        for name in TRANSFORMS:
+            func = getattr(pygame.transform, name, None)
+            if func is not None:
+                self._originals[name] = func
+                setattr(pygame.transform, name, self._counted(func))
+        self._rasterized = CachedFont.rasterized
+        return self
+
+    def __exit__(self, *exc) -> None:
+        original = self._originals.pop("Surface")
+        pygame.Surface = pygame.surface.Surface = original  # type: ignore[misc, assignment]
+        for name, func in self._originals.items():
+            setattr(pygame.transform, name, func)
+        self._originals.clear()
+
+    def _counted(self, func):
+        @functools.wraps(func)
+        def counted(*args, **kwargs):
+            self.count += 1
+            return func(*args, **kwargs)
+
+        return counted
+
+    def end_frame(self) -> None:
+        """Records the current frame's count and starts the next frame"""
+        rasterized = CachedFont.rasterized
+        self.per_frame.append(self.count + rasterized - self._rasterized)
+        self.count = 0
+        self._rasterized = rasterized
+
+    @property
+    def total(self) -> int:
+        return sum(self.per_frame)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Surface allocations per frame")
+    parser.add_argument("--frames", type=int, default=240)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    from game import Game
+    from states.blind_gameplay import Gameplay
+    from states.blind_select import BlindSelect
+
+    game = Game(screen)
+
+    def frame() -> None:
+        game.event_loop()
+        game.update()
+        game.render()
+
+    BlindSelect(game)
+    frame()
+    game.state.enter_blind()  # type: ignore[attr-defined]
+    gameplay = game.state
+    assert isinstance(gameplay, Gameplay)
+
+    for _ in range(120):  # Let the deal settle, so only the drag is counted
+        frame()
+    card = gameplay.hand_ordered[0]
+    gameplay.held_card = card
+    card.toggle_mouse_follow()
+    frame()  # First frame of the drag may fill caches
+    with FrameAllocations() as allocs:
+        game.allocations = allocs
+        for idx in range(args.frames):
+            x = 300 + (idx * 7) % 700
+            pygame.mouse.set_pos((x, 500))
+            frame()
+        game.allocations = None
+    print(
+        f"{args.frames} drag frames: {allocs.total} surfaces made, "
+        f"{max(allocs.per_frame)} in the worst frame"
+    )
+
+
+if __name__ == "__main__":
+    main()
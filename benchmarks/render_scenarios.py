@@ -0,0 +1,339 @@
+"""
+Headless rendering benchmark. Boots Game on SDL's dummy video driver and plays
+scripted scenarios through the real update and render path, one after another
+in the same blind:
+
+    deal        entering a blind and dealing the hand
+    drag_sort   dragging cards across the hand and dropping them with
+                Gameplay.sort_by_custom
+    play_hand   playing hands through the whole ScoreAnimation
+    pause       pausing and unpausing
+
+Game time runs on a ManualClock, one update step per frame, and the deck is
+seeded, so every run plays the same frames. Each scenario reports frames,
+surfaces made per frame and how far resident memory grew over the scenario,
+which are the same every run, and frames/sec (update plus render, by wall
+time), the median of --repeats runs. Exits with 1 if frames changed or any of
+the rest is worse than the stored baseline by more than the threshold. Wall
+time depends on the machine and what else it's running, so fps only warns,
+unless --strict-fps is given
+
+Usage (from the repo root):
+    python -m benchmarks.render_scenarios [--threshold 0.25] [--dirty-rects]
+    python -m benchmarks.render_scenarios --save-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Iterator
+
+import pygame
+
+from benchmarks.frame_allocs import FrameAllocations
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "render_baseline.json")
+SCREEN_SIZE = (1280, 720)
+SETTLE_FRAMES = 600  # Most frames a scenario waits for animations to finish
+ALLOC_SLACK = 1.0  # Surfaces per frame allowed over the baseline, on top of threshold
+RSS_SLACK = 2.0  # MiB of memory growth allowed over the baseline, on top of threshold
+STATM_PATH = "/proc/self/statm"
+
+Scenario = Callable[["Harness"], Iterator[None]]
+
+
+def rss_mib() -> float | None:
+    """
+    Gets the process's resident memory right now, None if unknown. Read from
+    /proc, so only on Linux. The peak from getrusage never drops, so it can't
+    tell one scenario's memory from the ones before it
+    """
+    try:
+        with open(STATM_PATH) as file:
+            pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class Harness:
+    """
+    Runs the game a frame at a time on a manual clock. The dummy driver has no
+    pointer to move, so pygame.mouse.get_pos reads the harness's mouse instead
+    """
+
+    mouse: tuple[int, int]
+
+    def __init__(self, dirty_rendering: bool, seed: int):
+        from game import Game
+        from game_clock import ManualClock
+        from states.gui_elements.animation import animator
+
+        animator.reset()  # Left over from an earlier run's game otherwise
+        self.screen = pygame.display.set_mode(SCREEN_SIZE)
+        self.clock = ManualClock()
+        self.game = Game(
+            self.screen, dirty_rendering=dirty_rendering, clock=self.clock, seed=seed
+        )
+        self.mouse = (0, 0)
+        pygame.mouse.get_pos = lambda: self.mouse
+
+    def frame(self) -> None:
+        """Plays one update step and draws it"""
+        from game import FIXED_DT
+
+        self.clock.advance(FIXED_DT)
+        self.game.event_loop()
+        self.game.update()
+        self.game.render()
+
+    @property
+    def gameplay(self):
+        from states.blind_gameplay import Gameplay
+
+        for state in reversed(self.game.state_stack):
+            if isinstance(state, Gameplay):
+                return state
+        raise RuntimeError("Not in a blind")
+
+    def settle(self) -> Iterator[None]:
+        """Plays frames until nothing is animating"""
+        from states.gui_elements.animation import animator
+
+        for _ in range(SETTLE_FRAMES):
+            yield
+            if not animator.busy() and not self.game.state.busy():
+                return
+
+
+def deal(harness: Harness) -> Iterator[None]:
+    from states.blind_select import BlindSelect
+
+    BlindSelect(harness.game)
+    yield
+    harness.game.state.enter_blind()  # type: ignore[attr-defined]
+    yield from harness.settle()
+
+
+def drag_sort(harness: Harness) -> Iterator[None]:
+    gameplay = harness.gameplay
+    hand_rect = gameplay.hand.rect
+    for drag in range(4):
+        # Even drags take a card to the right end, odd ones to the left
+        card = gameplay.hand_ordered[drag]
+        gameplay.held_card = card
+        card.toggle_mouse_follow()
+        start = card.rect.centerx
+        end = hand_rect.right if drag % 2 == 0 else hand_rect.left
+        for step in range(60):
+            x = start + (end - start) * step // 59
+            harness.mouse = (x, hand_rect.centery)
+            yield
+        gameplay.sort_by_custom(end)
+        gameplay.hand.cards.move_to_top(card)
+        card.toggle_mouse_follow()
+        gameplay.held_card = None
+        yield from harness.settle()
+
+
+def play_hand(harness: Harness) -> Iterator[None]:
+    gameplay = harness.gameplay
+    for _ in range(2):
+        if gameplay.game_logic.done or harness.game.state is not gameplay:
+            return
+        for card in gameplay.hand_ordered[:5]:
+            gameplay.select_card(card)
+        gameplay.last_button_click_time = -float("inf")
+        gameplay.play_hand()
+        yield from harness.settle()
+
+
+def pause(harness: Harness) -> Iterator[None]:
+    escape = {"key": pygame.K_ESCAPE, "mod": 0, "unicode": "\x1b", "scancode": 41}
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, escape))
+    for _ in range(120):
+        yield
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, escape))
+    yield from harness.settle()
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "deal": deal,
+    "drag_sort": drag_sort,
+    "play_hand": play_hand,
+    "pause": pause,
+}
+
+
+def measure(harness: Harness, scenario: Scenario) -> dict[str, float | None]:
+    """
+    Plays a scenario, timing and counting allocations of every frame
+
+    Returns (dict[str, float | None]): frames, fps, mean and max surfaces
+        made per frame, and how many MiB resident memory peaked above where
+        it was when the scenario started
+    """
+    elapsed = 0.0
+    start_rss = peak_rss = rss_mib()
+    with FrameAllocations() as allocs:
+        harness.game.allocations = allocs
+        frames = scenario(harness)
+        while True:
+            start = time.perf_counter()
+            try:
+                next(frames)
+            except StopIteration:
+                break
+            harness.frame()
+            elapsed += time.perf_counter() - start
+            rss = rss_mib()  # Outside the timing, it's a file read
+            if rss is not None and peak_rss is not None:
+                peak_rss = max(peak_rss, rss)
+        harness.game.allocations = None
+    count = len(allocs.per_frame)
+    growth = None
+    if start_rss is not None and peak_rss is not None:
+        growth = peak_rss - start_rss
+    return {
+        "frames": count,
+        "fps": count / elapsed if elapsed else 0.0,
+        "allocs_mean": allocs.total / count if count else 0.0,
+        "allocs_max": max(allocs.per_frame, default=0),
+        "rss_growth_mib": growth,
+    }
+
+
+def run_scenarios(dirty_rendering: bool, seed: int) -> dict[str, dict[str, float | None]]:
+    """Plays every scenario in order in a new game, measuring each"""
+    harness = Harness(dirty_rendering, seed)
+    return {name: measure(harness, scenario) for name, scenario in SCENARIOS.items()}
+
+
+def fps_regressions(
+    name: str, result: dict[str, float | None], baseline: dict, threshold: float
+) -> list[str]:
+    """Gets if fps is lower than baseline by more than threshold"""
+    base_fps = baseline.get("fps")
+    fps = result["fps"]
+    if base_fps and fps is not None and fps < base_fps * (1 - threshold):
+        return [f"{name}: {fps:.0f} fps, baseline {base_fps:.0f}"]
+    return []
+
+
+def regressions(
+    name: str, result: dict[str, float | None], baseline: dict, threshold: float
+) -> list[str]:
+    """
+    Gets what got worse than baseline by more than threshold, of what's the
+    same every run, so not fps. A scenario that plays a different number of
+    frames isn't the one the baseline measured, so that fails too
+    """
+    failures = []
+    base_frames = baseline.get("frames")
+    if base_frames is not None and result["frames"] != base_frames:
+        failures.append(
+            f"{name}: {result['frames']} frames, baseline {base_frames}. "
+            "The scenario changed, save a new baseline"
+        )
+    for key in ("allocs_mean", "allocs_max"):
+        base = baseline.get(key)
+        value = result[key]
+        if base is not None and value is not None:
+            if value > base * (1 + threshold) + ALLOC_SLACK:
+                failures.append(f"{name}: {key} {value:.2f}, baseline {base:.2f}")
+    base_rss = baseline.get("rss_growth_mib")
+    rss = result["rss_growth_mib"]
+    if base_rss is not None and rss is not None:
+        if rss > base_rss * (1 + threshold) + RSS_SLACK:
+            failures.append(
+                f"{name}: RSS grew {rss:.1f} MiB, baseline {base_rss:.1f}"
+            )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless rendering benchmark")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store these results as the baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="fraction worse that fails"
+    )
+    parser.add_argument("--dirty-rects", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="runs to take the median fps of"
+    )
+    parser.add_argument(
+        "--strict-fps", action="store_true", help="fail on low fps instead of warning"
+    )
+    args = parser.parse_args()
+
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+
+    # Only fps changes between runs. Memory growth is taken from the first,
+    # since later runs reuse what it allocated
+    runs = [
+        run_scenarios(args.dirty_rects, args.seed) for _ in range(max(args.repeats, 1))
+    ]
+    results = runs[0]
+    for name, result in results.items():
+        frames = {run[name]["frames"] for run in runs}
+        if len(frames) > 1:
+            print(f"{name} played {frames} frames in different runs")
+            sys.exit(1)
+        result["fps"] = statistics.median(run[name]["fps"] or 0.0 for run in runs)
+        rss = result["rss_growth_mib"]
+        print(
+            f"{name:>10}: {result['frames']:4} frames, {result['fps']:7.0f} fps, "
+            f"{result['allocs_mean']:5.2f} surfaces/frame "
+            f"(max {result['allocs_max']}), "
+            f"RSS grew {'?' if rss is None else f'{rss:.1f}'} MiB"
+        )
+
+    mode = "dirty" if args.dirty_rects else "full"
+    if args.save_baseline:
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                stored = json.load(file)
+        stored[mode] = results
+        with open(args.baseline, "w") as file:
+            json.dump(stored, file, indent=2)
+            file.write("\n")
+        print(f"Saved {mode} baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline first")
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file).get(mode, {})
+    failures = []
+    slow = []
+    for name, result in results.items():
+        if name in baseline:
+            failures += regressions(name, result, baseline[name], args.threshold)
+            slow += fps_regressions(name, result, baseline[name], args.threshold)
+    if args.strict_fps:
+        failures += slow
+    elif slow:
+        print(f"Warning, fps lower than the baseline by more than {args.threshold:.0%}:")
+        for line in slow:
+            print(f"  {line}")
+    if failures:
+        print(f"Worse than the baseline by more than {args.threshold:.0%}:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"Within {args.threshold:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
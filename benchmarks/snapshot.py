@@ -0,0 +1,90 @@
+"""
+Benchmarks snapshot and restore of a profile with a blind in progress, against
+building a fresh GameManagerLogic, and checks that forks of a blind play out
+exactly like the blind they were forked from
+
+Usage (from the repo root):
+    python -m benchmarks.snapshot [--blinds 200] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+
+from enums import PlayAction
+from simulate import GreedyPolicy, play_blind
+from state_logic.blind_logic import BlindLogic
+from state_logic.game_manager import GameManagerLogic
+from state_logic.snapshot import fork, restore, snapshot
+
+
+def play_turn(blind: BlindLogic, policy: GreedyPolicy) -> None:
+    """Plays or discards once, the same way simulate.play_blind does"""
+    if not blind.hand:
+        blind.end_game(won=False)
+        return
+    action, cards = policy.choose(blind)
+    for card in cards:
+        blind.select_card(card)
+    if action is PlayAction.DISCARD:
+        blind.discard()
+    else:
+        blind.play_hand()
+        blind.discard(just_played=True)
+    if not blind.done and not blind.is_deck_empty:
+        blind.deal_to_hand()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Snapshot benchmark")
+    parser.add_argument("--blinds", type=int, default=200, help="blinds to fork")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    policy = GreedyPolicy()
+    save_time = load_time = new_time = 0.0
+    size = forks = 0
+    for _ in range(args.blinds):
+        start = time.perf_counter()
+        manager = GameManagerLogic(rng)
+        new_time += time.perf_counter() - start
+        manager.next_round()
+        blind = BlindLogic(manager, verbose=False)
+        blind.deal_to_hand()
+        play_turn(blind, policy)
+        if blind.done:
+            continue
+
+        start = time.perf_counter()
+        data = snapshot(manager, blind)
+        save_time += time.perf_counter() - start
+        start = time.perf_counter()
+        restore(data)
+        load_time += time.perf_counter() - start
+        size += len(data)
+        forks += 1
+
+        copy = fork(blind)
+        while not blind.done:
+            play_turn(blind, policy)
+            play_turn(copy, policy)
+        if (copy.score, copy.num_hands, copy.num_discards) != (
+            blind.score,
+            blind.num_hands,
+            blind.num_discards,
+        ):
+            raise AssertionError(
+                f"Fork ended with {copy.score} in {copy.num_hands} hands, "
+                f"original with {blind.score} in {blind.num_hands}"
+            )
+        play_blind(copy.manager, policy)  # The fork's profile plays on by itself
+
+    print(f"{forks} forks played out the same as their originals")
+    print(f"  snapshot:          {save_time / forks * 1e6:7.1f} us ({size / forks:.0f} bytes)")
+    print(f"  restore:           {load_time / forks * 1e6:7.1f} us")
+    print(f"  GameManagerLogic(): {new_time / args.blinds * 1e6:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
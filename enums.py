@@ -75,3 +75,9 @@ class AbilityWhole():
             self.category.extend(category)
         else:
             self.category.append(category)
+
+
+class PlayAction(Enum):
+    # What a simulator policy does with its selected cards
+    PLAY = 0
+    DISCARD = 1
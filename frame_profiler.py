@@ -0,0 +1,206 @@
+import csv
+import json
+import time
+from collections import deque
+from typing import IO
+
+import pygame
+
+from states.gui_elements.fonts import CachedFont, get_font
+
+# Where each frame's time goes. Game marks the end of every phase of a frame,
+# and the profiler keeps recent frames for an overlay of timings and can write
+# every frame to a CSV or JSONL trace. Text rasterized in a frame is counted
+# too, since text that's rendered again every frame is an easy regression
+
+PHASES = ("events", "wait", "update", "draw", "present")
+HISTORY = 600  # Frames kept for the overlay's stats
+OVERLAY_REFRESH = 0.5  # Seconds between overlay redraws
+OVERLAY_MARGIN = 10
+TRACE_FIELDS = ("frame", "time", "state", *PHASES, "work", "total", "text_renders")
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Gets the sample fraction of the way through samples once sorted"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class FrameProfiler:
+    """
+    Per phase frame timings. Phases are timed from the previous mark, so the
+    loop marks each phase as it ends, then ends the frame
+    """
+
+    frame: int  # Frames ended so far
+    start: float  # perf_counter when profiling started
+    last_mark: float
+    phase_times: dict[str, float]  # This frame's time per phase, so far
+    rasterized: int  # CachedFont.rasterized at the start of the frame
+    frames: deque[tuple[str, dict[str, float], float, int]]  # state, phases, total, text
+    show_overlay: bool
+    overlay: pygame.surface.Surface | None
+    overlay_time: float  # perf_counter when the overlay was last drawn
+    overlay_changed: bool  # True if overlay was redrawn and not shown yet
+    trace: IO[str] | None
+    trace_writer: "csv.DictWriter | None"
+
+    def __init__(self, trace_path: str | None = None):
+        """
+        Args:
+            trace_path (str, optional): file to write every frame to, as JSON
+                lines if it ends in .jsonl and CSV otherwise. Defaults to None
+        """
+        self.frame = 0
+        self.start = self.last_mark = time.perf_counter()
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.rasterized = CachedFont.rasterized
+        self.frames = deque(maxlen=HISTORY)
+        self.show_overlay = False
+        self.overlay = None
+        self.overlay_time = 0.0
+        self.overlay_changed = False
+        self.trace = None
+        self.trace_writer = None
+        if trace_path is not None:
+            self.trace = open(trace_path, "w", newline="")
+            if not trace_path.endswith(".jsonl"):
+                self.trace_writer = csv.DictWriter(self.trace, TRACE_FIELDS)
+                self.trace_writer.writeheader()
+
+    def mark(self, phase: str) -> None:
+        """Ends phase, timing it from the last mark"""
+        now = time.perf_counter()
+        self.phase_times[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self, state: str) -> None:
+        """
+        Records the frame's phases under state and starts the next frame
+
+        Args:
+            state (str): name of the state the frame ran in
+        """
+        now = time.perf_counter()
+        phases = self.phase_times
+        total = sum(phases.values())
+        rasterized = CachedFont.rasterized
+        text_renders = rasterized - self.rasterized
+        self.frames.append((state, phases, total, text_renders))
+        if self.trace is not None:
+            self._write(state, phases, total, text_renders, now)
+        self.frame += 1
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.rasterized = rasterized
+        self.last_mark = now
+
+    def _write(
+        self,
+        state: str,
+        phases: dict[str, float],
+        total: float,
+        text_renders: int,
+        now: float,
+    ) -> None:
+        """Writes one frame to the trace, times in milliseconds"""
+        assert self.trace is not None
+        row: dict[str, str | int | float] = {
+            "frame": self.frame,
+            "time": round(now - self.start, 6),
+            "state": state,
+        }
+        for phase, seconds in phases.items():
+            row[phase] = round(seconds * 1000, 4)
+        row["work"] = round((total - phases["wait"]) * 1000, 4)
+        row["total"] = round(total * 1000, 4)
+        row["text_renders"] = text_renders
+        if self.trace_writer is not None:
+            self.trace_writer.writerow(row)
+        else:
+            self.trace.write(json.dumps(row) + "\n")
+
+    def close(self) -> None:
+        """Finishes writing the trace, if there is one"""
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+            self.trace_writer = None
+
+    def toggle_overlay(self) -> None:
+        self.show_overlay = not self.show_overlay
+        self.overlay = None
+
+    def stats(self) -> list[str]:
+        """
+        Gets the overlay's lines: frame rate, p50/p99 frame and work times,
+        the mean of each phase, then p50/p99 work time by state
+        """
+        if not self.frames:
+            return ["no frames yet"]
+        totals = [total for _, _, total, _ in self.frames]
+        work: dict[str, list[float]] = {}
+        for state, phases, total, _ in self.frames:
+            work.setdefault(state, []).append(total - phases["wait"])
+        all_work = [ms for samples in work.values() for ms in samples]
+        mean_total = sum(totals) / len(totals)
+        lines = [
+            f"{1 / mean_total if mean_total else 0:.0f} fps, "
+            f"{sum(text for *_, text in self.frames)} text renders",
+            f"frame p50 {percentile(totals, 0.5) * 1000:.2f} "
+            f"p99 {percentile(totals, 0.99) * 1000:.2f} ms",
+            f"work p50 {percentile(all_work, 0.5) * 1000:.2f} "
+            f"p99 {percentile(all_work, 0.99) * 1000:.2f} ms",
+        ]
+        for phase in PHASES:
+            mean = sum(phases[phase] for _, phases, _, _ in self.frames) / len(self.frames)
+            lines.append(f"  {phase:<8}{mean * 1000:7.2f} ms")
+        for state, samples in work.items():
+            lines.append(
+                f"{state}: p50 {percentile(samples, 0.5) * 1000:.2f} "
+                f"p99 {percentile(samples, 0.99) * 1000:.2f} ms"
+            )
+        return lines
+
+    def overlay_rect(self, screen: pygame.surface.Surface) -> pygame.Rect | None:
+        """Gets where the overlay is drawn, None if it's hidden"""
+        if not self.show_overlay or self.overlay is None:
+            return None
+        rect = self.overlay.get_rect()
+        rect.topright = (screen.get_width() - OVERLAY_MARGIN, OVERLAY_MARGIN)
+        return rect
+
+    def update_overlay(self) -> None:
+        """
+        Redraws the overlay if it's shown and due. Only redrawn every
+        OVERLAY_REFRESH, so it doesn't render text every frame itself
+        """
+        if not self.show_overlay:
+            return
+        now = time.perf_counter()
+        if self.overlay is not None and now - self.overlay_time < OVERLAY_REFRESH:
+            return
+        self.overlay_time = now
+        # Rendered past the font's cache, so it's not counted or cached itself
+        font = get_font(15)
+        lines = [
+            pygame.font.Font.render(font, line, True, "white") for line in self.stats()
+        ]
+        width = max(line.get_width() for line in lines) + 2 * OVERLAY_MARGIN
+        height = sum(line.get_height() for line in lines) + 2 * OVERLAY_MARGIN
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))
+        y = OVERLAY_MARGIN
+        for line in lines:
+            overlay.blit(line, (OVERLAY_MARGIN, y))
+            y += line.get_height()
+        self.overlay = overlay
+        self.overlay_changed = True
+
+    def draw(self, screen: pygame.surface.Surface) -> None:
+        rect = self.overlay_rect(screen)
+        if rect is not None:
+            assert self.overlay is not None
+            screen.blit(self.overlay, rect)
+            self.overlay_changed = False
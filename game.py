@@ -1,16 +1,29 @@
+import random
 import sys
-import time
 from typing import TYPE_CHECKING
 
 import pygame
 
+from frame_profiler import FrameProfiler
+from game_clock import GameClock, PerfClock
+from render_backend import RenderBackend, SoftwareBackend
+from state_logic.event_log import EventLog
+from states.gui_elements.animation import animator
 from states.gui_elements.card import Card, CardGroup
 from states.title import Title
 
 if TYPE_CHECKING:
+    from benchmarks.frame_allocs import FrameAllocations
     from states.statebase import StateBase  # Import only for type checking
 
-MAX_DT: float = 0.15
+FIXED_DT: float = 1 / 120  # Game time each update step covers
+MAX_DT: float = 0.15  # Most real time caught up after a stall
+STEP_TOLERANCE = 1e-9  # Rounding slack, so a step isn't missed by a hair
+ACTIVE_FPS = 120  # Frames drawn per second while anything moves
+IDLE_FPS = 30  # Frames drawn per second otherwise
+# Events after which the window's contents can't be trusted
+REDRAW_EVENTS = (pygame.WINDOWEXPOSED, pygame.WINDOWRESIZED, pygame.WINDOWRESTORED)
+PROFILER_KEY = pygame.K_F3  # Shows and hides the frame time overlay
 
 class Game:
     deck: list["Card"]
@@ -20,56 +33,185 @@ class Game:
     state_stack: list["StateBase"]
     state: "StateBase"
     dx: float
-    prev_time: float
-    fps: int
+    clock: GameClock
+    rng: random.Random  # Shuffles decks, seeded for repeatable runs
+    event_log: EventLog | None  # Every blind's calls, to replay with replay.py
+    prev_time: float  # Clock time real time was last taken up to
+    lag: float  # Real time not yet simulated, less than FIXED_DT after update
+    next_render: float  # Clock time the next frame is due
+    input_seen: bool  # True if events came in since the last frame
+    dirty_rendering: bool  # Only redraws and updates what changed if True
+    redraw_all: bool  # Redraws the whole screen next frame if True
+    drawn_state: "StateBase | None"
+    allocations: "FrameAllocations | None"  # Told when each frame ends, if set
+    backend: RenderBackend
+    profiler: FrameProfiler
 
-    def __init__(self, screen: pygame.surface.Surface):
+    def __init__(
+        self,
+        screen: pygame.surface.Surface,
+        dirty_rendering: bool = False,
+        backend: RenderBackend | None = None,
+        profiler: FrameProfiler | None = None,
+        clock: GameClock | None = None,
+        seed: int | None = None,
+        record_path: str | None = None,
+    ):
+        """
+        Args:
+            screen (pygame.surface.Surface): surface states draw on
+            dirty_rendering (bool, optional): only redraw what changed.
+                Defaults to False
+            backend (RenderBackend, optional): shows finished frames.
+                Defaults to software
+            profiler (FrameProfiler, optional): times each frame
+            clock (GameClock, optional): real time source the loop runs on.
+                Defaults to perf_counter, a ManualClock makes runs repeatable
+            seed (int, optional): seeds rng. Defaults to None, using the
+                global random stream
+            record_path (str, optional): file to record every blind played
+                to, as an EventLog. Defaults to None
+        """
         self.screen = screen
-        self.clock = pygame.time.Clock()
+        self.backend = backend or SoftwareBackend()
+        self.profiler = profiler or FrameProfiler()
+        self.clock = clock or PerfClock()
+        if seed is None:  # Decks come from the global stream, as random.seed expects
+            self.rng = random  # type: ignore[assignment]
+        else:
+            self.rng = random.Random(seed)
+        self.event_log = EventLog(record_path) if record_path is not None else None
         self.done = False
         self.state_stack = []
         self.state = Title(self)
-        self.prev_time = 0.0
-        self.fps = 120
+        self.prev_time = self.next_render = self.clock.now()
+        self.lag = 0.0
+        self.input_seen = False
+        self.dirty_rendering = dirty_rendering
+        self.redraw_all = True
+        self.drawn_state = None
+        self.allocations = None
 
     def run(self) -> None:
         """
-        Main game loop
+        Main game loop. Game time moves in FIXED_DT steps, caught up to real
+        time every pass, and frames are drawn only when due, so how often
+        frames are drawn doesn't change how fast the game runs
         """
+        self.prev_time = self.next_render = self.clock.now()
         while not self.done:
             self.event_loop()
             self.update()
-            self.draw()
-            pygame.display.flip()
+            if self.render_due():
+                self.render()
+                self.profiler.end_frame(type(self.state).__name__)
+            self.wait()
+
+    def render_fps(self) -> int:
+        """Gets how many frames a second to draw right now"""
+        if animator.busy() or self.state.busy():
+            return ACTIVE_FPS
+        return IDLE_FPS
+
+    def render_due(self) -> bool:
+        """True if a frame should be drawn now. Input is shown right away"""
+        return self.input_seen or self.clock.now() >= self.next_render
+
+    def wait(self) -> None:
+        """Sleeps until the next update step or frame is due"""
+        now = self.clock.now()
+        next_step = now + FIXED_DT - self.lag
+        delay = min(next_step, self.next_render) - now
+        if delay > 0:
+            self.clock.sleep(delay)
+        self.profiler.mark("wait")
 
     def event_loop(self) -> None:
         """
         Runs current state's event handler
         """
         for event in pygame.event.get():
+            if event.type in REDRAW_EVENTS:
+                self.redraw_all = True
+            if event.type == pygame.KEYDOWN and event.key == PROFILER_KEY:
+                self.profiler.toggle_overlay()
+                self.redraw_all = True
+                continue
             self.state.handle_event(event)
+            self.input_seen = True
+        self.profiler.mark("events")
 
     def update(self) -> None:
         """
-        Updates game state based on time passed to handle animations, movements,
-        etc. in order to be independent from fps
+        Runs as many FIXED_DT update steps as fit in the real time passed
+        since the last call. What's left over carries into the next call
         """
-        self.clock.tick(self.fps)
-        now = time.time()
-        dt = now - self.prev_time
-        dt = min(dt, MAX_DT)
+        now = self.clock.now()
+        self.lag += min(now - self.prev_time, MAX_DT)
         self.prev_time = now
-        self.state.update(dt)
+        while self.lag >= FIXED_DT - STEP_TOLERANCE:
+            self.state.update(FIXED_DT)
+            self.lag -= FIXED_DT
+        self.lag = max(self.lag, 0.0)
+        self.profiler.mark("update")
 
     def draw(self):
         """
         Draws the current game state
         """
         self.state.draw(self.screen)
+        self.profiler.update_overlay()
+        self.profiler.draw(self.screen)
+
+    def render(self) -> None:
+        """
+        Draws the frame and puts it on the display. Cards are drawn between
+        their last two steps, by how far real time is into the next one
+        """
+        animator.interpolate(self.lag / FIXED_DT)
+        self.input_seen = False
+        self.next_render = self.clock.now() + 1 / self.render_fps()
+        if self.dirty_rendering and self.backend.partial_updates:
+            self.render_dirty()
+        else:
+            self.backend.begin_frame()
+            self.draw()
+            self.profiler.mark("draw")
+            self.backend.present(self.screen)
+            self.profiler.mark("present")
+        if self.allocations is not None:
+            self.allocations.end_frame()
+
+    def render_dirty(self) -> None:
+        """
+        Redraws only the rects the state reports as changed, clipped to them,
+        and skips the frame entirely if nothing changed. The whole screen is
+        redrawn when the state changes or the window needs it
+        """
+        rects = self.state.dirty_rects()  # Always taken, so changes don't pile up
+        self.profiler.update_overlay()
+        if self.profiler.overlay_changed:
+            self.redraw_all = True  # Overlay's size can change too
+        if self.redraw_all or self.state is not self.drawn_state:
+            self.redraw_all = False
+            self.drawn_state = self.state
+            rects = [self.screen.get_rect()]
+        if not rects:
+            self.profiler.mark("draw")
+            return
+        self.screen.set_clip(rects[0].unionall(rects[1:]))
+        self.draw()
+        self.screen.set_clip(None)
+        self.profiler.mark("draw")
+        self.backend.present(self.screen, rects)
+        self.profiler.mark("present")
 
     def quit(self) -> None:
         """
         Quit the application
         """
+        self.profiler.close()
+        if self.event_log is not None:
+            self.event_log.close()
         pygame.quit()
         sys.exit(0)
@@ -0,0 +1,36 @@
+import time
+
+# Real time sources for the game loop. The loop only reads and waits on its
+# clock, so swapping in a ManualClock runs the game deterministically and as
+# fast as it can, for tests, benchmarks and replays
+
+
+class PerfClock:
+    """Monotonic wall clock"""
+
+    def now(self) -> float:
+        return time.perf_counter()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class ManualClock:
+    """Clock that only moves when told to. Sleeping moves it instantly"""
+
+    time: float
+
+    def __init__(self, start: float = 0.0):
+        self.time = start
+
+    def now(self) -> float:
+        return self.time
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        self.time += seconds
+
+
+GameClock = PerfClock | ManualClock
@@ -1,3 +1,4 @@
+import argparse
 import os
 
 import pygame
@@ -6,16 +7,56 @@ import pygame
 os.environ["SDL_VIDEO_ALLOW_SCREENSAVER"] = "1"  # Optional: Prevent fullscreen issues
 os.environ["SDL_VIDEO_MAC_FULLSCREEN_DISABLE_HIDPI"] = "1"
 os.environ["SDL_HINT_VIDEO_HIGHDPI_DISABLED"] = "1"
+from frame_profiler import FrameProfiler
 from game import Game
+from render_backend import create_backend
+import assets.card_atlas as card_atlas
 
 pygame.init()
 pygame.font.init()
 pygame.display.set_caption("Balatro")
 SCREEN_WID, SCREEN_HEI = 1280, 720
-screen = pygame.display.set_mode(
-    (SCREEN_WID, SCREEN_HEI), pygame.SCALED | pygame.RESIZABLE
-)
 
 if __name__ == "__main__":
-    game = Game(screen)
+    parser = argparse.ArgumentParser(description="Balatro")
+    parser.add_argument(
+        "--dirty-rects",
+        action="store_true",
+        help="only redraw what changed each frame, and skip idle frames",
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=["software", "gl"],
+        default="software",
+        help="gl draws cards and a post pass with OpenGL, if moderngl is installed",
+    )
+    parser.add_argument(
+        "--post-mode", type=int, default=0, help="gl post pass: 0 plain, 1-2 CRT"
+    )
+    parser.add_argument(
+        "--profile-trace",
+        help="write every frame's timings to this .csv or .jsonl file (F3 shows them)",
+    )
+    parser.add_argument("--seed", type=int, help="seed deck shuffles, for repeatable runs")
+    parser.add_argument(
+        "--record", help="record every blind played to this file, to run with replay.py"
+    )
+    args = parser.parse_args()
+    backend, screen = create_backend(
+        args.renderer,
+        (SCREEN_WID, SCREEN_HEI),
+        pygame.SCALED | pygame.RESIZABLE,
+        args.post_mode,
+    )
+    # Card faces are baked once and kept on disk between runs
+    if not card_atlas.load_atlas():
+        card_atlas.save_atlas()
+    game = Game(
+        screen,
+        dirty_rendering=args.dirty_rects,
+        backend=backend,
+        profiler=FrameProfiler(args.profile_trace),
+        seed=args.seed,
+        record_path=args.record,
+    )
     game.run()
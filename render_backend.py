@@ -0,0 +1,328 @@
+import contextlib
+from array import array
+from typing import TYPE_CHECKING, Iterator
+
+import pygame
+
+import assets.card_atlas as card_atlas
+
+if TYPE_CHECKING:
+    import moderngl
+
+# How finished frames get to the display. The software backend is the plain
+# pygame path: states draw everything onto the screen surface and it's flipped.
+# The OpenGL backend needs moderngl, which is optional (requirements-gl.txt).
+# States still draw the UI onto the screen surface, which is uploaded as one
+# texture, but cards from the card atlas are collected instead of blitted and
+# drawn over the UI in one instanced draw call. The frame then goes through
+# shaders/FRAGMENT_SHADER.glsl as a full screen post pass
+
+VERTEX_SHADER_PATH = "shaders/VERTEX_SHADER.glsl"
+FRAGMENT_SHADER_PATH = "shaders/FRAGMENT_SHADER.glsl"
+INSTANCE_FLOATS = 8  # x, y, w, h on screen, then u, v, w, h in the atlas
+
+CARD_VERTEX_SHADER = """
+#version 330
+uniform vec2 screen_size;
+in vec2 corner;
+in vec4 dest;
+in vec4 src;
+out vec2 uv;
+void main() {
+    vec2 pixel = dest.xy + corner * dest.zw;
+    gl_Position = vec4(
+        pixel.x / screen_size.x * 2.0 - 1.0, 1.0 - pixel.y / screen_size.y * 2.0, 0.0, 1.0
+    );
+    uv = src.xy + corner * src.zw;
+}
+"""
+CARD_FRAGMENT_SHADER = """
+#version 330
+uniform sampler2D image;
+in vec2 uv;
+out vec4 color;
+void main() {
+    color = texture(image, uv);
+}
+"""
+
+
+class CardBatch:
+    """Card atlas regions collected to be drawn in one instanced call"""
+
+    instances: array  # INSTANCE_FLOATS floats per card, in draw order
+
+    def __init__(self):
+        self.instances = array("f")
+
+    def __len__(self) -> int:
+        return len(self.instances) // INSTANCE_FLOATS
+
+    def add(self, image: pygame.surface.Surface, pos: tuple[int, int]) -> bool:
+        """
+        Collects image to be drawn with its top left at pos
+
+        Returns (bool): False if image isn't part of the atlas, so it has to
+            be blitted instead
+        """
+        atlas = card_atlas.get_atlas()
+        if image.get_parent() is not atlas:
+            return False
+        atlas_w, atlas_h = atlas.get_size()
+        x, y = image.get_offset()
+        w, h = image.get_size()
+        self.instances.extend(
+            (pos[0], pos[1], w, h, x / atlas_w, y / atlas_h, w / atlas_w, h / atlas_h)
+        )
+        return True
+
+    def clear(self) -> None:
+        del self.instances[:]
+
+
+_batch: CardBatch | None = None
+
+
+def card_batch() -> CardBatch | None:
+    """Gets the batch cards should be collected into, None to blit them"""
+    return _batch
+
+
+class SoftwareBackend:
+    """Shows the screen surface as drawn by pygame"""
+
+    partial_updates = True  # Can show only some rects of a frame
+
+    def begin_frame(self) -> None:
+        pass
+
+    def present(
+        self, screen: pygame.surface.Surface, rects: list[pygame.Rect] | None = None
+    ) -> None:
+        """
+        Shows the frame drawn on screen
+
+        Args:
+            screen (pygame.surface.Surface): surface the frame was drawn on
+            rects (list[pygame.Rect], optional): only parts that changed.
+                Defaults to None, showing all of it
+        """
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    @contextlib.contextmanager
+    def software(self) -> Iterator[None]:
+        """Draws everything straight onto the screen surface while open"""
+        yield
+
+
+class GLBackend:
+    """
+    Composites the UI, the cards and the post pass with OpenGL. Needs a
+    moderngl context, either a window's or a standalone (headless) one
+    """
+
+    partial_updates = False  # Every frame is composited whole
+    atlas_surface: pygame.surface.Surface | None  # Atlas the texture was made from
+    atlas: "moderngl.Texture | None"
+
+    def __init__(
+        self,
+        ctx,
+        size: tuple[int, int],
+        post_mode: int = 0,
+        target=None,
+    ):
+        """
+        Args:
+            ctx (moderngl.Context): context to draw with
+            size (tuple[int, int]): screen size in pixels
+            post_mode (int, optional): mode uniform of the post pass shader.
+                0 shows the frame as is, 1 and 2 bend it like a CRT.
+                Defaults to 0
+            target (moderngl.Framebuffer, optional): where frames end up.
+                Defaults to the context's screen, which is then flipped
+        """
+        import moderngl
+
+        global _batch
+        self.ctx = ctx
+        self.size = size
+        self.post_mode = post_mode
+        self.windowed = target is None
+        self.target = ctx.screen if target is None else target
+        self.batch = _batch = CardBatch()
+        self.atlas_surface = None
+        self.atlas = None
+        self.ui = ctx.texture(size, 4)
+        self.ui.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        self.scene = ctx.texture(size, 4)
+        self.scene.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        self.scene_fbo = ctx.framebuffer(color_attachments=[self.scene])
+
+        self.card_prog = ctx.program(
+            vertex_shader=CARD_VERTEX_SHADER, fragment_shader=CARD_FRAGMENT_SHADER
+        )
+        self.card_prog["screen_size"].value = size
+        corners = ctx.buffer(array("f", (0, 0, 1, 0, 0, 1, 1, 1)))
+        self.instance_buffer = ctx.buffer(reserve=64 * INSTANCE_FLOATS * 4, dynamic=True)
+        self.card_vao = ctx.vertex_array(
+            self.card_prog,
+            [
+                (corners, "2f", "corner"),
+                (self.instance_buffer, "4f 4f/i", "dest", "src"),
+            ],
+        )
+        # The UI is one instance covering the screen
+        self.ui_buffer = ctx.buffer(array("f", (0, 0, *size, 0, 0, 1, 1)))
+        self.ui_vao = ctx.vertex_array(
+            self.card_prog,
+            [(corners, "2f", "corner"), (self.ui_buffer, "4f 4f/i", "dest", "src")],
+        )
+
+        self.post_prog = self._post_program(post_mode)
+        quad = ctx.buffer(array("f", (-1, -1, 0, 0, 1, -1, 1, 0, -1, 1, 0, 1, 1, 1, 1, 1)))
+        self.post_vao = ctx.vertex_array(
+            self.post_prog, [(quad, "2f 2f", "vert", "in_text")]
+        )
+
+    @classmethod
+    def headless(cls, size: tuple[int, int], post_mode: int = 0) -> "GLBackend":
+        """
+        Makes a backend with a standalone EGL context drawing into an
+        offscreen framebuffer, so it runs without a window or GPU (Mesa's
+        llvmpipe). Read frames back with read
+        """
+        import moderngl
+
+        # moderngl's stubs type backend as a dict, but it takes the name
+        ctx = moderngl.create_standalone_context(backend="egl")  # type: ignore[arg-type]
+        target = ctx.simple_framebuffer(size)
+        return cls(ctx, size, post_mode, target)
+
+    def _texture(self, surface: pygame.surface.Surface) -> "moderngl.Texture":
+        import moderngl
+
+        texture = self.ctx.texture(
+            surface.get_size(), 4, pygame.image.tobytes(surface, "RGBA")
+        )
+        texture.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        return texture
+
+    def _post_program(self, mode: int):
+        """
+        Compiles the shipped post pass shaders for one mode. The mode uniform
+        is made a constant, so the shader's branches on it fold away instead
+        of running per pixel (software GL runs every side of them). They're
+        GLSL ES, which not every desktop driver takes, so they're retried as
+        desktop GLSL
+        """
+        import moderngl
+
+        with open(VERTEX_SHADER_PATH) as file:
+            vertex = file.read()
+        with open(FRAGMENT_SHADER_PATH) as file:
+            fragment = file.read()
+        fragment = fragment.replace("uniform int mode;", f"const int mode = {mode};")
+        try:
+            return self.ctx.program(vertex_shader=vertex, fragment_shader=fragment)
+        except moderngl.Error:
+            desktop = "#version 330 core"
+            return self.ctx.program(
+                vertex_shader=vertex.replace("#version 300 es", desktop),
+                fragment_shader=fragment.replace("#version 300 es", desktop),
+            )
+
+    def begin_frame(self) -> None:
+        self.batch.clear()
+
+    def present(
+        self, screen: pygame.surface.Surface, rects: list[pygame.Rect] | None = None
+    ) -> None:
+        """
+        Composites the frame: the UI drawn on screen, the batched cards over
+        it, then the post pass into the target. rects are ignored, since the
+        whole frame is redrawn
+        """
+        import moderngl
+
+        self.ui.write(pygame.image.tobytes(screen, "RGBA"))
+        self.scene_fbo.use()
+        # The screen surface has no alpha, so the UI covers the whole frame
+        self.ui.use(0)
+        self.ui_vao.render(moderngl.TRIANGLE_STRIP, instances=1)
+        count = len(self.batch)
+        if count:
+            self.ctx.enable(moderngl.BLEND)
+            self.ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+            data = self.batch.instances.tobytes()
+            if len(data) > self.instance_buffer.size:
+                self.instance_buffer.orphan(len(data) * 2)
+            self.instance_buffer.write(data)
+            atlas = card_atlas.get_atlas()
+            texture = self.atlas
+            if texture is None or atlas is not self.atlas_surface:  # Again if reloaded
+                if texture is not None:
+                    texture.release()
+                self.atlas_surface = atlas
+                texture = self.atlas = self._texture(atlas)
+            texture.use(0)
+            self.card_vao.render(moderngl.TRIANGLE_STRIP, instances=count)
+            self.ctx.disable(moderngl.BLEND)
+
+        self.target.use()
+        self.scene.use(0)
+        self.post_vao.render(moderngl.TRIANGLE_STRIP)
+        if self.windowed:
+            pygame.display.flip()
+
+    def read(self) -> pygame.surface.Surface:
+        """Reads the last presented frame back from the target"""
+        data = self.target.read(viewport=(0, 0, *self.size), components=3)
+        return pygame.image.frombytes(data, self.size, "RGB", True)
+
+    @contextlib.contextmanager
+    def software(self) -> Iterator[None]:
+        """Blits cards straight onto the screen surface while open"""
+        global _batch
+        _batch = None
+        try:
+            yield
+        finally:
+            _batch = self.batch
+
+
+RenderBackend = SoftwareBackend | GLBackend
+
+
+def create_backend(
+    name: str, size: tuple[int, int], flags: int = 0, post_mode: int = 0
+) -> tuple[RenderBackend, pygame.surface.Surface]:
+    """
+    Opens the window for a backend, falling back to software if OpenGL can't
+    start
+
+    Args:
+        name (str): "gl" or "software"
+        size (tuple[int, int]): window size
+        flags (int, optional): pygame.display.set_mode flags for software
+        post_mode (int, optional): post pass mode for gl. Defaults to 0
+
+    Returns (tuple[RenderBackend, pygame.surface.Surface]): the backend and
+        the surface states draw on
+    """
+    if name == "gl":
+        try:
+            import moderngl
+        except ImportError:
+            print("moderngl isn't installed, falling back to software rendering")
+        else:
+            try:
+                pygame.display.set_mode(size, pygame.OPENGL | pygame.DOUBLEBUF)
+                backend = GLBackend(moderngl.create_context(), size, post_mode)
+                return backend, pygame.Surface(size)
+            except (pygame.error, moderngl.Error) as error:
+                print(f"OpenGL failed to start ({error}), falling back to software")
+    return SoftwareBackend(), pygame.display.set_mode(size, flags)
@@ -0,0 +1,100 @@
+"""
+Headless replayer for event logs. Runs every blind recorded by main.py --record
+or simulate.py --record again through BlindLogic, as fast as it can, and prints
+how they ended. Must never import pygame, directly or through states/ or utils.py
+
+With --out, outcomes are written as JSON. With --compare, they're checked
+against a JSON written by an older version, to catch scoring changes across
+every recorded session. Exits with 1 if any blind ended differently.
+
+Usage:
+    python replay.py session.blog
+    python replay.py sessions/ --out outcomes.json
+    python replay.py sessions/ --compare outcomes.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from state_logic.event_log import BlindOutcome, replay
+
+
+def log_paths(paths: list[str]) -> list[str]:
+    """Gets the logs in paths, taking every .blog file in a directory, sorted"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += sorted(
+                os.path.join(path, name)
+                for name in os.listdir(path)
+                if name.endswith(".blog")
+            )
+        else:
+            found.append(path)
+    return found
+
+
+def differences(
+    outcomes: dict[str, list[dict]], expected: dict[str, list[dict]]
+) -> list[str]:
+    """Gets every blind that ended differently from expected, by log and index"""
+    found = []
+    for path, blinds in outcomes.items():
+        old = expected.get(path)
+        if old is None:
+            continue
+        if len(old) != len(blinds):
+            found.append(f"{path}: {len(blinds)} blinds, expected {len(old)}")
+        for idx, (new, before) in enumerate(zip(blinds, old)):
+            changed = [key for key in new if new[key] != before.get(key)]
+            for key in changed:
+                found.append(f"{path} blind {idx}: {key} {new[key]}, expected {before.get(key)}")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless event log replayer")
+    parser.add_argument("logs", nargs="+", help="event log files or directories of them")
+    parser.add_argument("--out", help="JSON file to write outcomes to")
+    parser.add_argument("--compare", help="JSON outcomes from --out to check against")
+    args = parser.parse_args()
+
+    paths = log_paths(args.logs)
+    outcomes: dict[str, list[dict]] = {}
+    blinds = wins = 0
+    start = time.perf_counter()
+    for path in paths:
+        with open(path, "rb") as file:
+            data = file.read()
+        try:
+            replayed: list[BlindOutcome] = replay(data)
+        except ValueError as error:
+            print(f"{path}: {error}")
+            sys.exit(1)
+        outcomes[path] = [outcome.to_dict() for outcome in replayed]
+        blinds += len(replayed)
+        wins += sum(outcome.won for outcome in replayed)
+    elapsed = time.perf_counter() - start
+    rate = blinds / elapsed if elapsed else 0.0
+    print(f"{len(paths)} logs, {blinds} blinds, {wins} won, in {elapsed:.2f}s ({rate:.1f} blinds/sec)")
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(outcomes, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            expected = json.load(file)
+        changed = differences(outcomes, expected)
+        if changed:
+            print(f"{len(changed)} differences from {args.compare}:")
+            for line in changed:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"Same outcomes as {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
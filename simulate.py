@@ -0,0 +1,397 @@
+"""
+Headless simulator for balancing blinds. Plays complete blinds (or full antes)
+through BlindLogic the same way the Gameplay state does, but with a policy
+choosing the plays and discards. Must never import pygame, directly or through
+states/ or utils.py
+
+Runs are split into fixed-size shards, each with its own random stream seeded
+from the master seed and shard index, so the same seed gives identical results
+at any worker count.
+
+With --record, every shard's blinds are written to an event log in the given
+directory, shard<n>.blog, which replay.py can run again.
+
+Usage:
+    python simulate.py --runs 10000 --ante --out results.json
+    python simulate.py --runs 1000000 --workers 8 --seed 42
+    python simulate.py --runs 5000 --seed 42 --record sessions/
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from typing import Any, Protocol
+
+import state_logic.hand_table as hand_table
+import state_logic.poker_hand_type as pk
+from enums import PlayAction
+from state_logic.blind_logic import BlindLogic
+from state_logic.carddata import CardData
+from state_logic.event_log import EventLog
+from state_logic.game_manager import GameManagerLogic
+
+BLINDS_PER_ANTE = 3
+MAX_SELECTED = 5  # Same limit BlindLogic.select_card enforces
+SHARD_SIZE = 1000  # Runs per shard. Changing it changes every seeded result
+
+
+class Policy(Protocol):
+    def choose(self, blind: BlindLogic) -> tuple[PlayAction, list[CardData]]:
+        """
+        Picks what to do with the current hand
+
+        Args:
+            blind (BlindLogic): blind in progress, with nothing selected
+
+        Returns (tuple[PlayAction, list[CardData]]): whether to play or
+            discard, and the 1-5 cards from blind.hand to do it with. Only
+            discard when blind.num_discards > 0
+        """
+        ...
+
+
+class RandomPolicy:
+    """Selects 1-5 random cards and plays or discards them at random"""
+
+    rng: random.Random
+
+    def __init__(self, rng: random.Random | None = None):
+        self.rng = rng or random.Random()
+
+    def choose(self, blind: BlindLogic) -> tuple[PlayAction, list[CardData]]:
+        num_cards = self.rng.randint(1, min(MAX_SELECTED, len(blind.hand)))
+        cards = self.rng.sample(blind.hand, num_cards)
+        if blind.num_discards > 0 and self.rng.random() < 0.5:
+            return PlayAction.DISCARD, cards
+        return PlayAction.PLAY, cards
+
+
+class GreedyPolicy:
+    """
+    Plays the selection with the highest base score (hand level chips plus
+    scoring card chips, times hand level mult). Ignores jokers and never
+    discards
+    """
+
+    def __init__(self, rng: random.Random | None = None):
+        pass  # Deterministic, but takes rng like every other policy
+
+    def choose(self, blind: BlindLogic) -> tuple[PlayAction, list[CardData]]:
+        levels = blind.manager.levels
+        rules_modified = blind.rules_modified
+        best: list[CardData] = []
+        best_score = -1
+        for num_cards in range(1, min(MAX_SELECTED, len(blind.hand)) + 1):
+            for cards in itertools.combinations(blind.hand, num_cards):
+                played, hand_type = pk.get_hand_type(list(cards), rules_modified)
+                level = levels[hand_type]
+                score = (level["chips"] + sum(card.chips for card in played)) * level["mult"]
+                if score > best_score:
+                    best, best_score = list(cards), score
+        return PlayAction.PLAY, best
+
+
+class SolverPolicy:
+    """
+    Plays BlindLogic.best_play, unless it can't win the blind this hand and
+    BlindLogic.best_discard expects a better play after discarding
+    """
+
+    samples: int
+
+    def __init__(self, rng: random.Random | None = None, samples: int = 8):
+        self.samples = samples  # best_discard seeds itself, so rng isn't needed
+
+    def choose(self, blind: BlindLogic) -> tuple[PlayAction, list[CardData]]:
+        cards, score = blind.best_play()
+        if blind.score + score >= blind.blind or blind.num_discards <= 0:
+            return PlayAction.PLAY, cards
+        discard, expected = blind.best_discard(self.samples)
+        if expected > score:
+            return PlayAction.DISCARD, discard
+        return PlayAction.PLAY, cards
+
+
+# Policy classes by name. Each takes the shard's random stream
+POLICIES: dict[str, type] = {
+    "random": RandomPolicy,
+    "greedy": GreedyPolicy,
+    "solver": SolverPolicy,
+}
+
+
+class SimResults:
+    """
+    Outcomes of a batch of runs, kept per blind of the ante. Index 0 is the
+    first (small) blind
+    """
+
+    runs: int
+    blinds_per_run: int
+    elapsed: float
+    targets: list[int]  # Score needed to beat each blind
+    attempts: list[int]
+    wins: list[int]
+    scores: list[Counter[int]]  # Final score -> number of blinds ending on it
+
+    def __init__(self, blinds_per_run: int = 1):
+        self.runs = 0
+        self.blinds_per_run = blinds_per_run
+        self.elapsed = 0.0
+        self.targets = []
+        self.attempts = []
+        self.wins = []
+        self.scores = []
+
+    def record(self, blind_idx: int, target: int, score: int, won: bool) -> None:
+        """Adds the outcome of one finished blind"""
+        while len(self.attempts) <= blind_idx:
+            self.targets.append(target)
+            self.attempts.append(0)
+            self.wins.append(0)
+            self.scores.append(Counter())
+        self.attempts[blind_idx] += 1
+        self.wins[blind_idx] += won
+        self.scores[blind_idx][score] += 1
+
+    def merge(self, other: "SimResults") -> None:
+        """Adds another batch's outcomes into this one"""
+        self.runs += other.runs
+        self.elapsed += other.elapsed
+        for idx, target in enumerate(other.targets):
+            if idx == len(self.attempts):
+                self.targets.append(target)
+                self.attempts.append(0)
+                self.wins.append(0)
+                self.scores.append(Counter())
+            self.attempts[idx] += other.attempts[idx]
+            self.wins[idx] += other.wins[idx]
+            self.scores[idx].update(other.scores[idx])
+
+    @property
+    def win_rate(self) -> float:
+        """Fraction of runs that beat every blind they were meant to play"""
+        if len(self.wins) < self.blinds_per_run:
+            return 0.0
+        return self.wins[self.blinds_per_run - 1] / self.runs
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.runs / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "blinds_per_run": self.blinds_per_run,
+            "elapsed": self.elapsed,
+            "games_per_sec": self.games_per_sec,
+            "win_rate": self.win_rate,
+            "blinds": [
+                {
+                    "target": self.targets[idx],
+                    "attempts": self.attempts[idx],
+                    "wins": self.wins[idx],
+                    "win_rate": self.wins[idx] / self.attempts[idx],
+                    "scores": {
+                        str(score): count
+                        for score, count in sorted(self.scores[idx].items())
+                    },
+                }
+                for idx in range(len(self.attempts))
+            ],
+        }
+
+    def write(self, path: str) -> None:
+        """Writes results to path as JSON"""
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+
+def play_blind(
+    manager: GameManagerLogic, policy: Policy, log: EventLog | None = None
+) -> BlindLogic:
+    """
+    Plays the manager's next blind to completion. Mirrors the order of calls
+    Gameplay makes: select, play or discard, clear played cards, deal
+
+    Args:
+        manager (GameManagerLogic): profile to play the next blind of
+        policy (Policy): chooses every play and discard
+        log (EventLog, optional): log to record the blind to. Defaults to None
+
+    Returns (BlindLogic): the finished blind
+    """
+    blind = BlindLogic(manager, verbose=False, log=log)
+    blind.deal_to_hand()
+    while not blind.done:
+        if not blind.hand:  # Deck ran dry before the hands did
+            blind.end_game(won=False)
+            break
+        action, cards = policy.choose(blind)
+        for card in cards:
+            blind.select_card(card)
+        if action is PlayAction.DISCARD:
+            blind.discard()
+        else:
+            blind.play_hand()
+            blind.discard(just_played=True)
+        if not blind.done and not blind.is_deck_empty:
+            blind.deal_to_hand()
+    return blind
+
+
+def simulate(
+    runs: int,
+    policy: Policy,
+    full_ante: bool = False,
+    rng: random.Random | None = None,
+    log: EventLog | None = None,
+) -> SimResults:
+    """
+    Plays runs fresh profiles, each through its first blind or, with
+    full_ante, through the whole first ante until a blind is lost
+
+    Args:
+        runs (int): number of profiles to play
+        policy (Policy): chooses every play and discard
+        full_ante (bool, optional): True to keep playing blinds after a win.
+            Defaults to False
+        rng (random.Random, optional): stream every profile shuffles its decks
+            with. Defaults to an unseeded one
+        log (EventLog, optional): log to record every blind to. Defaults to
+            None
+    """
+    rng = rng or random.Random()
+    results = SimResults(BLINDS_PER_ANTE if full_ante else 1)
+    start = time.perf_counter()
+    for _ in range(runs):
+        manager = GameManagerLogic(rng)
+        for blind_idx in range(results.blinds_per_run):
+            manager.next_round()
+            blind = play_blind(manager, policy, log)
+            won = blind.score >= blind.blind
+            results.record(blind_idx, blind.blind, blind.score, won)
+            if not won:
+                break
+        results.runs += 1
+    results.elapsed = time.perf_counter() - start
+    return results
+
+
+def shard_rng(seed: int, shard: int) -> random.Random:
+    """Random stream for one shard. String seeds hash the same in every process"""
+    return random.Random(f"{seed}:{shard}")
+
+
+def _run_shard(
+    seed: int,
+    shard: int,
+    runs: int,
+    policy_name: str,
+    full_ante: bool,
+    use_table: bool,
+    record_dir: str | None = None,
+) -> SimResults:
+    """Plays one shard. Top level so worker processes can pickle it"""
+    if use_table:
+        hand_table.enable()
+    rng = shard_rng(seed, shard)
+    log = None
+    if record_dir is not None:
+        log = EventLog(os.path.join(record_dir, f"shard{shard}.blog"))
+    results = simulate(runs, POLICIES[policy_name](rng), full_ante, rng, log)
+    if log is not None:
+        log.close()
+    return results
+
+
+def simulate_sharded(
+    runs: int,
+    policy_name: str,
+    full_ante: bool = False,
+    seed: int = 0,
+    workers: int | None = None,
+    use_table: bool = False,
+    record_dir: str | None = None,
+) -> SimResults:
+    """
+    Splits runs into SHARD_SIZE shards and plays them across a process pool.
+    Shard results are merged in shard order, so everything but the timing is
+    identical for a given seed whatever the worker count
+
+    Args:
+        runs (int): number of profiles to play
+        policy_name (str): key into POLICIES
+        full_ante (bool, optional): True to play full antes. Defaults to False
+        seed (int, optional): master seed. Defaults to 0
+        workers (int, optional): processes to use. Defaults to the CPU count,
+            and 1 runs every shard in this process
+        use_table (bool, optional): True to read hand types from the lookup
+            table. Defaults to False
+        record_dir (str, optional): directory to write each shard's event log
+            to. Defaults to None, not recording
+    """
+    workers = workers or os.cpu_count() or 1
+    if record_dir is not None:
+        os.makedirs(record_dir, exist_ok=True)
+    if use_table:
+        hand_table.enable().entries  # Build the cache here so workers only map it
+    shards = [
+        (
+            seed,
+            shard,
+            min(SHARD_SIZE, runs - start),
+            policy_name,
+            full_ante,
+            use_table,
+            record_dir,
+        )
+        for shard, start in enumerate(range(0, runs, SHARD_SIZE))
+    ]
+    results = SimResults(BLINDS_PER_ANTE if full_ante else 1)
+    start = time.perf_counter()
+    if workers == 1:
+        for args in shards:
+            results.merge(_run_shard(*args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for shard_results in pool.map(_run_shard, *zip(*shards)):
+                results.merge(shard_results)
+    results.elapsed = time.perf_counter() - start  # Wall time, not summed CPU time
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless blind simulator")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="solver")
+    parser.add_argument("--ante", action="store_true", help="play full antes")
+    parser.add_argument("--out", help="JSON file to write results to")
+    parser.add_argument(
+        "--table", action="store_true", help="read hand types from the lookup table"
+    )
+    parser.add_argument("--seed", type=int, help="master seed (random if not set)")
+    parser.add_argument("--workers", type=int, help="processes (defaults to CPU count)")
+    parser.add_argument("--record", help="directory to write each shard's event log to")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    results = simulate_sharded(
+        args.runs, args.policy, args.ante, seed, args.workers, args.table, args.record
+    )
+    print(f"seed {seed}")
+    print(f"{results.runs} runs, {results.win_rate:.1%} won, in {results.elapsed:.2f}s ({results.games_per_sec:.1f} games/sec)")
+    for idx, target in enumerate(results.targets):
+        rate = results.wins[idx] / results.attempts[idx]
+        print(f"  blind {idx + 1} ({target}): {results.wins[idx]}/{results.attempts[idx]} won ({rate:.1%})")
+    if args.out:
+        results.write(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import itertools
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from enums import AbilCategory, AbilType, HandType, Rank, Suit
+from state_logic.carddata import NUM_CARDS, NUM_RANKS, RANK_ORDER, CardData, get_face
+from state_logic.jokerdata import AddX, HandTest, JokerData
+
+# Scores many candidate hands at once. A batch is an (N, 5) array of card ids
+# (suit * 13 + rank) and an (N, 5) bool mask of which slots hold a card, so
+# hands of 1-5 cards share one array. Everything mirrors BlindLogic.play_hand:
+# hand type from the poker_hand_type rules, base chips and mult from the hand
+# level, chips from each scoring card, then INDIE jokers in held order.
+
+MAX_CARDS = 5
+CARD_CHIPS = np.array(
+    [get_face(suit, rank).chips for suit in Suit for rank in Rank], dtype=np.int64
+)
+RANK_SORT = np.array(RANK_ORDER, dtype=np.int64)
+HAND_TYPES = {hand_type.rank: hand_type for hand_type in HandType}
+
+
+class BatchScores(NamedTuple):
+    hand_types: np.ndarray  # (N,) HandType.rank of each hand
+    scoring: np.ndarray  # (N, 5) bool, True for cards that scored
+    chips: np.ndarray  # (N,) chips after cards and jokers
+    mult: np.ndarray  # (N,) mult after jokers
+    score: np.ndarray  # (N,) chips * mult
+
+    def hand_type(self, row: int) -> HandType:
+        """HandType of one row"""
+        return HAND_TYPES[int(self.hand_types[row])]
+
+
+def encode_hands(hands: list[list[CardData]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Packs hands of 1-5 cards into a batch
+
+    Returns (tuple[np.ndarray, np.ndarray]): (N, 5) card ids and (N, 5) mask
+    """
+    ids = np.zeros((len(hands), MAX_CARDS), dtype=np.int64)
+    mask = np.zeros((len(hands), MAX_CARDS), dtype=bool)
+    for row, hand in enumerate(hands):
+        ids[row, : len(hand)] = [card.id for card in hand]
+        mask[row, : len(hand)] = True
+    return ids, mask
+
+
+def hand_subsets(
+    hand: list[CardData], max_cards: int = MAX_CARDS
+) -> tuple[np.ndarray, np.ndarray, list[tuple[int, ...]]]:
+    """
+    Builds a batch of every 1 to max_cards card selection of hand (218 for a
+    full 8 card hand)
+
+    Returns (tuple[np.ndarray, np.ndarray, list[tuple[int, ...]]]): card ids,
+        mask, and the hand indices each row selects
+    """
+    picks = [
+        combo
+        for num_cards in range(1, min(max_cards, len(hand)) + 1)
+        for combo in itertools.combinations(range(len(hand)), num_cards)
+    ]
+    ids, mask = encode_hands([[hand[idx] for idx in combo] for combo in picks])
+    return ids, mask, picks
+
+
+def _rank_counts(ranks: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """(N, 13) count of each rank among the masked cards"""
+    counts = np.zeros((ranks.shape[0], NUM_RANKS), dtype=np.int64)
+    rows = np.broadcast_to(np.arange(ranks.shape[0])[:, None], ranks.shape)
+    np.add.at(counts, (rows[mask], ranks[mask]), 1)
+    return counts
+
+
+def _straight_flush_flags(
+    ranks: np.ndarray, suits: np.ndarray, mask: np.ndarray, counts: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Whether each row's masked cards are five of one suit, and five distinct
+    consecutive ranks (ace high only)
+    """
+    five = mask.sum(axis=1) == MAX_CARDS
+    big = NUM_RANKS + 1
+    low_rank = np.where(mask, ranks, big).min(axis=1)
+    high_rank = np.where(mask, ranks, -1).max(axis=1)
+    straight = five & (counts.max(axis=1) == 1) & (high_rank - low_rank == 4)
+    low_suit = np.where(mask, suits, big).min(axis=1)
+    high_suit = np.where(mask, suits, -1).max(axis=1)
+    flush = five & (low_suit == high_suit)
+    return straight, flush
+
+
+def _check_jokers(jokers: Sequence[JokerData]) -> list[JokerData]:
+    """
+    Gets the jokers that trigger in the joker pipeline's INDIE phase. Raises
+    ValueError for jokers batch scoring can't mirror
+    """
+    indies = []
+    for joker in jokers:
+        if AbilCategory.PASSIVE in joker.ability_category:
+            raise ValueError(f"Can't batch score with rule-changing joker {joker}")
+        if joker.hand_condition is None:
+            continue  # The joker pipeline never triggers jokers without a condition
+        if set(joker.ability_category) != {AbilCategory.INDIE}:
+            raise ValueError(f"Can't batch score {joker} outside the INDIE phase")
+        if not isinstance(joker.ability, AddX) or not isinstance(
+            joker.hand_condition, HandTest
+        ):
+            raise ValueError(f"Can't batch score {joker}'s ability")
+        indies.append(joker)
+    return indies
+
+
+def score_batch(
+    ids: np.ndarray,
+    mask: np.ndarray,
+    levels: dict[HandType, dict[str, int]],
+    jokers: Sequence[JokerData],
+    card_chips: np.ndarray | None = None,
+) -> BatchScores:
+    """
+    Scores every hand in a batch the way BlindLogic.play_hand would. Raises
+    ValueError if a joker's effect can't be vectorized
+
+    Args:
+        ids (np.ndarray): (N, 5) card ids. Unmasked slots are ignored
+        mask (np.ndarray): (N, 5) bool, True where a slot holds a card
+        levels (dict): hand levels, usually GameManagerLogic.levels
+        jokers (list[JokerData]): held jokers, in order
+        card_chips (np.ndarray, optional): (N, 5) chips of each card, for
+            cards whose chips differ from their face. Defaults to face chips
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    mask = np.asarray(mask, dtype=bool)
+    if ids.shape != mask.shape or ids.ndim != 2 or ids.shape[1] != MAX_CARDS:
+        raise ValueError(f"Expected matching (N, {MAX_CARDS}) arrays, got {ids.shape}")
+    if (ids[mask] < 0).any() or (ids[mask] >= NUM_CARDS).any():
+        raise ValueError("Card ids must be in [0, 52)")
+    if not mask.any(axis=1).all():
+        raise ValueError("Every hand needs at least one card")
+    indies = _check_jokers(jokers)
+    num_hands = ids.shape[0]
+    rows = np.arange(num_hands)
+    suits, ranks = np.divmod(ids, NUM_RANKS)
+    num_cards = mask.sum(axis=1)
+
+    # Hand type, checked in the same priority order as poker_hand_type
+    counts = _rank_counts(ranks, mask)
+
+    def has(n: int) -> np.ndarray:
+        return (counts == n).any(axis=1)
+
+    straight, flush = _straight_flush_flags(ranks, suits, mask, counts)
+    five_cards = num_cards == MAX_CARDS
+    fives = five_cards & has(5)
+    full = five_cards & has(3) & has(2)
+    low_rank = np.where(mask, ranks, NUM_RANKS).min(axis=1)
+    conditions = [
+        fives & flush,
+        full & flush,
+        fives,
+        straight & flush & (low_rank == Rank.TEN.value),
+        straight & flush,
+        (num_cards >= 4) & has(4),
+        full,
+        flush,
+        straight,
+        (num_cards >= 3) & has(3),
+        (num_cards >= 4) & ((counts == 2).sum(axis=1) == 2),
+        has(2),
+    ]
+    choices = [
+        HandType.FIVE_F,
+        HandType.HOUSE_F,
+        HandType.FIVE,
+        HandType.ROYAL_F,
+        HandType.STRAIGHT_F,
+        HandType.FOUR,
+        HandType.FULL,
+        HandType.FLUSH,
+        HandType.STRAIGHT,
+        HandType.THREE,
+        HandType.TWOPAIR,
+        HandType.PAIR,
+    ]
+    hand_types = np.select(
+        conditions, [hand_type.rank for hand_type in choices], HandType.HIGH.rank
+    )
+
+    # Scoring cards: every card for five card hands, the matched ranks for
+    # n of a kinds, and the top card for a high card
+    slot_count = counts[rows[:, None], ranks]
+    need = np.zeros(num_hands, dtype=np.int64)  # Copies of a rank that score
+    need[hand_types == HandType.FOUR.rank] = 4
+    need[hand_types == HandType.THREE.rank] = 3
+    need[np.isin(hand_types, [HandType.TWOPAIR.rank, HandType.PAIR.rank])] = 2
+    scoring = mask & ((need[:, None] == 0) | (slot_count == need[:, None]))
+    high = hand_types == HandType.HIGH.rank
+    top = np.where(mask, RANK_SORT[ids], NUM_CARDS).argmin(axis=1)
+    scoring[high] = False
+    scoring[rows[high], top[high]] = True
+
+    level_chips = np.zeros(len(HandType), dtype=np.int64)
+    level_mult = np.zeros(len(HandType), dtype=np.int64)
+    for hand_type, level in levels.items():
+        level_chips[hand_type.rank] = level["chips"]
+        level_mult[hand_type.rank] = level["mult"]
+    if card_chips is None:
+        card_chips = CARD_CHIPS[ids]
+    chips = level_chips[hand_types] + np.where(scoring, card_chips, 0).sum(axis=1)
+    mult = level_mult[hand_types].copy()
+
+    # Joker conditions only see the scoring cards
+    if indies:
+        valid_counts = _rank_counts(ranks, scoring)
+        valid_num = scoring.sum(axis=1)
+        valid_straight, valid_flush = _straight_flush_flags(
+            ranks, suits, scoring, valid_counts
+        )
+        tests = {
+            HandType.PAIR: (valid_counts == 2).any(axis=1),
+            HandType.THREE: (valid_counts == 3).any(axis=1),
+            HandType.TWOPAIR: (valid_counts == 2).any(axis=1) & (valid_num == 4),
+            HandType.STRAIGHT: valid_straight,
+            HandType.FLUSH: valid_flush,
+        }
+    for joker in indies:
+        ability = joker.ability
+        assert isinstance(ability, AddX)
+        assert isinstance(joker.hand_condition, HandTest)
+        triggered = tests[joker.hand_condition.hand_type]
+        if AbilType.ADD_CHIPS in joker.ability_type:
+            chips = chips + np.where(triggered, ability.x, 0)
+        elif AbilType.ADD_MULT in joker.ability_type:
+            mult = mult + np.where(triggered, ability.x, 0)
+
+    return BatchScores(hand_types, scoring, chips, mult, chips * mult)
@@ -1,19 +1,28 @@
 import random
-import copy
+from typing import TYPE_CHECKING
 
 import state_logic.poker_hand_type as pk
-from enums import HandType, Rank, Suit, AbilCategory, AbilType
-from state_logic.carddata import CardData
+import state_logic.solver as solver
+from state_logic.draw_odds import MAX_DRAWS, DeckIndex, completion_odds
+from enums import HandType, Rank, Suit
+from state_logic.carddata import RANK_ORDER, SUIT_ORDER, CardData
 from state_logic.jokerdata import JokerData
 from state_logic.game_manager import GameManagerLogic
 
+if TYPE_CHECKING:
+    from state_logic.event_log import EventLog
 
-def generate_deck(shuffle: bool = False) -> list["CardData"]:
+
+def generate_deck(
+    shuffle: bool = False, rng: random.Random | None = None
+) -> list["CardData"]:
     """
     Creates a standard deck of cards. Should be treated as a stack
 
     Args:
         shuffle (bool, optional): True to shuffle deck. Defaults to False
+        rng (random.Random, optional): random stream to shuffle with. Defaults
+            to the global one
     """
 
     deck = []
@@ -22,7 +31,7 @@ def generate_deck(shuffle: bool = False) -> list["CardData"]:
             card = CardData(suit, rank)
             deck.append(card)
     if shuffle:
-        random.shuffle(deck)
+        (rng or random).shuffle(deck)
     return deck
 
 
@@ -30,29 +39,65 @@ class BlindLogic:
     blind: int
     manager: GameManagerLogic
     done: bool
-    deck: list[CardData]
-    jokers: list[JokerData]
+    deck: list[int]  # Indices into manager.deck left to deal. Top of deck is last
+    deck_index: DeckIndex  # Counts of the cards in deck
     hand: list[CardData]
+    selected: dict[int, CardData]  # Selected cards in hand by uid, in selection order
+    selection_version: int  # Bumped whenever the selection changes
+    _hand_type: tuple[int, bool, HandType] | None  # Selection version, rules, type
+    dealt: list[CardData]  # Every card dealt this blind, to hand changes back
+    solver_cache: dict[tuple, tuple]  # Memoized best_play/best_discard answers
     played: list[CardData]
     hand_size: int
     _num_hands: int
     _num_discards: int
     score: int
+    verbose: bool
+    seed: int  # Deck was shuffled by random.Random(seed), so it can be replayed
+    log: "EventLog | None"  # Records every call that changes the blind
 
-    def __init__(self, manager: GameManagerLogic):
+    def __init__(
+        self,
+        manager: GameManagerLogic,
+        verbose: bool = True,
+        seed: int | None = None,
+        log: "EventLog | None" = None,
+    ):
+        """
+        Args:
+            manager (GameManagerLogic): profile to draw the deck, jokers and
+                next blind from
+            verbose (bool, optional): False to stop printing the blind's
+                outcome (for headless runs). Defaults to True
+            seed (int, optional): seed to shuffle the deck with. Defaults to
+                None, drawing one from manager.rng
+            log (EventLog, optional): log to record the blind's calls to.
+                Defaults to None
+        """
+        self.verbose = verbose
         self.done = False
         self.manager = manager
-        self.deck = copy.deepcopy(manager.deck)
-        random.shuffle(self.deck)
-        self.jokers = manager.held_jokers
+        self.seed = seed if seed is not None else manager.rng.getrandbits(64)
+        self.log = log
+        # The manager's cards are only copied as they're dealt
+        self.deck = list(range(len(manager.deck)))
+        random.Random(self.seed).shuffle(self.deck)
+        self.deck_index = DeckIndex(card.id for card in manager.deck)
         self.blind = self.manager.blinds.pop()
         self.deck_total = len(self.deck)
         self.hand = []
+        self.selected = {}
+        self.selection_version = 0
+        self._hand_type = None
+        self.dealt = []
+        self.solver_cache = {}
         self.played = []
         self.hand_size = 8
         self._num_hands = 4
         self._num_discards = 4
         self.score = 0
+        if log is not None:
+            log.begin(self)
 
     @property
     def is_deck_empty(self) -> bool:
@@ -75,15 +120,32 @@ class BlindLogic:
     def deck_remaining(self) -> int:
         return len(self.deck)
 
+    @property
+    def top_of_deck(self) -> CardData:
+        """
+        The manager's card that will be dealt next. Don't modify it, it isn't
+        this blind's copy
+        """
+        return self.manager.deck[self.deck[-1]]
+
+    @property
+    def jokers(self) -> tuple[JokerData, ...]:
+        """The manager's held jokers, which its joker_pipeline is compiled from"""
+        return self.manager.held_jokers
+
+    @property
+    def rules_modified(self) -> bool:
+        """
+        Checks if any held joker passively changes what makes a poker hand,
+        in which case hands can't be read from the lookup table
+        """
+        return self.manager.joker_pipeline.rules_modified
+
     def sort_cards(self, by_rank: bool) -> None:
-        if by_rank:
-            self.hand = sorted(
-                self.hand, key=lambda card: (-card.get_rank.value, card.get_suit.value)
-            )
-        else:
-            self.hand = sorted(
-                self.hand, key=lambda card: (card.get_suit.value, -card.get_rank.value)
-            )
+        order = RANK_ORDER if by_rank else SUIT_ORDER
+        self.hand = sorted(self.hand, key=lambda card: order[card.id])
+        if self.log is not None:
+            self.log.sort(by_rank)
 
     def sort_cards_custom(self, og_idx: int, new_idx: int) -> None:
         """
@@ -91,16 +153,23 @@ class BlindLogic:
         """
         popped = self.hand.pop(og_idx)
         self.hand.insert(new_idx, popped)
+        if self.log is not None:
+            self.log.move(og_idx, new_idx)
 
     def num_selected(self) -> int:
         """
         Returns number of selected cards
         """
-        count = 0
-        for cards in self.hand:
-            if cards.selected:
-                count += 1
-        return count
+        return len(self.selected)
+
+    def clear_selection(self) -> None:
+        """Deselects every card"""
+        if not self.selected:
+            return
+        for card in self.selected.values():
+            card.selected = False
+        self.selected.clear()
+        self.selection_version += 1
 
     def deal_to_hand(self) -> None:
         """
@@ -112,8 +181,13 @@ class BlindLogic:
             raise ValueError("Cannot deal to a full hand!")
         for _ in range(hand_num_empty):
             if not self.is_deck_empty:
-                dealt = self.deck.pop()
+                deck_idx = self.deck.pop()
+                dealt = self.manager.deck[deck_idx].deal_copy(deck_idx)
+                self.deck_index.remove(dealt.id)
                 self.hand.append(dealt)
+                self.dealt.append(dealt)
+        if self.log is not None:
+            self.log.deal()
 
     def select_card(self, card: CardData) -> None:
         """
@@ -122,22 +196,111 @@ class BlindLogic:
         Args:
             card (Card): Card to select
         """
+        idx = -1
+        if self.log is not None:
+            # Found before anything changes, so a card not in hand changes nothing
+            idx = self.hand.index(card)
         if card.selected:
             card.selected = False
+            self.selected.pop(card.uid, None)
         elif self.num_selected() < 5:
             card.selected = True
+            self.selected[card.uid] = card
+        else:
+            return
+        self.selection_version += 1
+        if self.log is not None:
+            self.log.select(idx)
 
     def get_hand_type(self) -> HandType:
         """
         Gets the hand type of the current selcted cards. Strictly used to give
-        this information to the GUI
+        this information to the GUI. Kept until the selection or the jokers'
+        hand rules change
         """
         if self.num_selected() == 0:
             return HandType.EMPTY
-        selected = [card for card in self.hand if card.selected]
-        _, hand = pk.get_hand_type(selected)
+        rules_modified = self.rules_modified
+        cached = self._hand_type
+        if (
+            cached is not None
+            and cached[0] == self.selection_version
+            and cached[1] == rules_modified
+        ):
+            return cached[2]
+        _, hand = pk.get_hand_type(list(self.selected.values()), rules_modified)
+        self._hand_type = (self.selection_version, rules_modified, hand)
         return hand
 
+    def score_cards(
+        self, cards: list[CardData], mark_scored: bool = False
+    ) -> tuple[list[CardData], HandType, int, int]:
+        """
+        Scores cards as if they were played, without using up a hand
+
+        Args:
+            cards (list[CardData]): 1-5 cards, in played order
+            mark_scored (bool, optional): True to flag triggered jokers as
+                scored for the GUI's animation. Defaults to False
+
+        Returns (tuple[list[CardData], HandType, int, int]): scoring cards in
+            played order, hand type, final chips and final mult
+        """
+        pipeline = self.manager.joker_pipeline
+        valid_cards, hand_type = pk.get_hand_type(cards, pipeline.rules_modified)
+        # Sorts valid cards back into the order they were played
+        valid_cards = [card for card in cards if card in valid_cards]
+        held = []
+        if pipeline.on_held:
+            held = [card for card in self.hand if not any(card is c for c in cards)]
+        chips, mult = pipeline.score(
+            cards,
+            valid_cards,
+            held,
+            self.manager.levels[hand_type]["chips"],
+            self.manager.levels[hand_type]["mult"],
+            mark_scored,
+        )
+        return valid_cards, hand_type, chips, mult
+
+    def best_play(self) -> tuple[list[CardData], int]:
+        """
+        Finds the selection from hand that scores the most if played
+
+        Returns (tuple[list[CardData], int]): cards to play and their score
+        """
+        return solver.best_play(self)
+
+    def best_discard(self, samples: int = solver.DISCARD_SAMPLES) -> tuple[list[CardData], float]:
+        """
+        Finds the discard that leaves the best expected play after redrawing
+        from what's left of the deck
+        Raises ValueError if no discards are left
+
+        Args:
+            samples (int, optional): redraws sampled per candidate discard
+
+        Returns (tuple[list[CardData], float]): cards to discard and the
+            expected score of the best play afterwards
+        """
+        return solver.best_discard(self, samples)
+
+    def draw_odds(self, discard: list[CardData]) -> dict[HandType, float]:
+        """
+        Exact chance of being able to make each hand type after discarding
+        cards and dealing back up to a full hand
+
+        Args:
+            discard (list[CardData]): 1-5 cards from hand to discard
+
+        Returns (dict[HandType, float]): probability of each hand type
+        """
+        if not 0 < len(discard) <= MAX_DRAWS:
+            raise ValueError(f"Must discard 1 to {MAX_DRAWS} cards! {len(discard)=}")
+        kept = [card for card in self.hand if not any(card is d for d in discard)]
+        draws = min(self.hand_size - len(kept), self.deck_index.total)
+        return completion_odds(kept, self.deck_index, draws)
+
     def play_hand(self) -> tuple[list[CardData], HandType, tuple[int, int, int]]:
         """
         Plays selected cards for points.
@@ -152,29 +315,9 @@ class BlindLogic:
         if self._num_hands <= 0:
             raise ValueError(f"Cannot play! No hands left! {self._num_hands=}")
         self.played = [card for card in self.hand if card.selected]
-        valid_cards, hand_type = pk.get_hand_type(self.played)
-        # Sorts valid cards back into the order they were played
-        valid_cards = [card for card in self.played if card in valid_cards]
+        valid_cards, hand_type, chips, mult = self.score_cards(self.played, True)
         base_chips = self.manager.levels[hand_type]["chips"]
         base_mult = self.manager.levels[hand_type]["mult"]
-        mult = base_mult
-        chips = base_chips
-        for card in valid_cards:
-            chips += card.chips
-            if card.enhances:
-                pass #TODO: Handle enhancement
-            if card.edition:
-                pass #TODO: Handle edition
-
-        # Scoring for independent joker triggers
-        indies = [joker for joker in self.jokers if AbilCategory.INDIE in joker.ability_category]
-        for joker in indies:
-            if joker.hand_condition and joker.hand_condition(valid_cards):
-                joker.scored = True
-                if AbilType.ADD_CHIPS in joker.ability_type:
-                    chips = joker.ability(chips)
-                elif AbilType.ADD_MULT in joker.ability_type:
-                    mult = joker.ability(mult)
         ###
         # Stand in for mult system. Will also have to implement joker
         # system here i think.
@@ -182,13 +325,15 @@ class BlindLogic:
         self.score += chips * mult
         self._num_hands -= 1
         self.played.clear()
+        if self.log is not None:
+            self.log.play()
         if self.score >= self.blind:
-            self.end_game(won=True)
-        if self._num_hands == 0:
-            self.end_game(won=False)
+            self._end(won=True)
+        elif self._num_hands == 0:
+            self._end(won=False)
         return (valid_cards, hand_type, (self.score, base_chips, base_mult))
 
-    def discard(self, just_played: bool = False) -> None:
+    def discard(self, just_played: bool = False) -> list[JokerData]:
         """
         Discards selected cards
         Raises ValueError if called with no selected cards or if no discards
@@ -197,15 +342,24 @@ class BlindLogic:
         Args:
             just_played (bool, optional): if true, wont deduct a discard as
                 it means the fucntion was called to rid the played cards.
+
+        Returns (list[JokerData]): jokers the discard triggered
         """
+        triggered = []
         if not just_played: # I use this function to also clear played hands
             if self.num_selected() <= 0:
                 raise ValueError(f"Must have at least one card selected!")
             if self._num_discards <= 0:
                 raise ValueError(f"Cannot discard! No Discards left! {self._num_discards=}")
             self._num_discards -= 1
+            discarded = [card for card in self.hand if card.selected]
+            triggered = self.manager.joker_pipeline.discard(discarded)
         self.hand = [card for card in self.hand if not card.selected]
+        self.clear_selection()
+        if self.log is not None:
+            self.log.discard(just_played)
         # Should almost always call self.deal_to_hand() afterwards
+        return triggered
 
     def end_game(self, won: bool = False) -> None:
         """
@@ -214,11 +368,30 @@ class BlindLogic:
         Args:
             won (bool, optional): By default False, but True if game was won
         """
+        self._end(won)
+        if self.log is not None:
+            self.log.end(won)
+
+    def _end(self, won: bool) -> None:
+        """Ends blind without recording it, for when a play ends it"""
         if self.done:
             raise ValueError("Game is already over!")
         self.done = True
-        if won:
-            print(f"You won! Entering shop...")
-        else:
-            print("Game Over! :(")
-        # self.manager.deck = something? need someway to hand back modified deck if deck gets modified during game
+        if self.verbose:
+            if won:
+                print(f"You won! Entering shop...")
+            else:
+                print("Game Over! :(")
+        self.hand_back_deck()
+
+    def hand_back_deck(self) -> None:
+        """
+        Writes enhancements, seals and editions the dealt cards picked up
+        during the blind back onto the manager's deck
+        """
+        for card in self.dealt:
+            assert card.deck_idx is not None
+            original = self.manager.deck[card.deck_idx]
+            original.enhances = card.enhances
+            original.seal = card.seal
+            original.edition = card.edition
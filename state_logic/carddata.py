@@ -1,48 +1,141 @@
+import itertools
 from enums import Rank, Suit
-from typing import Callable
+from typing import Callable, NamedTuple
+
+NUM_RANKS = len(Rank)
+NUM_CARDS = NUM_RANKS * len(Suit)
+
+
+class CardFace(NamedTuple):
+    """
+    Immutable identity of a playing card. One instance per suit and rank is
+    shared by every CardData, in every blind
+    """
+
+    suit: Suit
+    rank: Rank
+    chips: int  # Base chips before any bonus
+    id: int  # suit * 13 + rank
+
+
+_faces: dict[tuple[Suit, Rank], CardFace] = {}
+_uids = itertools.count()  # Every card made gets the next one
+
+
+def get_face(suit: Suit, rank: Rank) -> CardFace:
+    """Gets the shared face for a suit and rank"""
+    face = _faces.get((suit, rank))
+    if face is None:
+        chips = min(rank.value + 2, 10) if rank != Rank.ACE else 11
+        card_id = suit.value * NUM_RANKS + rank.value
+        face = _faces[(suit, rank)] = CardFace(suit, rank, chips, card_id)
+    return face
+
+
+# Sort keys indexed by card id. RANK_ORDER sorts by descending rank, then
+# ascending suit, and SUIT_ORDER by ascending suit, then descending rank
+RANK_ORDER = [
+    (Rank.ACE.value - card_id % NUM_RANKS) * len(Suit) + card_id // NUM_RANKS
+    for card_id in range(NUM_CARDS)
+]
+SUIT_ORDER = [
+    card_id // NUM_RANKS * NUM_RANKS + Rank.ACE.value - card_id % NUM_RANKS
+    for card_id in range(NUM_CARDS)
+]
 
 
 class CardDataBase:
+    __slots__ = ("edition",)
+
     edition: str | None # To be replaced by enums probably
 
     def __init__(self):
         self.edition = None
 
 class CardData(CardDataBase):
-    suit: Suit
-    rank: Rank
+    __slots__ = ("face", "id", "uid", "chips", "selected", "seal", "enhances", "deck_idx")
+
+    face: CardFace
+    id: int  # suit * 13 + rank, shared by every copy of a face. Used for sorting
+    uid: int  # Unique to this card, kept by its dealt copies. Used for hashing and equality
     chips: int
     mult: int
     selected: bool
     seal: str | None # To be replaced by enums probably
     enhances: str | None # To be replaced by enums probably
+    deck_idx: int | None  # Index in the manager's deck a dealt card came from
 
     def __init__(self, suit: Suit, rank: Rank):
         super().__init__()
-        self._suit = suit
-        self._rank = rank
-        self.chips = min(self._rank.value + 2, 10) if self._rank != Rank.ACE else 11
+        self.face = get_face(suit, rank)
+        self.id = self.face.id
+        self.uid = next(_uids)
+        self.chips = self.face.chips
         self.selected = False
         self.enhances = None
         self.seal = None
+        self.deck_idx = None
+
+    @classmethod
+    def from_face(cls, face: CardFace) -> "CardData":
+        """
+        Makes a new plain card of face, skipping __init__'s face lookup. Used
+        to load saved decks
+        """
+        card = cls.__new__(cls)
+        card.face = face
+        card.id = face.id
+        card.uid = next(_uids)
+        card.chips = face.chips
+        card.edition = None
+        card.enhances = None
+        card.seal = None
+        card.selected = False
+        card.deck_idx = None
+        return card
+
+    def deal_copy(self, deck_idx: int) -> "CardData":
+        """
+        Makes a blind's mutable copy of this deck card. Shares the face and
+        skips __init__, so it is much cheaper than copy.deepcopy
+
+        Args:
+            deck_idx (int): index of this card in the manager's deck, used to
+                hand modifications back when the blind ends
+        """
+        card = CardData.__new__(CardData)
+        card.face = self.face
+        card.id = self.id
+        card.uid = self.uid
+        card.chips = self.chips
+        card.edition = self.edition
+        card.enhances = self.enhances
+        card.seal = self.seal
+        card.selected = False
+        card.deck_idx = deck_idx
+        return card
 
     @property
     def get_suit(self) -> Suit:
         """Suit getter property"""
-        return self._suit
+        return self.face.suit
 
     @property
     def get_rank(self) -> Rank:
         """Rank getter property"""
-        return self._rank
+        return self.face.rank
 
     def __eq__(self, other: object) -> bool:
+        """
+        Same card, not just the same face, so decks can hold duplicates.
+        A dealt copy equals the deck card it was dealt from
+        """
         if not isinstance(other, CardData):
             return False
-        return self._suit == other.get_suit and self._rank == other._rank
+        return self.uid == other.uid
 
     def __hash__(self):
-        return hash((self._suit, self._rank))
+        return self.uid
 
     def __repr__(self):
-        return f"CD: {self._rank.name.capitalize()} of {self._suit.name.capitalize()}s"
+        return f"CD: {self.face.rank.name.capitalize()} of {self.face.suit.name.capitalize()}s"
@@ -0,0 +1,215 @@
+import math
+from typing import Iterable, NamedTuple
+
+from enums import HandType, Rank, Suit
+from state_logic.carddata import NUM_CARDS, NUM_RANKS, CardData
+
+# Exact odds of what a hand can make after a discard and redraw. Draws from the
+# remaining deck are multivariate hypergeometric: there are n choose j ways to
+# draw j of the n cards left in a bin (a rank, a suit, or one rank of one
+# suit), so the ways to draw d cards are the x^d coefficient of the product of
+# every bin's polynomial sum(n choose j * x^j). Keeping only the terms that
+# miss a hand type counts the draws that miss it, so each hand type is a
+# product of 13 polynomials of degree 5 at most, with exact integer counts.
+
+NUM_SUITS = len(Suit)
+MAX_DRAWS = 5  # Most cards a single discard can redraw
+STRAIGHT_SIZE = 5
+ROYAL_RANKS = range(Rank.TEN.value, Rank.ACE.value + 1)
+
+
+class DeckIndex:
+    """
+    Card, rank and suit counts of the cards left in a deck. Kept up to date
+    one card at a time, so it never has to rescan the deck
+    """
+
+    __slots__ = ("card_counts", "rank_counts", "suit_counts", "total")
+
+    card_counts: list[int]  # Copies of each card id
+    rank_counts: list[int]  # Cards of each rank
+    suit_counts: list[int]  # Cards of each suit
+    total: int
+
+    def __init__(self, card_ids: Iterable[int] = ()):
+        self.card_counts = [0] * NUM_CARDS
+        self.rank_counts = [0] * NUM_RANKS
+        self.suit_counts = [0] * NUM_SUITS
+        self.total = 0
+        for card_id in card_ids:
+            self.add(card_id)
+
+    def add(self, card_id: int) -> None:
+        """Counts a card put into the deck"""
+        suit, rank = divmod(card_id, NUM_RANKS)
+        self.card_counts[card_id] += 1
+        self.rank_counts[rank] += 1
+        self.suit_counts[suit] += 1
+        self.total += 1
+
+    def remove(self, card_id: int) -> None:
+        """
+        Uncounts a card taken out of the deck
+        Raises ValueError if the deck has no copy of it
+        """
+        if self.card_counts[card_id] <= 0:
+            raise ValueError(f"No card with id {card_id} left in deck!")
+        suit, rank = divmod(card_id, NUM_RANKS)
+        self.card_counts[card_id] -= 1
+        self.rank_counts[rank] -= 1
+        self.suit_counts[suit] -= 1
+        self.total -= 1
+
+    def key(self) -> tuple[int, ...]:
+        """Hashable key for the multiset of cards left"""
+        return tuple(self.card_counts)
+
+
+class CountWays(NamedTuple):
+    """Draws that complete each count-based hand. Bins are ranks, in order"""
+
+    n_of_a_kind: list[int]  # Index n: draws holding n of one bin, for n in 0-5
+    two_pair: int  # Draws holding two of two different bins
+    full_house: int  # Draws holding three of one bin and two of another
+    straight: int  # Draws holding five consecutive bins
+    royal: int  # Draws holding every bin from ten to ace
+    total: int  # Every draw
+
+
+# Polynomials are packed into one int, SLOT_BITS bits per coefficient, so
+# multiplying two is a single int multiply. Coefficients count ways to draw at
+# most 10 cards, far below 2 ** SLOT_BITS, so slots never carry into each other
+SLOT_BITS = 64
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+def _count_ways(kept: list[int], deck: list[int], others: int, draws: int) -> CountWays:
+    """
+    Counts the draws that complete each count-based hand
+
+    Args:
+        kept (list[int]): cards held in each bin
+        deck (list[int]): cards left in deck in each bin
+        others (int): cards left in deck outside every bin
+        draws (int): cards drawn
+
+    Returns (CountWays): draws completing each hand
+    """
+    degree = (1 << ((draws + 1) * SLOT_BITS)) - 1  # Masks off powers past draws
+    below = [1] * (MAX_DRAWS + 1)  # below[n]: every bin under n
+    pairs = [1, 0]  # Exactly 0 or 1 bins at 2 or more
+    low_pairs = [1, 0]  # Same, with every bin under 3
+    runs = [1] + [0] * (STRAIGHT_SIZE - 1)  # By current run, none finished
+    royal = every = 1
+    # If no bin can reach 2, only runs need counting
+    repeats = any(held + left >= 2 for held, left in zip(kept, deck))
+    for rank, (held, left) in enumerate(zip(kept, deck)):
+        # under[k] packs the ways to draw under k - held of this bin, so a
+        # count test is a difference of two entries
+        under = [0]
+        for j in range(min(left, draws) + 1):
+            under.append(under[-1] | math.comb(left, j) << (j * SLOT_BITS))
+
+        def below_count(count: int) -> int:
+            return under[min(max(count - held, 0), len(under) - 1)]
+
+        all_ways = under[-1]
+        if repeats:
+            for n in range(2, MAX_DRAWS + 1):
+                below[n] = below[n] * below_count(n) & degree
+            single = below_count(2)
+            paired = all_ways - single
+            two = below_count(3) - single
+            pairs = [
+                pairs[0] * single & degree,
+                (pairs[1] * single + pairs[0] * paired) & degree,
+            ]
+            low_pairs = [
+                low_pairs[0] * single & degree,
+                (low_pairs[1] * single + low_pairs[0] * two) & degree,
+            ]
+        # A run reaching STRAIGHT_SIZE is dropped, leaving the draws without one
+        missing = below_count(1)
+        present = all_ways - missing
+        runs = [sum(runs) * missing & degree] + [
+            run * present & degree for run in runs[:-1]
+        ]
+        royal = royal * (present if rank in ROYAL_RANKS else all_ways) & degree
+        every = every * all_ways & degree
+
+    def drawn(poly: int) -> int:
+        """Ways to draw exactly draws cards, filling the rest from others"""
+        return sum(
+            (poly >> (j * SLOT_BITS) & SLOT_MASK) * math.comb(others, draws - j)
+            for j in range(draws + 1)
+        )
+
+    total = drawn(every)
+    if not repeats:
+        below = [every] * (MAX_DRAWS + 1)
+        pairs = low_pairs = [every, 0]
+    n_of_a_kind = [total] * 2 + [total - drawn(below[n]) for n in range(2, MAX_DRAWS + 1)]
+    two_pair = total - drawn(sum(pairs))
+    # Full houses need 2+ bins at 2 or more, with one of them at 3 or more
+    full_house = two_pair - (drawn(below[3]) - drawn(sum(low_pairs)))
+    straight = total - drawn(sum(runs))
+    return CountWays(n_of_a_kind, two_pair, full_house, straight, drawn(royal), total)
+
+
+def completion_odds(
+    kept: list[CardData], deck: DeckIndex, draws: int
+) -> dict[HandType, float]:
+    """
+    Exact chance that kept plus draws cards from deck can make each hand type.
+    A hand that can make a better type can still make the lesser ones it holds
+    (a three of a kind also makes a pair, a straight flush a straight).
+    Suited types add up the chance per suit, which is exact while the hand is
+    under 10 cards, since no hand that small holds two suited five card hands
+
+    Args:
+        kept (list[CardData]): cards left in hand after the discard
+        deck (DeckIndex): cards left to draw from
+        draws (int): cards drawn back, at most 5 and the cards left in deck
+
+    Returns (dict[HandType, float]): probability of each hand type
+    """
+    if not 0 <= draws <= min(MAX_DRAWS, deck.total):
+        raise ValueError(f"Can't draw {draws} cards from {deck.total} left!")
+    kept_cards = [0] * NUM_CARDS
+    for card in kept:
+        kept_cards[card.id] += 1
+    kept_suits = [
+        kept_cards[suit * NUM_RANKS : (suit + 1) * NUM_RANKS] for suit in range(NUM_SUITS)
+    ]
+    odds = dict.fromkeys(HandType, 0.0)
+    odds[HandType.HIGH] = 1.0 if kept or draws else 0.0
+
+    kept_ranks = [sum(counts) for counts in zip(*kept_suits)]
+    ranks = _count_ways(kept_ranks, deck.rank_counts, 0, draws)
+    odds[HandType.PAIR] = ranks.n_of_a_kind[2] / ranks.total
+    odds[HandType.TWOPAIR] = ranks.two_pair / ranks.total
+    odds[HandType.THREE] = ranks.n_of_a_kind[3] / ranks.total
+    odds[HandType.STRAIGHT] = ranks.straight / ranks.total
+    odds[HandType.FULL] = ranks.full_house / ranks.total
+    odds[HandType.FOUR] = ranks.n_of_a_kind[4] / ranks.total
+    odds[HandType.FIVE] = ranks.n_of_a_kind[5] / ranks.total
+
+    kept_by_suit = [sum(counts) for counts in kept_suits]
+    suits = _count_ways(kept_by_suit, deck.suit_counts, 0, draws)
+    odds[HandType.FLUSH] = suits.n_of_a_kind[5] / suits.total
+
+    # Hands of one suit: bins are its ranks, and cards of other suits are others
+    for suit, suit_ranks in enumerate(kept_suits):
+        if kept_by_suit[suit] + min(draws, deck.suit_counts[suit]) < 5:
+            continue  # Can't reach five cards of this suit
+        suited = _count_ways(
+            suit_ranks,
+            deck.card_counts[suit * NUM_RANKS : (suit + 1) * NUM_RANKS],
+            deck.total - deck.suit_counts[suit],
+            draws,
+        )
+        odds[HandType.STRAIGHT_F] += suited.straight / suited.total
+        odds[HandType.ROYAL_F] += suited.royal / suited.total
+        odds[HandType.FIVE_F] += suited.n_of_a_kind[5] / suited.total
+        odds[HandType.HOUSE_F] += suited.full_house / suited.total
+    return odds
@@ -0,0 +1,302 @@
+import random
+import struct
+from typing import IO, TYPE_CHECKING, Iterator
+
+from enums import HandType, Rank, Suit
+from state_logic.carddata import CardData, get_face
+from state_logic.jokerdata import joker_registry
+
+if TYPE_CHECKING:
+    from state_logic.blind_logic import BlindLogic
+    from state_logic.game_manager import GameManagerLogic
+
+# Append-only binary log of BlindLogic sessions. Every call that changes a
+# blind is one record, an opcode byte then its fixed size arguments, written
+# as it happens. A blind starts with a BEGIN record holding everything it
+# depends on: its shuffle seed, target, limits, hand levels, deck and held
+# jokers. Replaying a log runs the same calls on fresh BlindLogics, so a
+# session can be reproduced, and its outcomes compared, without the GUI
+#
+# Layout (little endian):
+#   file:   MAGIC, u8 LOG_VERSION, then records
+#   BEGIN:  u64 seed, u64 blind, u8 hand size, u8 hands, u8 discards,
+#           u8 levels, (u8 hand type rank, u32 chips, u32 mult, u16 lvl) each,
+#           u16 deck cards, (u8 face id, u16 chips) each,
+#           u8 jokers, u16 joker id each
+#   SELECT: u8 index in hand
+#   SORT:   u8 1 for by rank, 0 for by suit
+#   MOVE:   u8 from index, u8 to index
+#   DISCARD: u8 1 if clearing played cards
+#   END:    u8 1 if won
+#   DEAL, PLAY: no arguments
+# Enhancements, seals and editions aren't stored, since nothing scores them yet
+
+MAGIC = b"BLOG"
+LOG_VERSION = 1
+
+OP_BEGIN = 0
+OP_DEAL = 1
+OP_SELECT = 2
+OP_SORT = 3
+OP_MOVE = 4
+OP_PLAY = 5
+OP_DISCARD = 6
+OP_END = 7
+
+_BEGIN = struct.Struct("<QQBBBB")
+_LEVEL = struct.Struct("<BIIH")
+_CARD = struct.Struct("<BH")
+_COUNT16 = struct.Struct("<H")
+_HAND_TYPES = {hand_type.rank: hand_type for hand_type in HandType}
+_FACES = [get_face(suit, rank) for suit in Suit for rank in Rank]
+
+
+class EventLog:
+    """
+    Records BlindLogic calls. Pass one to every BlindLogic of a session, and
+    each blind's calls are appended after the last's
+    """
+
+    data: bytearray  # Everything recorded so far, header included
+    file: IO[bytes] | None  # Written through to as records are made
+
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path (str, optional): file to write the log to as it's recorded,
+                so it survives a crash. Defaults to None, only in memory
+        """
+        self.data = bytearray(MAGIC)
+        self.data.append(LOG_VERSION)
+        self.file = None
+        if path is not None:
+            self.file = open(path, "wb")
+            self.file.write(self.data)
+            self.file.flush()
+
+    def _append(self, record: bytes) -> None:
+        self.data += record
+        if self.file is not None:
+            self.file.write(record)
+            self.file.flush()
+
+    def begin(self, blind: "BlindLogic") -> None:
+        """
+        Records a new blind, before anything is dealt
+        Raises ValueError if a held joker isn't in joker_registry(), since
+        replays can only look jokers up by id
+        """
+        manager = blind.manager
+        levels = manager.levels
+        jokers = manager.held_jokers
+        registry = joker_registry()
+        for joker in jokers:
+            if not 0 <= joker.id < len(registry):
+                raise ValueError(f"Can't record {joker}, it has no registry id ({joker.id})")
+        record = bytearray([OP_BEGIN])
+        record += _BEGIN.pack(
+            blind.seed,
+            blind.blind,
+            blind.hand_size,
+            blind.num_hands,
+            blind.num_discards,
+            len(levels),
+        )
+        for hand_type, level in levels.items():
+            record += _LEVEL.pack(hand_type.rank, level["chips"], level["mult"], level["lvl"])
+        record += _COUNT16.pack(len(manager.deck))
+        for card in manager.deck:
+            record += _CARD.pack(card.id, card.chips)
+        record.append(len(jokers))
+        for joker in jokers:
+            record += _COUNT16.pack(joker.id)
+        self._append(bytes(record))
+
+    def deal(self) -> None:
+        self._append(bytes([OP_DEAL]))
+
+    def select(self, idx: int) -> None:
+        self._append(bytes([OP_SELECT, idx]))
+
+    def sort(self, by_rank: bool) -> None:
+        self._append(bytes([OP_SORT, by_rank]))
+
+    def move(self, og_idx: int, new_idx: int) -> None:
+        self._append(bytes([OP_MOVE, og_idx, new_idx]))
+
+    def play(self) -> None:
+        self._append(bytes([OP_PLAY]))
+
+    def discard(self, just_played: bool) -> None:
+        self._append(bytes([OP_DISCARD, just_played]))
+
+    def end(self, won: bool) -> None:
+        self._append(bytes([OP_END, won]))
+
+    def save(self, path: str) -> None:
+        """Writes everything recorded so far to path"""
+        with open(path, "wb") as file:
+            file.write(self.data)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class BlindOutcome:
+    """What one replayed blind came to, for comparing versions"""
+
+    blind: int
+    score: int
+    won: bool
+    done: bool
+    hands_left: int
+    discards_left: int
+    hand_types: list[HandType]  # Of every hand played, in order
+
+    def __init__(self, blind: "BlindLogic", hand_types: list[HandType]):
+        self.blind = blind.blind
+        self.score = blind.score
+        self.won = blind.score >= blind.blind
+        self.done = blind.done
+        self.hands_left = blind.num_hands
+        self.discards_left = blind.num_discards
+        self.hand_types = hand_types
+
+    def to_dict(self) -> dict:
+        return {
+            "blind": self.blind,
+            "score": self.score,
+            "won": self.won,
+            "done": self.done,
+            "hands_left": self.hands_left,
+            "discards_left": self.discards_left,
+            "hand_types": [hand_type.name for hand_type in self.hand_types],
+        }
+
+
+def _manager_for(
+    data: memoryview, offset: int
+) -> tuple["GameManagerLogic", int, tuple[int, int, int], int]:
+    """
+    Builds a profile holding what a BEGIN record says its blind started with
+
+    Returns (tuple[GameManagerLogic, int, tuple[int, int, int], int]): the
+        profile, the blind's seed, its hand size, hands and discards, and the
+        offset after the record
+    """
+    from state_logic.game_manager import GameManagerLogic
+
+    seed, blind, hand_size, hands, discards, num_levels = _BEGIN.unpack_from(data, offset)
+    offset += _BEGIN.size
+    # Filled in from the record, skipping __init__'s new deck and jokers
+    manager = GameManagerLogic.__new__(GameManagerLogic)
+    manager.rng = random.Random(seed)
+    manager.levels_version = 0
+    manager.round = manager.ante = manager.money = 0
+    levels = {}
+    for _ in range(num_levels):
+        rank, chips, mult, lvl = _LEVEL.unpack_from(data, offset)
+        offset += _LEVEL.size
+        levels[_HAND_TYPES[rank]] = {"chips": chips, "mult": mult, "lvl": lvl}
+    manager.levels = levels
+    (num_cards,) = _COUNT16.unpack_from(data, offset)
+    offset += _COUNT16.size
+    deck = []
+    for _ in range(num_cards):
+        face_id, chips = _CARD.unpack_from(data, offset)
+        offset += _CARD.size
+        card = CardData.from_face(_FACES[face_id])
+        card.chips = chips
+        deck.append(card)
+    manager.deck = deck
+    num_jokers = data[offset]
+    offset += 1
+    registry = joker_registry()
+    held = []
+    for _ in range(num_jokers):
+        (joker_id,) = _COUNT16.unpack_from(data, offset)
+        offset += _COUNT16.size
+        held.append(registry[joker_id].copy())
+    manager.all_jokers = [joker.copy() for joker in registry]
+    manager.held_jokers = tuple(held)
+    manager.blinds = [blind]
+    return manager, seed, (hand_size, hands, discards), offset
+
+
+def replay_blinds(data: bytes) -> Iterator[tuple["BlindLogic", list[HandType]]]:
+    """
+    Runs a log's calls again on fresh BlindLogics, one blind at a time
+    Raises ValueError if data isn't a log this version can read, or its
+    calls don't fit the blind they're replayed on
+
+    Args:
+        data (bytes): a whole log, as EventLog wrote it
+
+    Yields (tuple[BlindLogic, list[HandType]]): each blind once its calls
+        have run, and the hand types it played
+    """
+    from state_logic.blind_logic import BlindLogic
+
+    view = memoryview(data)
+    if bytes(view[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a blind event log")
+    version = view[len(MAGIC)]
+    if version != LOG_VERSION:
+        raise ValueError(f"Can't read event log version {version}, only {LOG_VERSION}")
+    offset = len(MAGIC) + 1
+    blind: BlindLogic | None = None
+    hand_types: list[HandType] = []
+    try:
+        while offset < len(view):
+            op = view[offset]
+            offset += 1
+            if op == OP_BEGIN:
+                if blind is not None:
+                    yield blind, hand_types
+                manager, seed, limits, offset = _manager_for(view, offset)
+                blind = BlindLogic(manager, verbose=False, seed=seed)
+                blind.hand_size, blind._num_hands, blind._num_discards = limits
+                hand_types = []
+                continue
+            if blind is None:
+                raise ValueError("Event log has calls before its first blind")
+            if op == OP_DEAL:
+                blind.deal_to_hand()
+            elif op == OP_SELECT:
+                blind.select_card(blind.hand[view[offset]])
+                offset += 1
+            elif op == OP_SORT:
+                blind.sort_cards(bool(view[offset]))
+                offset += 1
+            elif op == OP_MOVE:
+                blind.sort_cards_custom(view[offset], view[offset + 1])
+                offset += 2
+            elif op == OP_PLAY:
+                _, hand_type, _ = blind.play_hand()
+                hand_types.append(hand_type)
+            elif op == OP_DISCARD:
+                blind.discard(bool(view[offset]))
+                offset += 1
+            elif op == OP_END:
+                blind.end_game(bool(view[offset]))
+                offset += 1
+            else:
+                raise ValueError(f"Unknown event log opcode {op} at byte {offset - 1}")
+    except (IndexError, struct.error) as error:
+        raise ValueError(f"Event log doesn't fit the blind it replays: {error}") from error
+    if blind is not None:
+        yield blind, hand_types
+
+
+def replay(data: bytes) -> list[BlindOutcome]:
+    """
+    Replays a log headlessly and gets how each of its blinds ended
+
+    Args:
+        data (bytes): a whole log, as EventLog wrote it
+
+    Returns (list[BlindOutcome]): outcome of every blind in the log, in order
+    """
+    return [BlindOutcome(blind, hand_types) for blind, hand_types in replay_blinds(data)]
@@ -1,15 +1,20 @@
 import random
 from state_logic.carddata import CardData
 from state_logic.jokerdata import JokerData, generate_jokers
+from state_logic.joker_pipeline import JokerPipeline
 from enums import Rank, Suit, HandType
 
 
-def generate_deck(shuffle: bool = False) -> list["CardData"]:
+def generate_deck(
+    shuffle: bool = False, rng: random.Random | None = None
+) -> list["CardData"]:
     """
     Creates a standard deck of cards. Should be treated as a stack
 
     Args:
         shuffle (bool, optional): True to shuffle deck. Defaults to False
+        rng (random.Random, optional): random stream to shuffle with. Defaults
+            to the global one
     """
 
     deck = []
@@ -18,7 +23,7 @@ def generate_deck(shuffle: bool = False) -> list["CardData"]:
             card = CardData(suit, rank)
             deck.append(card)
     if shuffle:
-        random.shuffle(deck)
+        (rng or random).shuffle(deck)
     return deck
 
 
@@ -56,23 +61,56 @@ class GameManagerLogic:
 
     deck: list["CardData"]  # Stores sorted game deck. (To be shuffled on gameplay)
     all_jokers: list["JokerData"]
-    held_jokers: list["JokerData"]
+    _held_jokers: tuple["JokerData", ...]  # Immutable, so the pipeline can't go stale
+    joker_pipeline: JokerPipeline  # held_jokers compiled for scoring
     levels: dict[HandType, dict[str, int]]  # Hand levels and score
+    levels_version: int  # Bump whenever levels change so memoized scores are dropped
     blinds: list[int]
     round: int
     ante: int
     money: int
+    rng: random.Random  # Shuffles every blind's deck. Seed it for repeatable runs
 
-    def __init__(self):
+    def __init__(self, rng: random.Random | None = None):
+        """
+        Args:
+            rng (random.Random, optional): random stream to shuffle every
+                blind's deck with. Defaults to the global one, so random.seed
+                still repeats decks
+        """
+        # The random module has the global stream's methods, so it stands in for one
+        self.rng = rng or random  # type: ignore[assignment]
         self.deck = generate_deck()
         self.all_jokers = generate_jokers()
-        self.held_jokers = [] + self.all_jokers[:3] ###TEMPORARY FOR TESTING JOKERS
+        self.held_jokers = tuple(self.all_jokers[:3]) ###TEMPORARY FOR TESTING JOKERS
         self.levels = create_levels()
+        self.levels_version = 0
         self.blinds = [600, 450, 300]
         self.round = 0
         self.ante = 0
         self.money = 0
 
+    @property
+    def held_jokers(self) -> tuple["JokerData", ...]:
+        """
+        Jokers held, in order. A tuple, so they can only change through the
+        setter, add_joker or remove_joker, which recompile the pipeline
+        """
+        return self._held_jokers
+
+    @held_jokers.setter
+    def held_jokers(self, jokers: tuple["JokerData", ...]) -> None:
+        self._held_jokers = tuple(jokers)  # Untyped callers may still pass a list
+        self.joker_pipeline = JokerPipeline(self._held_jokers)
+
+    def add_joker(self, joker: "JokerData") -> None:
+        """Holds a new joker, after the others"""
+        self.held_jokers = self._held_jokers + (joker,)
+
+    def remove_joker(self, joker: "JokerData") -> None:
+        """Stops holding joker"""
+        self.held_jokers = tuple(held for held in self._held_jokers if held is not joker)
+
     def next_round(self):
         """To be called when a blind is selected"""
         self.round += 1
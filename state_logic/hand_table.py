@@ -0,0 +1,178 @@
+import itertools
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+import state_logic.poker_hand_type as pk
+from enums import HandType, Rank, Suit
+from state_logic.carddata import NUM_CARDS, NUM_RANKS, RANK_ORDER, CardData
+
+# Precomputed hand types for every 1-5 card subset of the standard 52 card
+# deck. A card is encoded as (ACE - rank) * 4 + suit, so ascending ids give the
+# evaluator's order (descending rank, then ascending suit), and a subset of k
+# cards with sorted ids c_0 < ... < c_k-1 is indexed with the combinatorial
+# number system: OFFSETS[k] + sum(C(c_i, i + 1)). Each entry is a uint16
+# holding the hand type's rank in the low 4 bits and a bitmask of the scoring
+# cards (by sorted id position) in the 5 bits above it.
+TABLE_PATH = "assets/hand_table.bin"
+TABLE_VERSION = 1
+DECK_SIZE = NUM_CARDS
+MAX_CARDS = 5
+HEADER = struct.Struct("<4sHB")  # magic, version, 1 if little endian
+MAGIC = b"PKHT"
+
+BINOM = [[0] * (MAX_CARDS + 1) for _ in range(DECK_SIZE)]
+for _n in range(DECK_SIZE):
+    BINOM[_n][0] = 1
+    for _k in range(1, min(_n, MAX_CARDS) + 1):
+        BINOM[_n][_k] = BINOM[_n - 1][_k - 1] + BINOM[_n - 1][_k]
+
+OFFSETS = [0] * (MAX_CARDS + 2)
+for _k in range(1, MAX_CARDS + 1):
+    OFFSETS[_k + 1] = OFFSETS[_k] + sum(BINOM[n][_k - 1] for n in range(DECK_SIZE))
+TABLE_SIZE = OFFSETS[MAX_CARDS + 1]
+
+HAND_TYPES = {hand_type.rank: hand_type for hand_type in HandType}
+
+
+def card_id(card: CardData) -> int:
+    """Compact 0-51 table id for a card of the standard deck"""
+    return RANK_ORDER[card.id]
+
+
+def subset_index(ids: list[int]) -> int:
+    """
+    Gets the table index of a set of card ids
+
+    Args:
+        ids (list[int]): 1-5 distinct card ids, sorted ascending
+    """
+    idx = OFFSETS[len(ids)]
+    for pos, cid in enumerate(ids, 1):
+        idx += BINOM[cid][pos]
+    return idx
+
+
+def build_table() -> array:
+    """
+    Evaluates every 1-5 card subset of the standard deck. Slow (it runs
+    pk.evaluate_hand ~2.9M times), so it should only run once per table version
+    """
+    deck = sorted(
+        (CardData(suit, rank) for suit in Suit for rank in Rank), key=card_id
+    )  # deck[i] has card id i
+    entries = array("H", bytes(2 * TABLE_SIZE))
+    for num_cards in range(1, MAX_CARDS + 1):
+        for ids in itertools.combinations(range(DECK_SIZE), num_cards):
+            cards = [deck[cid] for cid in ids]
+            played, hand_type = pk.evaluate_hand(cards)
+            mask = 0
+            for card in played:
+                mask |= 1 << cards.index(card)
+            entries[subset_index(list(ids))] = hand_type.rank | mask << 4
+    return entries
+
+
+def save_table(entries: array, path: str = TABLE_PATH) -> None:
+    """
+    Writes table entries to path with a version header. Written to a temp
+    file of its own first, so processes building the table at once never
+    write into the same file, and path only ever holds a whole table
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path) or ".", prefix="hand_table", delete=False
+    ) as file:
+        try:
+            file.write(HEADER.pack(MAGIC, TABLE_VERSION, sys.byteorder == "little"))
+            entries.tofile(file)
+        except BaseException:
+            file.close()
+            os.remove(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+def load_table(path: str = TABLE_PATH) -> memoryview | None:
+    """
+    Memory maps a saved table. Returns None if the file is missing, stale or
+    from a machine with a different byte order
+    """
+    try:
+        file = open(path, "rb")
+    except OSError:
+        return None
+    with file:
+        if os.fstat(file.fileno()).st_size != HEADER.size + 2 * TABLE_SIZE:
+            return None
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if HEADER.unpack_from(mapped) != (MAGIC, TABLE_VERSION, sys.byteorder == "little"):
+        mapped.close()
+        return None
+    return memoryview(mapped)[HEADER.size :].cast("H")
+
+
+class HandTable:
+    """
+    Lazily loaded lookup table of hand types. The table is mapped from path
+    on the first lookup, and built and written there if it isn't cached yet
+    """
+
+    path: str
+    _entries: memoryview | array | None
+
+    def __init__(self, path: str = TABLE_PATH):
+        self.path = path
+        self._entries = None
+
+    @property
+    def entries(self) -> memoryview | array:
+        if self._entries is None:
+            self._entries = load_table(self.path)
+            if self._entries is None:
+                entries = build_table()
+                save_table(entries, self.path)
+                self._entries = entries
+        return self._entries
+
+    def lookup(self, cards: list[CardData]) -> tuple[list[CardData], HandType] | None:
+        """
+        Looks up the hand type of cards. Gives the same result as the
+        evaluator in poker_hand_type
+
+        Returns (tuple[list[CardData], HandType] | None): scoring cards and
+            hand type, or None if cards can't be encoded (empty, more than
+            five cards or duplicate cards)
+        """
+        if not 0 < len(cards) <= MAX_CARDS:
+            return None
+        by_id = {RANK_ORDER[card.id]: card for card in cards}
+        if len(by_id) != len(cards):
+            return None
+        ids = sorted(by_id)
+        entry = self.entries[subset_index(ids)]
+        hand_type = HAND_TYPES[entry & 0xF]
+        mask = entry >> 4
+        played = [by_id[cid] for pos, cid in enumerate(ids) if mask >> pos & 1]
+        if hand_type in (HandType.FULL, HandType.HOUSE_F) and (
+            played[1].id % NUM_RANKS != played[2].id % NUM_RANKS
+        ):
+            played = played[2:] + played[:2]  # Triple first, like the evaluator
+        return played, hand_type
+
+
+def enable(path: str = TABLE_PATH) -> HandTable:
+    """
+    Makes pk.get_hand_type answer from the lookup table whenever the hand
+    rules are unmodified. The table is only loaded (or built) on first use
+    """
+    table = HandTable(path)
+    pk.set_lookup_table(table)
+    return table
+
+
+def disable() -> None:
+    """Goes back to evaluating every hand"""
+    pk.set_lookup_table(None)
@@ -0,0 +1,172 @@
+from typing import Callable, NamedTuple, Sequence
+
+from enums import AbilCategory, AbilType
+from state_logic.carddata import CardData
+from state_logic.jokerdata import HandTest, JokerData
+from state_logic.poker_hand_type import HandAnalysis
+
+# Held jokers sorted once into a trigger list per phase of scoring, so playing a
+# hand doesn't rescan every joker's categories. Each phase packs its cards into
+# one HandAnalysis that all of that phase's jokers check, instead of every
+# joker's condition re-deriving pairs, straights and flushes from the cards.
+
+
+class Trigger(NamedTuple):
+    joker: JokerData
+    check: Callable[[HandAnalysis], bool]
+    adds_chips: bool  # Ability adds to chips if True, to mult otherwise
+
+
+def _compile(joker: JokerData) -> Trigger | None:
+    """
+    Makes joker's trigger. None if it never triggers: play_hand has always
+    skipped jokers without a hand condition, and only chips and mult can be
+    added to
+    """
+    condition = joker.hand_condition
+    if condition is None:
+        return None
+    if AbilType.ADD_CHIPS in joker.ability_type:
+        adds_chips = True
+    elif AbilType.ADD_MULT in joker.ability_type:
+        adds_chips = False
+    else:
+        return None
+    if isinstance(condition, HandTest):
+        return Trigger(joker, condition.check, adds_chips)
+    return Trigger(joker, lambda analysis: condition(analysis.cards), adds_chips)
+
+
+class JokerPipeline:
+    """
+    Held jokers compiled into per phase trigger lists, in held order. Phases
+    run in scoring order: on_played once for the played cards, on_scored for
+    each scoring card, on_held for each card left in hand, then indie once
+    for the scoring cards. on_discard runs for the cards of a discard
+    """
+
+    __slots__ = (
+        "jokers",
+        "rules_modified",
+        "on_played",
+        "on_scored",
+        "on_held",
+        "indie",
+        "on_discard",
+    )
+
+    jokers: tuple[JokerData, ...]
+    rules_modified: bool  # True if a joker passively changes what makes a hand
+    on_played: tuple[Trigger, ...]
+    on_scored: tuple[Trigger, ...]
+    on_held: tuple[Trigger, ...]
+    indie: tuple[Trigger, ...]
+    on_discard: tuple[Trigger, ...]
+
+    def __init__(self, jokers: Sequence[JokerData]):
+        self.jokers = tuple(jokers)
+        self.rules_modified = any(
+            AbilCategory.PASSIVE in joker.ability_category for joker in jokers
+        )
+        phases: dict[AbilCategory, list[Trigger]] = {
+            category: [] for category in AbilCategory
+        }
+        for joker in jokers:
+            trigger = _compile(joker)
+            if trigger is None:
+                continue
+            for category in joker.ability_category:
+                phases[category].append(trigger)
+        self.on_played = tuple(phases[AbilCategory.ON_PLAYED])
+        self.on_scored = tuple(phases[AbilCategory.ON_SCORED])
+        self.on_held = tuple(phases[AbilCategory.ON_HELD])
+        self.indie = tuple(phases[AbilCategory.INDIE])
+        self.on_discard = tuple(phases[AbilCategory.ON_DISCARD])
+
+    @staticmethod
+    def run(
+        triggers: tuple[Trigger, ...],
+        cards: list[CardData],
+        chips: int,
+        mult: int,
+        mark_scored: bool = False,
+    ) -> tuple[int, int]:
+        """
+        Runs one phase's triggers over cards
+
+        Args:
+            triggers (tuple[Trigger, ...]): the phase's trigger list
+            cards (list[CardData]): cards the phase checks
+            chips (int): chips so far
+            mult (int): mult so far
+            mark_scored (bool, optional): True to flag triggered jokers as
+                scored for the GUI's animation. Defaults to False
+
+        Returns (tuple[int, int]): chips and mult after the phase
+        """
+        if not triggers:
+            return chips, mult
+        analysis = HandAnalysis(cards)
+        for joker, check, adds_chips in triggers:
+            if check(analysis):
+                if mark_scored:
+                    joker.scored = True
+                if adds_chips:
+                    chips = joker.ability(chips)
+                else:
+                    mult = joker.ability(mult)
+        return chips, mult
+
+    def score(
+        self,
+        played: list[CardData],
+        scoring: list[CardData],
+        held: list[CardData],
+        chips: int,
+        mult: int,
+        mark_scored: bool = False,
+    ) -> tuple[int, int]:
+        """
+        Runs every scoring phase, adding each scoring card's chips in order
+
+        Args:
+            played (list[CardData]): every played card
+            scoring (list[CardData]): played cards that score, in played order
+            held (list[CardData]): cards left in hand
+            chips (int): chips of the hand's level
+            mult (int): mult of the hand's level
+            mark_scored (bool, optional): True to flag triggered jokers as
+                scored for the GUI's animation. Defaults to False
+
+        Returns (tuple[int, int]): final chips and mult
+        """
+        chips, mult = self.run(self.on_played, played, chips, mult, mark_scored)
+        for card in scoring:
+            chips += card.chips
+            if card.enhances:
+                pass #TODO: Handle enhancement
+            if card.edition:
+                pass #TODO: Handle edition
+            chips, mult = self.run(self.on_scored, [card], chips, mult, mark_scored)
+        if self.on_held:
+            for card in held:
+                chips, mult = self.run(self.on_held, [card], chips, mult, mark_scored)
+        return self.run(self.indie, scoring, chips, mult, mark_scored)
+
+    def discard(self, cards: list[CardData], mark_scored: bool = False) -> list[JokerData]:
+        """
+        Checks the on_discard triggers against discarded cards. There's no
+        chips or mult for their abilities to change yet
+
+        Returns (list[JokerData]): jokers that triggered
+        """
+        if not self.on_discard:
+            return []
+        analysis = HandAnalysis(cards)
+        triggered = []
+        for trigger in self.on_discard:
+            if trigger.check(analysis):
+                if mark_scored:
+                    trigger.joker.scored = True
+                triggered.append(trigger.joker)
+        return triggered
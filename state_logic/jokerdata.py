@@ -5,9 +5,21 @@ from enums import AbilityWhole, AbilType, AbilCategory
 
 
 class JokerData(CardDataBase):
+    __slots__ = (
+        "id",
+        "name",
+        "ability",
+        "hand_condition",
+        "ability_category",
+        "ability_type",
+        "value",
+        "scored",
+    )
+
+    id: int  # Position in generate_jokers(), -1 until assigned there
     name: str
     ability: Callable[..., int]
-    hand_hand_condition: Callable[[list[CardData]], bool] | None
+    hand_condition: Callable[[list[CardData]], bool] | None
     ability_category: tuple[AbilCategory, ...]
     ability_type: tuple[AbilType, ...]
     value: int
@@ -22,6 +34,7 @@ class JokerData(CardDataBase):
         hand_condition: Callable[..., bool] | None = None,
     ):
         super().__init__()
+        self.id = -1
         self.name = name
         self.ability = ability
         self.ability_category = tuple(ability_whole.category)
@@ -30,30 +43,86 @@ class JokerData(CardDataBase):
         self.value = value
         self.scored = False
 
+    def copy(self) -> "JokerData":
+        """
+        Makes a separately held joker with this one's definition. Abilities
+        and hand conditions are shared, not rebuilt
+        """
+        joker = JokerData.__new__(JokerData)
+        joker.edition = self.edition
+        joker.id = self.id
+        joker.name = self.name
+        joker.ability = self.ability
+        joker.hand_condition = self.hand_condition
+        joker.ability_category = self.ability_category
+        joker.ability_type = self.ability_type
+        joker.value = self.value
+        joker.scored = False
+        return joker
+
     def __repr__(self):
         return f"JokerData: {self.name}"
 
 
-def create_add_x(x: int) -> Callable[[int], int]:
-    def add_x(num: int) -> int:
-        return num + x
+class AddX:
+    """
+    Ability that adds x to chips or mult. A class rather than a closure so
+    batch scoring can read x
+    """
+
+    __slots__ = ("x",)
+
+    x: int
+
+    def __init__(self, x: int):
+        self.x = x
+
+    def __call__(self, num: int) -> int:
+        return num + self.x
+
+
+class HandTest:
+    """
+    Hand condition that checks the scoring cards for a hand type. A class
+    rather than a closure so batch scoring can read hand_type, and so the
+    joker pipeline can check a shared HandAnalysis instead of the cards
+    """
+
+    __slots__ = ("hand_type", "_test")
 
-    return add_x
+    hand_type: HandType
+    _test: Callable[[HandAnalysis], bool]
+
+    def __init__(self, hand_type: HandType):
+        # Straights and flushes need five scoring cards before they can be checked
+        test_functions: dict[HandType, Callable[[HandAnalysis], bool]] = {
+            HandType.PAIR: lambda hand: hand.has_n_of_a_kind(2),
+            HandType.THREE: lambda hand: hand.has_n_of_a_kind(3),
+            HandType.TWOPAIR: lambda hand: hand.has_n_of_a_kind(2)
+            and len(hand.cards) == 4,
+            HandType.STRAIGHT: lambda hand: hand.has_straight,
+            HandType.FLUSH: lambda hand: hand.has_flush,
+        }
+        try:
+            self._test = test_functions[hand_type]
+        except KeyError:
+            raise ValueError(f"Error: Passed bad hand type: {hand_type}")
+        self.hand_type = hand_type
+
+    def __call__(self, hand: list[CardData]) -> bool:
+        return self._test(HandAnalysis(hand))
+
+    def check(self, analysis: HandAnalysis) -> bool:
+        """Checks cards that have already been analysed"""
+        return self._test(analysis)
+
+
+def create_add_x(x: int) -> Callable[[int], int]:
+    return AddX(x)
 
 
 def create_test_hand(handtype: HandType) -> Callable[[list[CardData]], bool]:
-    test_functions: dict[HandType, Callable[[list[CardData]], bool]] = {
-        HandType.PAIR: lambda hand: bool(get_n_of_a_kind(hand, 2)),
-        HandType.THREE: lambda hand: bool(get_n_of_a_kind(hand, 3)),
-        HandType.TWOPAIR: lambda hand: bool(get_n_of_a_kind(hand, 2))
-        and len(hand) == 4,
-        HandType.STRAIGHT: lambda hand: bool(get_straight(hand)),
-        HandType.FLUSH: lambda hand: bool(get_flush(hand)),
-    }
-    try:
-        return test_functions[handtype]
-    except KeyError:
-        raise ValueError(f"Error: Passed bad hand type: {handtype}")
+    return HandTest(handtype)
 
 
 def generate_jokers() -> list[JokerData]:
@@ -128,4 +197,19 @@ def generate_jokers() -> list[JokerData]:
         create_test_hand(HandType.FLUSH),
     )
     jokers = [sly, wily, clever, dev, crafty, jolly, zany, mad, crazy, droll]
+    for joker_id, joker in enumerate(jokers):
+        joker.id = joker_id
     return jokers
+
+
+_registry: list[JokerData] = []
+
+
+def joker_registry() -> list[JokerData]:
+    """
+    Every joker definition, indexed by id. Made by generate_jokers once and
+    shared after that, so copy a joker before holding or changing it
+    """
+    if not _registry:
+        _registry.extend(generate_jokers())
+    return _registry
@@ -1,15 +1,107 @@
-from collections import Counter
+from typing import TYPE_CHECKING
 
 from enums import HandType, Rank, Suit
-from state_logic.carddata import CardData
+from state_logic.carddata import NUM_RANKS, RANK_ORDER, CardData
 
+if TYPE_CHECKING:
+    from state_logic.hand_table import HandTable
 
-def get_hand_type(cards: list[CardData]) -> tuple[list[CardData], HandType]:
+# Hands are packed into plain ints so a single pass over the cards is enough to
+# classify them. The rank histogram stores RANK_BITS bits of count per rank
+# (rank r lives at bits [r * RANK_BITS, (r + 1) * RANK_BITS)), the suit mask has
+# one bit per suit present, and kinds[n] is a bitmask of ranks held exactly n
+# times.
+RANK_BITS = 4
+RANK_FIELD = (1 << RANK_BITS) - 1
+STRAIGHT_RUN = 0b11111  # Five consecutive rank bits
+ROYAL_MASK = STRAIGHT_RUN << Rank.TEN.value
+
+_lookup_table: "HandTable | None" = None  # Set through hand_table.enable()
+
+
+def pack_hand(cards: list[CardData]) -> tuple[int, int, list[int]]:
+    """
+    Packs cards into a rank-count histogram, a suit bitmask and per-count rank
+    bitmasks in one pass. Counts above RANK_FIELD (15) of one rank overflow,
+    which can't happen for played hands
+
+    Args:
+        cards (list[CardData]): cards to pack
+
+    Returns (tuple[int, int, list[int]]): packed rank histogram, suit bitmask
+        and a list where index n is the bitmask of ranks held exactly n times
+    """
+    hist = 0
+    suit_mask = 0
+    kinds = [0] * (len(cards) + 1)
+    for card in cards:
+        suit, rank = divmod(card.id, NUM_RANKS)
+        shift = rank * RANK_BITS
+        count = (hist >> shift) & RANK_FIELD
+        hist += 1 << shift
+        bit = 1 << rank
+        if count:
+            kinds[count] &= ~bit
+        kinds[count + 1] |= bit
+        suit_mask |= 1 << suit
+    return hist, suit_mask, kinds
+
+
+def rank_count(hist: int, rank: Rank) -> int:
+    """Gets how many cards of rank are in a packed rank histogram"""
+    return (hist >> (rank.value * RANK_BITS)) & RANK_FIELD
+
+
+def _rank_mask(kinds: list[int]) -> int:
+    """Bitmask of every rank present in the packed hand"""
+    mask = 0
+    for kind in kinds[1:]:
+        mask |= kind
+    return mask
+
+
+def _straight_run(rank_mask: int, size: int = 5) -> int:
+    """
+    Finds the highest run of size consecutive ranks in rank_mask
+
+    Returns (int): bitmask of the run, or 0 if there is none
+    """
+    run = (1 << size) - 1
+    for low in range(Rank.ACE.value - size + 1, -1, -1):
+        if rank_mask >> low & run == run:
+            return run << low
+    return 0
+
+
+def _of_ranks(cards: list[CardData], rank_mask: int) -> list[CardData]:
+    """Filters cards down to the ranks in rank_mask, keeping their order"""
+    return [card for card in cards if rank_mask >> card.id % NUM_RANKS & 1]
+
+
+def _sort_key(card: CardData) -> int:
+    """Descending rank, then ascending suit"""
+    return RANK_ORDER[card.id]
+
+
+def set_lookup_table(table: "HandTable | None") -> None:
+    """
+    Sets the lookup table get_hand_type answers from when hand rules are
+    unmodified. None turns lookups off
+    """
+    global _lookup_table
+    _lookup_table = table
+
+
+def get_hand_type(
+    cards: list[CardData], rules_modified: bool = False
+) -> tuple[list[CardData], HandType]:
     """
     Takes a played hand and returns played cards and hand type
 
     Args:
         cards (list[CardData]): list of cards played
+        rules_modified (bool, optional): True if jokers change what makes a
+            hand, which skips the lookup table. Defaults to False
 
     Returns (tuple[list[CardData], str]): Tuple containing a list of cards
         played in the determined poker hand, and the poker hand name
@@ -17,60 +109,71 @@ def get_hand_type(cards: list[CardData]) -> tuple[list[CardData], HandType]:
     ###TODO: Add a ctx parameter so i can check straights and flushes
     # and other rules based on the jokers or conditions of the current
     # game
+    if _lookup_table is not None and not rules_modified:
+        if (found := _lookup_table.lookup(cards)) is not None:
+            return found
+    return evaluate_hand(cards)
+
 
-    # Sorts cards by descending rank to make checks easier
-    cards = sorted(cards, key=lambda card: (-card.get_rank.value, card.get_suit.value))
+def evaluate_hand(cards: list[CardData]) -> tuple[list[CardData], HandType]:
+    """
+    Classifies cards from their packed form. Same results as get_hand_type,
+    but never consults the lookup table
+    """
     card_len = len(cards)
+    _, suit_mask, kinds = pack_hand(cards)
+    fives = kinds[5] if card_len >= 5 else 0
+    fours = kinds[4] if card_len >= 4 else 0
+    threes = kinds[3] if card_len >= 3 else 0
+    pairs = kinds[2] if card_len >= 2 else 0
 
     # Checks are ordered in order of highest to lowest priority hand type
     if (
         card_len == 5
     ):  # WILL HAVE TO UPDATE THESE CHECKS for jokers that reduce flush + straight size
-        flush = get_flush(cards)
-        # Flush Five
-        if (five_of_a_kind := get_n_of_a_kind(cards, 5)) and five_of_a_kind == flush:
-            return five_of_a_kind, HandType.FIVE_F
+        flush = suit_mask & (suit_mask - 1) == 0
+        full_house = bool(threes and pairs)
+        # Five distinct ranks in a row. Ace is only ever high
+        straight = kinds[1].bit_count() == 5 and kinds[1] == (
+            kinds[1] & -kinds[1]
+        ) * STRAIGHT_RUN
 
-        # Flush House
-        if (full_house := get_full_house(cards)) and full_house == flush:
-            return full_house, HandType.HOUSE_F
+        if fives:
+            played = sorted(cards, key=_sort_key)
+            return played, HandType.FIVE_F if flush else HandType.FIVE
 
-        if five_of_a_kind:
-            return five_of_a_kind, HandType.FIVE
+        if full_house:
+            # Triple first, then pair, matching get_full_house
+            played = sorted(_of_ranks(cards, threes), key=_sort_key)
+            played += sorted(_of_ranks(cards, pairs), key=_sort_key)
+            return played, HandType.HOUSE_F if flush else HandType.FULL
 
-        if flush and (straight := get_straight(cards)):
-            if is_royal_flush(straight):
-                return flush, HandType.ROYAL_F
-            return flush, HandType.STRAIGHT_F
+        if flush and straight:
+            played = sorted(cards, key=_sort_key)
+            if kinds[1] == ROYAL_MASK:
+                return played, HandType.ROYAL_F
+            return played, HandType.STRAIGHT_F
 
-    if card_len >= 4:
-        if four_of_a_kind := get_n_of_a_kind(cards, 4):
-            return four_of_a_kind, HandType.FOUR
+    if fours:
+        return sorted(_of_ranks(cards, fours), key=_sort_key), HandType.FOUR
 
     if card_len == 5:
-        if full_house:  # Assigned when checking flush house
-            return full_house, HandType.FULL
-
-        if flush:  # Assigned at start of checks
-            return flush, HandType.FLUSH
+        if flush:
+            return sorted(cards, key=_sort_key), HandType.FLUSH
 
-        if straight := get_straight(cards):
-            return straight, HandType.STRAIGHT
+        if straight:
+            return sorted(cards, key=_sort_key), HandType.STRAIGHT
 
-    if card_len >= 3:
-        if three_of_a_kind := get_n_of_a_kind(cards, 3):
-            return three_of_a_kind, HandType.THREE
+    if threes:
+        return sorted(_of_ranks(cards, threes), key=_sort_key), HandType.THREE
 
-    if card_len >= 4:
-        if two_pair := get_n_of_a_kind(cards, 2):
-            if len(two_pair) == 4:
-                return two_pair, HandType.TWOPAIR
+    if card_len >= 4 and pairs.bit_count() == 2:
+        return sorted(_of_ranks(cards, pairs), key=_sort_key), HandType.TWOPAIR
 
-    if card_len >= 2:
-        if pair := get_n_of_a_kind(cards, 2):
-            return pair, HandType.PAIR
+    if pairs:
+        return sorted(_of_ranks(cards, pairs), key=_sort_key), HandType.PAIR
 
-    return [cards[0]], HandType.HIGH
+    return [min(cards, key=_sort_key)], HandType.HIGH
 
 
 def get_flush(cards: list[CardData]) -> list[CardData]:
@@ -84,10 +187,12 @@ def get_flush(cards: list[CardData]) -> list[CardData]:
         raise ValueError(
             f"Hand size must be at least {FLUSH_REQ} to form a flush. Current hand size: {len(cards)}"
         )
-    suit_counter = Counter(card.get_suit for card in cards)
-    flush_suit, count = suit_counter.most_common(1)[0]
-    if count >= FLUSH_REQ:
-        return [card for card in cards if card.get_suit == flush_suit]
+    suit_hist = 0
+    for card in cards:
+        suit_hist += 1 << (card.id // NUM_RANKS * 8)
+    for suit in range(len(Suit)):
+        if (suit_hist >> (suit * 8)) & 0xFF >= FLUSH_REQ:
+            return [card for card in cards if card.id // NUM_RANKS == suit]
     return []
 
 
@@ -100,29 +205,25 @@ def get_full_house(cards: list[CardData]) -> list[CardData]:
         raise ValueError(
             f"Hand size must be at least 5 to form a full house. Current hand size: {len(cards)}"
         )
-    rank_counter = Counter(card.get_rank for card in cards)
-    triple_rank = None
-    pair_rank = None
-    for rank, count in rank_counter.most_common():
-        if count >= 3:
-            triple_rank = rank
-            break
-    if triple_rank is None:
+    _, _, kinds = pack_hand(cards)
+    # Prefers the most copies, then the highest rank
+    triple = next((kinds[n] for n in range(len(kinds) - 1, 2, -1) if kinds[n]), 0)
+    if not triple:
         return []
-    for rank, count in rank_counter.most_common():
-        if rank != triple_rank and count >= 2:
-            pair_rank = rank
-            break
-    if pair_rank is None:
+    triple = 1 << (triple.bit_length() - 1)
+    pair = next(
+        (kinds[n] & ~triple for n in range(len(kinds) - 1, 1, -1) if kinds[n] & ~triple),
+        0,
+    )
+    if not pair:
         return []
-    triple_cards = [card for card in cards if card.get_rank == triple_rank][:3]
-    pair_cards = [card for card in cards if card.get_rank == pair_rank][:2]
-    return triple_cards + pair_cards
+    pair = 1 << (pair.bit_length() - 1)
+    return _of_ranks(cards, triple)[:3] + _of_ranks(cards, pair)[:2]
 
 
 def get_straight(cards: list[CardData]) -> list[CardData]:
     """
-    Checks for a straight in cards.
+    Checks for a straight in cards. Cards don't need to be sorted
     Raises ValueError if cards length is too small to form a straight
     """
     ###TODO: Add a straight_size param or something similar
@@ -131,15 +232,14 @@ def get_straight(cards: list[CardData]) -> list[CardData]:
         raise ValueError(
             f"Hand size must be at least {STRAIGHT_REQ} to form a straight. Current hand size: {len(cards)}"
         )
-    played = []
-    for idx, card in enumerate(
-        cards[1:STRAIGHT_REQ]
-    ):  # WILL ONLY CHECK FIRST 4 CARDS IF SET TO 4, WILL NEED TO LET IT ALSO CHECK THE LAST 4 CARDS EVENTUALLY
-        if cards[idx].get_rank.value - card.get_rank.value != 1:
-            return []
-        played.append(card)
-    if played:
-        played.insert(0, cards[0])
+    _, _, kinds = pack_hand(cards)
+    run = _straight_run(_rank_mask(kinds), STRAIGHT_REQ)
+    if not run:
+        return []
+    played: list[CardData] = []
+    for card in sorted(_of_ranks(cards, run), key=_sort_key):
+        if not played or played[-1].id % NUM_RANKS != card.id % NUM_RANKS:
+            played.append(card)
     return played
 
 
@@ -148,7 +248,7 @@ def is_royal_flush(straight_flush: list[CardData]) -> bool:
     Determines if a straight flush is also a royal flush
     Must pass through a straight flush
     """
-    return straight_flush[-1].get_rank.value >= Rank.TEN.value
+    return min(card.id % NUM_RANKS for card in straight_flush) >= Rank.TEN.value
 
 
 def get_n_of_a_kind(cards: list[CardData], n: int) -> list[CardData]:
@@ -161,6 +261,47 @@ def get_n_of_a_kind(cards: list[CardData], n: int) -> list[CardData]:
 
     Return (list[CardData]): List of cards that are n of a kind
     """
-    counter = Counter(card.get_rank for card in cards)
-    kinds = {card for card, count in counter.items() if count == n}
-    return [card for card in cards if card.get_rank in kinds]
+    _, _, kinds = pack_hand(cards)
+    if not 0 < n < len(kinds):
+        return []
+    return _of_ranks(cards, kinds[n])
+
+
+class HandAnalysis:
+    """
+    Cards packed once so every joker condition checking them shares the work.
+    Straight and flush checks are worked out the first time they're asked for
+    """
+
+    __slots__ = ("cards", "kinds", "_straight", "_flush")
+
+    cards: list[CardData]
+    kinds: list[int]  # kinds[n] is the bitmask of ranks held exactly n times
+    _straight: bool | None
+    _flush: bool | None
+
+    def __init__(self, cards: list[CardData]):
+        self.cards = cards
+        _, _, self.kinds = pack_hand(cards)
+        self._straight = None
+        self._flush = None
+
+    def has_n_of_a_kind(self, n: int) -> bool:
+        """Same as bool(get_n_of_a_kind(cards, n))"""
+        return 0 < n < len(self.kinds) and bool(self.kinds[n])
+
+    @property
+    def has_straight(self) -> bool:
+        """True if there are at least 5 cards and they hold a straight"""
+        if self._straight is None:
+            self._straight = len(self.cards) >= 5 and bool(
+                _straight_run(_rank_mask(self.kinds))
+            )
+        return self._straight
+
+    @property
+    def has_flush(self) -> bool:
+        """True if there are at least 5 cards and 5 of them share a suit"""
+        if self._flush is None:
+            self._flush = len(self.cards) >= 5 and bool(get_flush(self.cards))
+        return self._flush
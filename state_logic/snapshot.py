@@ -0,0 +1,369 @@
+import random
+import struct
+
+from enums import HandType, Rank, Suit
+from state_logic.blind_logic import BlindLogic
+from state_logic.carddata import NUM_CARDS, NUM_RANKS, CardData, CardFace, get_face
+from state_logic.draw_odds import DeckIndex
+from state_logic.game_manager import GameManagerLogic
+from state_logic.jokerdata import JokerData, joker_registry
+
+# Versioned binary snapshots of a profile and, optionally, the blind it's in.
+# Jokers hold closures, so they're saved as their id in joker_registry() and
+# loaded as copies of the registry's definitions. Cards are saved as their face
+# id and what can change on them, and loading builds them straight from the
+# shared faces, so neither generate_deck nor generate_jokers runs. Meant to be
+# cheap enough to checkpoint and fork blinds in a search
+#
+# Layout (little endian):
+#   MAGIC, u8 SNAPSHOT_VERSION
+#   strings: u8 count, (u8 length, utf-8) each. Index 0 is None, so
+#            enhancements, seals and editions are saved as u8 indices
+#   manager: u8 rng version, 625 u32 rng state, u8 has gauss, f64 gauss,
+#            u32 round, u32 ante, i64 money, u32 levels version, u8 blinds,
+#            u64 each blind, u8 levels, (u8 hand type rank, u32 chips,
+#            u32 mult, u16 lvl) each, u16 deck cards, (u8 face id, u16 chips,
+#            u8 enhances, u8 seal, u8 edition) each, u8 held jokers,
+#            (u16 joker id, u8 edition, u8 scored) each
+#   u8 1 if a blind follows, then:
+#   blind:   u64 seed, u64 target, u8 done, u8 verbose, u8 hand size,
+#            u8 hands, u8 discards, u64 score, u16 deck total,
+#            u16 deck left, u16 index into the manager's deck each, u16
+#            card, rank and suit counts of the deck left then its total,
+#            u16 dealt, (u16 deck index, u16 chips, u8 enhances, u8 seal,
+#            u8 edition) each, u8 hand, u16 index into dealt each,
+#            u8 selected, u8 index in hand each, in selection order
+# Card uids aren't saved. Loaded decks get new ones, so forks never share them
+
+MAGIC = b"BSNP"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<4sB")
+_RNG = struct.Struct("<B625I?d")
+_MANAGER = struct.Struct("<IIqIB")
+_LEVEL = struct.Struct("<BIIH")
+_CARD = struct.Struct("<BHBBB")
+_JOKER = struct.Struct("<HB?")
+_BLIND = struct.Struct("<QQ??BBBQH")
+_DEALT = struct.Struct("<HHBBB")
+_COUNTS = struct.Struct(f"<{NUM_CARDS + NUM_RANKS + len(Suit)}HH")  # DeckIndex
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+
+_FACES: list[CardFace] = [get_face(suit, rank) for suit in Suit for rank in Rank]
+_HAND_TYPES = {hand_type.rank: hand_type for hand_type in HandType}
+
+
+class _Strings:
+    """Table of the optional strings on cards and jokers, None as 0"""
+
+    ids: dict[str | None, int]
+
+    def __init__(self):
+        self.ids = {None: 0}
+
+    def id(self, value: str | None) -> int:
+        if value is None:  # Almost always
+            return 0
+        found = self.ids.get(value)
+        if found is None:
+            found = self.ids[value] = len(self.ids)
+        return found
+
+    def pack(self) -> bytes:
+        record = bytearray([len(self.ids) - 1])
+        for value in list(self.ids)[1:]:
+            encoded = value.encode()  # type: ignore[union-attr]
+            record.append(len(encoded))
+            record += encoded
+        return bytes(record)
+
+
+def snapshot(manager: GameManagerLogic, blind: BlindLogic | None = None) -> bytes:
+    """
+    Saves a profile, and the blind in progress if there is one
+    Raises ValueError if blind isn't being played by manager, or a held
+    joker isn't in joker_registry(), since jokers are saved by id
+
+    Args:
+        manager (GameManagerLogic): profile to save
+        blind (BlindLogic, optional): manager's blind in progress. Defaults
+            to None
+
+    Returns (bytes): the snapshot, to pass to restore
+    """
+    if blind is not None and blind.manager is not manager:
+        raise ValueError("Blind isn't being played by this manager!")
+    num_registered = len(joker_registry())
+    for joker in manager.held_jokers:
+        if not 0 <= joker.id < num_registered:
+            raise ValueError(f"Can't save {joker}, it has no registry id ({joker.id})")
+    strings = _Strings()
+    parts = [b""]  # Strings go first, once they're all collected
+
+    rng_version, rng_state, gauss = manager.rng.getstate()
+    parts.append(_RNG.pack(rng_version, *rng_state, gauss is not None, gauss or 0.0))
+    blinds = manager.blinds
+    parts.append(
+        _MANAGER.pack(
+            manager.round, manager.ante, manager.money, manager.levels_version, len(blinds)
+        )
+    )
+    parts.append(struct.pack(f"<{len(blinds)}Q", *blinds))
+    parts.append(_U8.pack(len(manager.levels)))
+    for hand_type, level in manager.levels.items():
+        parts.append(_LEVEL.pack(hand_type.rank, level["chips"], level["mult"], level["lvl"]))
+    parts.append(_U16.pack(len(manager.deck)))
+    for card in manager.deck:
+        parts.append(
+            _CARD.pack(
+                card.id,
+                card.chips,
+                strings.id(card.enhances),
+                strings.id(card.seal),
+                strings.id(card.edition),
+            )
+        )
+    parts.append(_U8.pack(len(manager.held_jokers)))
+    for joker in manager.held_jokers:
+        parts.append(_JOKER.pack(joker.id, strings.id(joker.edition), joker.scored))
+
+    parts.append(_U8.pack(blind is not None))
+    if blind is not None:
+        parts.append(
+            _BLIND.pack(
+                blind.seed,
+                blind.blind,
+                blind.done,
+                blind.verbose,
+                blind.hand_size,
+                blind.num_hands,
+                blind.num_discards,
+                blind.score,
+                blind.deck_total,
+            )
+        )
+        parts.append(_U16.pack(len(blind.deck)))
+        parts.append(struct.pack(f"<{len(blind.deck)}H", *blind.deck))
+        index = blind.deck_index
+        parts.append(
+            _COUNTS.pack(
+                *index.card_counts, *index.rank_counts, *index.suit_counts, index.total
+            )
+        )
+        parts.append(_U16.pack(len(blind.dealt)))
+        dealt_idx = {}
+        for idx, card in enumerate(blind.dealt):
+            dealt_idx[id(card)] = idx
+            parts.append(
+                _DEALT.pack(
+                    card.deck_idx,
+                    card.chips,
+                    strings.id(card.enhances),
+                    strings.id(card.seal),
+                    strings.id(card.edition),
+                )
+            )
+        hand = [dealt_idx[id(card)] for card in blind.hand]
+        parts.append(_U8.pack(len(hand)))
+        parts.append(struct.pack(f"<{len(hand)}H", *hand))
+        hand_idx = {id(card): idx for idx, card in enumerate(blind.hand)}
+        selected = [hand_idx[id(card)] for card in blind.selected.values()]
+        parts.append(_U8.pack(len(selected)))
+        parts.append(bytes(selected))
+
+    parts[0] = _HEADER.pack(MAGIC, SNAPSHOT_VERSION) + strings.pack()
+    return b"".join(parts)
+
+
+def _load_strings(data: memoryview, offset: int) -> tuple[list[str | None], int]:
+    count = data[offset]
+    offset += 1
+    strings: list[str | None] = [None]
+    for _ in range(count):
+        length = data[offset]
+        offset += 1
+        strings.append(bytes(data[offset : offset + length]).decode())
+        offset += length
+    return strings, offset
+
+
+def _load_manager(
+    data: memoryview, offset: int, strings: list[str | None]
+) -> tuple[GameManagerLogic, int]:
+    manager = GameManagerLogic.__new__(GameManagerLogic)
+    rng_version, *rng_state, has_gauss, gauss = _RNG.unpack_from(data, offset)
+    offset += _RNG.size
+    # Skips seeding from the OS, since setstate replaces it all anyway
+    manager.rng = random.Random.__new__(random.Random)
+    manager.rng.setstate((rng_version, tuple(rng_state), gauss if has_gauss else None))
+    manager.round, manager.ante, manager.money, manager.levels_version, num_blinds = (
+        _MANAGER.unpack_from(data, offset)
+    )
+    offset += _MANAGER.size
+    manager.blinds = list(struct.unpack_from(f"<{num_blinds}Q", data, offset))
+    offset += 8 * num_blinds
+
+    num_levels = data[offset]
+    offset += 1
+    levels = {}
+    for rank, chips, mult, lvl in _LEVEL.iter_unpack(
+        data[offset : offset + num_levels * _LEVEL.size]
+    ):
+        levels[_HAND_TYPES[rank]] = {"chips": chips, "mult": mult, "lvl": lvl}
+    offset += num_levels * _LEVEL.size
+    manager.levels = levels
+
+    (num_cards,) = _U16.unpack_from(data, offset)
+    offset += _U16.size
+    deck = []
+    for face_id, chips, enhances, seal, edition in _CARD.iter_unpack(
+        data[offset : offset + num_cards * _CARD.size]
+    ):
+        card = CardData.from_face(_FACES[face_id])
+        card.chips = chips
+        card.enhances = strings[enhances]
+        card.seal = strings[seal]
+        card.edition = strings[edition]
+        deck.append(card)
+    offset += num_cards * _CARD.size
+    manager.deck = deck
+
+    registry = joker_registry()
+    num_jokers = data[offset]
+    offset += 1
+    held: list[JokerData] = []
+    for joker_id, edition, scored in _JOKER.iter_unpack(
+        data[offset : offset + num_jokers * _JOKER.size]
+    ):
+        joker = registry[joker_id].copy()
+        joker.edition = strings[edition]
+        joker.scored = scored
+        held.append(joker)
+    offset += num_jokers * _JOKER.size
+    manager.all_jokers = [joker.copy() for joker in registry]
+    manager.held_jokers = tuple(held)
+    return manager, offset
+
+
+def _load_blind(
+    data: memoryview, offset: int, strings: list[str | None], manager: GameManagerLogic
+) -> BlindLogic:
+    blind = BlindLogic.__new__(BlindLogic)
+    (
+        blind.seed,
+        blind.blind,
+        blind.done,
+        blind.verbose,
+        blind.hand_size,
+        blind._num_hands,
+        blind._num_discards,
+        blind.score,
+        blind.deck_total,
+    ) = _BLIND.unpack_from(data, offset)
+    offset += _BLIND.size
+    blind.manager = manager
+    blind.log = None
+    deck_cards = manager.deck
+
+    (num_deck,) = _U16.unpack_from(data, offset)
+    offset += _U16.size
+    blind.deck = list(struct.unpack_from(f"<{num_deck}H", data, offset))
+    offset += 2 * num_deck
+    *counts, total = _COUNTS.unpack_from(data, offset)
+    offset += _COUNTS.size
+    index = DeckIndex.__new__(DeckIndex)
+    index.card_counts = counts[:NUM_CARDS]
+    index.rank_counts = counts[NUM_CARDS : NUM_CARDS + NUM_RANKS]
+    index.suit_counts = counts[NUM_CARDS + NUM_RANKS :]
+    index.total = total
+    blind.deck_index = index
+
+    (num_dealt,) = _U16.unpack_from(data, offset)
+    offset += _U16.size
+    dealt = []
+    for deck_idx, chips, enhances, seal, edition in _DEALT.iter_unpack(
+        data[offset : offset + num_dealt * _DEALT.size]
+    ):
+        card = deck_cards[deck_idx].deal_copy(deck_idx)
+        card.chips = chips
+        card.enhances = strings[enhances]
+        card.seal = strings[seal]
+        card.edition = strings[edition]
+        dealt.append(card)
+    offset += num_dealt * _DEALT.size
+    blind.dealt = dealt
+
+    num_hand = data[offset]
+    offset += 1
+    hand_idx = struct.unpack_from(f"<{num_hand}H", data, offset)
+    offset += 2 * num_hand
+    blind.hand = [dealt[idx] for idx in hand_idx]
+
+    num_selected = data[offset]
+    offset += 1
+    blind.selected = {}
+    for idx in data[offset : offset + num_selected]:
+        card = blind.hand[idx]
+        card.selected = True
+        blind.selected[card.uid] = card
+    blind.selection_version = 0
+    blind._hand_type = None
+    blind.solver_cache = {}
+    blind.played = []
+    return blind
+
+
+def restore(data: bytes) -> tuple[GameManagerLogic, BlindLogic | None]:
+    """
+    Loads a snapshot. Everything loaded is new, so restoring the same
+    snapshot twice gives two independent profiles
+    Raises ValueError if data isn't a snapshot this version can read
+
+    Args:
+        data (bytes): a snapshot, as snapshot made it
+
+    Returns (tuple[GameManagerLogic, BlindLogic | None]): the profile, and its
+        blind if one was in progress. The blind doesn't record to a log
+    """
+    view = memoryview(data)
+    try:
+        magic, version = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a game snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Can't read snapshot version {version}, only {SNAPSHOT_VERSION}"
+            )
+        strings, offset = _load_strings(view, _HEADER.size)
+        manager, offset = _load_manager(view, offset, strings)
+        has_blind = view[offset]
+        offset += 1
+        blind = _load_blind(view, offset, strings, manager) if has_blind else None
+    except (IndexError, KeyError, struct.error) as error:
+        raise ValueError(f"Snapshot is corrupt: {error}") from error
+    return manager, blind
+
+
+def fork(blind: BlindLogic) -> BlindLogic:
+    """
+    Copies a blind in progress and its profile, so the copy can be played
+    without touching the original
+
+    Returns (BlindLogic): the copy, with its own manager
+    """
+    _, copy = restore(snapshot(blind.manager, blind))
+    assert copy is not None
+    return copy
+
+
+def save(path: str, manager: GameManagerLogic, blind: BlindLogic | None = None) -> None:
+    """Writes a snapshot of manager, and blind if given, to path"""
+    with open(path, "wb") as file:
+        file.write(snapshot(manager, blind))
+
+
+def load(path: str) -> tuple[GameManagerLogic, BlindLogic | None]:
+    """Reads a snapshot written by save"""
+    with open(path, "rb") as file:
+        return restore(file.read())
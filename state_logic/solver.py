@@ -0,0 +1,188 @@
+import itertools
+import random
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from state_logic.batch_scoring import MAX_CARDS, encode_hands, score_batch
+from state_logic.carddata import CardData
+
+if TYPE_CHECKING:
+    from state_logic.blind_logic import BlindLogic
+
+# Searches a blind's hand for the best play or discard. Answers are memoized in
+# BlindLogic.solver_cache, keyed by the hand and deck multisets, the held
+# jokers and the manager's levels_version, so repeat queries in a turn are
+# free. Scores come from batch_scoring, falling back to BlindLogic.score_cards
+# one selection at a time for jokers it can't vectorize.
+
+DISCARD_SAMPLES = 16  # Redraws sampled per candidate discard
+
+
+def _card_key(cards: list[CardData]) -> tuple[tuple[int, int], ...]:
+    """Order-free key for a multiset of cards"""
+    return tuple(sorted((card.id, card.chips) for card in cards))
+
+
+def _blind_key(blind: "BlindLogic") -> tuple:
+    """Parts of the memo key shared by every query"""
+    return (
+        _card_key(blind.hand),
+        tuple(joker.id for joker in blind.jokers),
+        blind.manager.levels_version,
+        blind.rules_modified,
+    )
+
+
+def _batch_scores(
+    blind: "BlindLogic", ids: np.ndarray, mask: np.ndarray, chips: np.ndarray
+) -> np.ndarray | None:
+    """
+    Scores a batch with batch_scoring. Returns None if blind's rules or
+    jokers can't be vectorized
+    """
+    if blind.rules_modified:
+        return None
+    try:
+        return score_batch(ids, mask, blind.manager.levels, blind.jokers, chips).score
+    except ValueError:
+        return None  # A joker batch scoring can't mirror
+
+
+def score_selections(blind: "BlindLogic", hands: list[list[CardData]]) -> np.ndarray:
+    """
+    Scores each selection as if it were played in blind
+
+    Returns (np.ndarray): (N,) score of each selection
+    """
+    ids, mask = encode_hands(hands)
+    chips = np.zeros(ids.shape, dtype=np.int64)
+    for row, hand in enumerate(hands):
+        chips[row, : len(hand)] = [card.chips for card in hand]
+    scores = _batch_scores(blind, ids, mask, chips)
+    if scores is None:
+        scores = np.zeros(len(hands), dtype=np.int64)
+        for row, hand in enumerate(hands):
+            _, _, hand_chips, mult = blind.score_cards(hand)
+            scores[row] = hand_chips * mult
+    return scores
+
+
+def best_play(blind: "BlindLogic") -> tuple[list[CardData], int]:
+    """
+    Tries every selection of up to 5 cards from blind.hand
+
+    Returns (tuple[list[CardData], int]): the highest scoring selection (the
+        smallest one on ties) and its score
+    """
+    if not blind.hand:
+        raise ValueError("No cards in hand to play!")
+    key = ("play", *_blind_key(blind))
+    if key not in blind.solver_cache:
+        picks = [
+            combo
+            for num_cards in range(1, min(MAX_CARDS, len(blind.hand)) + 1)
+            for combo in itertools.combinations(range(len(blind.hand)), num_cards)
+        ]
+        hand = sorted(blind.hand, key=lambda card: (card.id, card.chips))
+        scores = score_selections(blind, [[hand[idx] for idx in pick] for pick in picks])
+        best = int(scores.argmax())
+        blind.solver_cache[key] = ([hand[idx] for idx in picks[best]], int(scores[best]))
+    cards, score = blind.solver_cache[key]
+    return _in_hand(blind, cards), score
+
+
+def best_discard(
+    blind: "BlindLogic", samples: int = DISCARD_SAMPLES
+) -> tuple[list[CardData], float]:
+    """
+    Estimates, for each candidate discard, the best play after redrawing from
+    the remaining deck, by sampling redraws. Candidates are the 1-5 card
+    subsets of the cards outside the current best play (or of the whole hand
+    if that leaves nothing). After the redraw only 5 card selections are
+    scored, which is where the best play almost always is
+    Raises ValueError if no discards are left
+
+    Args:
+        blind (BlindLogic): blind in progress
+        samples (int, optional): redraws sampled per candidate
+
+    Returns (tuple[list[CardData], float]): cards to discard and the expected
+        score of the best play afterwards
+    """
+    if blind.num_discards <= 0:
+        raise ValueError(f"Cannot discard! No Discards left! {blind.num_discards=}")
+    remaining = [blind.manager.deck[idx] for idx in blind.deck]
+    key = ("discard", *_blind_key(blind), blind.deck_index.key(), samples)
+    if key not in blind.solver_cache:
+        hand = sorted(blind.hand, key=lambda card: (card.id, card.chips))
+        played, _ = best_play(blind)
+        spare = [card for card in hand if not any(card is p for p in played)] or hand
+        # Str seeds aren't salted like hash(), so estimates match in any process
+        rng = random.Random(repr(key[1:]))
+        candidates = [
+            list(combo)
+            for num_cards in range(1, min(MAX_CARDS, len(spare)) + 1)
+            for combo in itertools.combinations(spare, num_cards)
+        ]
+        redrawn: list[list[CardData]] = []
+        for discard in candidates:
+            kept = [card for card in hand if not any(card is d for d in discard)]
+            draws = min(len(discard), len(remaining))
+            for _ in range(samples):
+                redrawn.append(kept + rng.sample(remaining, draws))
+        expected = _best_scores(blind, redrawn).reshape(len(candidates), samples).mean(axis=1)
+        best = int(expected.argmax())
+        blind.solver_cache[key] = (candidates[best], float(expected[best]))
+    cards, score = blind.solver_cache[key]
+    return _in_hand(blind, cards), score
+
+
+def _best_scores(blind: "BlindLogic", hands: list[list[CardData]]) -> np.ndarray:
+    """
+    Best score among the 5 card selections (or the whole hand if smaller) of
+    each hand. Hands of the same size are expanded into selections with one
+    fancy index
+    """
+    best = np.zeros(len(hands), dtype=np.int64)
+    by_size: dict[int, list[int]] = {}
+    for row, hand in enumerate(hands):
+        by_size.setdefault(len(hand), []).append(row)
+    for size, rows in by_size.items():
+        num_cards = min(size, MAX_CARDS)
+        combos = np.array(list(itertools.combinations(range(size), num_cards)))
+        ids = np.array([[card.id for card in hands[row]] for row in rows])
+        chips = np.array([[card.chips for card in hands[row]] for row in rows])
+        sel_ids = np.zeros((len(rows) * len(combos), MAX_CARDS), dtype=np.int64)
+        sel_chips = np.zeros_like(sel_ids)
+        sel_ids[:, :num_cards] = ids[:, combos].reshape(-1, num_cards)
+        sel_chips[:, :num_cards] = chips[:, combos].reshape(-1, num_cards)
+        sel_mask = np.zeros(sel_ids.shape, dtype=bool)
+        sel_mask[:, :num_cards] = True
+        scores = _batch_scores(blind, sel_ids, sel_mask, sel_chips)
+        if scores is None:
+            scores = score_selections(
+                blind,
+                [
+                    [hands[row][idx] for idx in combo]
+                    for row in rows
+                    for combo in combos
+                ],
+            )
+        best[rows] = scores.reshape(len(rows), len(combos)).max(axis=1)
+    return best
+
+
+def _in_hand(blind: "BlindLogic", cards: list[CardData]) -> list[CardData]:
+    """
+    Maps memoized cards to the matching card objects currently in hand, since
+    a cached answer may come from an equal hand of different objects
+    """
+    pool = list(blind.hand)
+    matched = []
+    for card in cards:
+        for idx, held in enumerate(pool):
+            if held.id == card.id and held.chips == card.chips:
+                matched.append(pool.pop(idx))
+                break
+    return matched
@@ -1,17 +1,15 @@
-import time
-import copy
-
 import pygame
 
 from typing import cast
 from assets.balatro_cards_data import CARD_HEI, CARD_WID
-from state_logic.carddata import CardData
 from state_logic.blind_logic import BlindLogic
+from states.gui_elements.animation import animator
 from states.gui_elements.button import Button
-from states.gui_elements.card import Card, Joker, GUICardBase
+from states.gui_elements.card import Card, CardGroup, Joker, GUICardBase
 from states.gui_elements.card_holder import CardHolder, DeckHolder
 from states.pause import Pause
 from states.statebase import StateBase
+from states.gui_elements.pick_index import PickIndex
 from states.gui_elements.side_panel import SidePanel
 from states.gui_elements.score_animation import ScoreAnimation
 from enums import HandType
@@ -19,6 +17,8 @@ from utils import get_play_anim_start_x
 
 DRAG_THRESHOLD = 0.25
 BUTTON_COOLDOWN: float = 0.5
+# Pick index layers. Buttons take clicks over cards, and the hand over jokers
+JOKER_LAYER, HAND_LAYER, BUTTON_LAYER = 0, 1, 2
 
 
 class Gameplay(StateBase):
@@ -30,16 +30,20 @@ class Gameplay(StateBase):
     deck: DeckHolder
     sort_by_rank: bool
     held_card: GUICardBase | None
-    mouse_down_timer: float | None
+    drag_timer: int | None  # Animator timer that starts dragging held_card
     scoring_animation: ScoreAnimation | None
     side_panel: SidePanel
     last_button_click_time: float  # Safety measure to prevent duplicate clicks
+    drawn_animation: ScoreAnimation | None  # At the last dirty_rects call
+    deck_shown: bool  # If the deck's top card was shown at the last dirty_rects call
+    picker: PickIndex  # Buttons, hand and jokers, for finding what's clicked
+    hovered: Button | GUICardBase | None  # Topmost under the mouse at the last update
 
     def __init__(self, game, side_panel: SidePanel, jokers: CardHolder):
         super().__init__(game)
         # Initializes game logic and adds current game logic to side panel
         manager = self.ctx["manager"]
-        self.game_logic = BlindLogic(manager)
+        self.game_logic = BlindLogic(manager, log=self.game.event_log)
         self.side_panel = side_panel
         self.side_panel.set_blind_logic(self.game_logic)
         screen_w, screen_h = self.game.screen.get_size()
@@ -50,20 +54,22 @@ class Gameplay(StateBase):
         self.jokers = jokers
         x += int(CARD_WID * 4.5) + CARD_WID * 2
         self.deck = DeckHolder(CARD_WID, (x, y + 30), len(self.game_logic.deck), "left")
-        temp = copy.deepcopy(self.game_logic.deck[-1])
-        fake_card = Card(
-            temp.get_suit, temp.get_rank, 0, self.deck.rect.center, shown=False
-        )
+        top = self.game_logic.top_of_deck
+        fake_card = Card(top, self.deck.rect.center, shown=False)
         self.deck.add_card(fake_card)
         self.held_card = None
         self.sort_by_rank = True
-        self.mouse_down_timer = None
+        self.drag_timer = None
         self.scoring_animation = None
+        self.drawn_animation = None
+        self.deck_shown = True
+        self.picker = PickIndex()
+        self.hovered = None
         self._create_buttons()
         self.deal_to_hand()
 
     def _create_buttons(self) -> None:
-        self.last_button_click_time = time.time()
+        self.last_button_click_time = animator.now
         self.buttons = pygame.sprite.OrderedUpdates()
         hand = self.hand.rect
         play_rect = pygame.Rect((hand.x, hand.y + CARD_HEI + 10), (CARD_HEI, CARD_WID))
@@ -110,6 +116,26 @@ class Gameplay(StateBase):
             pygame.Color("white"),
         )
         self.buttons.add(play, discard, rank, suit)
+        self.picker.sync_layer(BUTTON_LAYER, self.buttons.sprites())
+
+    def sync_picker(self) -> None:
+        """
+        Brings the pick index up to date with the cards. Groups are only
+        gone over when they changed, and only cards that moved are moved
+        """
+        layers: list[tuple[int, CardGroup]] = [
+            (HAND_LAYER, self.hand.cards),
+            (JOKER_LAYER, self.jokers.cards),
+        ]
+        for layer, cards in layers:
+            self.picker.sync_layer(layer, cards.sprites(), (id(cards), cards.version))
+        for card in animator.take_moved():
+            self.picker.move(card)
+
+    def pick(self, pos: tuple[int, int]) -> Button | GUICardBase | None:
+        """Gets the topmost button or card at pos"""
+        self.sync_picker()
+        return cast(Button | GUICardBase | None, self.picker.pick(pos))
 
     def sort_rank(self) -> None:
         """
@@ -209,24 +235,23 @@ class Gameplay(StateBase):
         Deals cards from deck into hand
         """
         if not self.game_logic.done:
-            hand_num_empty = self.game_logic.hand_size - len(self.game_logic.hand)
+            num_held = len(self.game_logic.hand)
+            if num_held == self.game_logic.hand_size:
+                return
             self.game_logic.deal_to_hand()
-            if hand_num_empty != 0:
-                for card_data in self.game_logic.hand[-hand_num_empty:]:
-                    card = Card(
-                        card_data.get_suit,
-                        card_data.get_rank,
-                        card_data.chips,
-                        self.deck.rect.center,
-                    )  # places center of deck 1.5 card_h above bottom of screen
-                    self.hand.add_card(card)
-                self.sort_cards()
+            # Only what was dealt, which is less than the gap if the deck ran out
+            for card_data in self.game_logic.hand[num_held:]:
+                card = Card(
+                    card_data, self.deck.rect.center
+                )  # places center of deck 1.5 card_h above bottom of screen
+                self.hand.add_card(card)
+            self.sort_cards()
 
     def play_hand(self) -> None:
         """
         Plays hand
         """
-        current_time = time.time()
+        current_time = animator.now
         if (
             self.game_logic.num_selected() > 0
             and not self.scoring_animation
@@ -239,9 +264,9 @@ class Gameplay(StateBase):
             _, screen_h = self.game.screen.get_size()
             start_x = get_play_anim_start_x(self.game.screen, len(played_card_datas))
             played: list[Card] = []
+            scoring = {card_data.uid for card_data in played_card_datas}
             for card in self.hand_ordered:
-                card_data = self.convert_to_card_data(card)
-                if card_data in played_card_datas and card.selected:
+                if card.card_data.uid in scoring and card.selected:
                     card.set_target_pos((start_x, screen_h // 2))
                     start_x += card.rect.w + 30  # SPACING
                     played.append(card)
@@ -270,15 +295,17 @@ class Gameplay(StateBase):
                     x, _ = self.game.screen.get_size()
                     card.set_target_pos((x - 10, card.rect.y + 10))
                     card.kill()
+            self.hand_ordered = [card for card in self.hand_ordered if card.alive()]
             if self.game_logic.deck:
                 self.deal_to_hand()
+            else:  # Nothing to deal, so close the gaps left behind
+                self._sort_adjust_pos(self.hand_ordered)
             self.side_panel.update_hand_type(HandType.EMPTY)
 
     def select_card(self, card: Card) -> None:
         if card.selected or self.game_logic.num_selected() < 5:
-            card_data = self.convert_to_card_data(card)
             card.toggle_select()
-            self.game_logic.select_card(card_data)
+            self.game_logic.select_card(card.card_data)
             self.side_panel.update_hand_type(self.game_logic.get_hand_type())
 
     def handle_event(self, event: pygame.event.Event) -> None:
@@ -289,24 +316,20 @@ class Gameplay(StateBase):
             self.game.quit()
         if event.type == pygame.MOUSEBUTTONDOWN and pygame.mouse.get_pressed()[0]:
             self.side_panel.handle_event(event)
-            for button in self.buttons.sprites():
-                if isinstance(button, Button) and button.hovered:
-                    button.callback()
-                    return
-            # Reversed to scan cards from top layer to bottom
-            for card_holder in [self.hand, self.jokers]:
-                assert isinstance(card_holder, CardHolder)
-                for card in card_holder.cards.sprites()[::-1]:
-                    if not self.scoring_animation and card.rect.collidepoint(event.pos):
-                        self.mouse_down_timer = time.time()
-                        self.held_card = card
-                        return
+            picked = self.pick(event.pos)
+            if isinstance(picked, Button):
+                picked.callback()
+                return
+            if picked is not None and not self.scoring_animation:
+                self.drag_timer = animator.after(DRAG_THRESHOLD, self.start_drag)
+                self.held_card = picked
+                return
 
         if event.type == pygame.MOUSEBUTTONUP:
-            if self.mouse_down_timer is not None:
-                elapsed_time = time.time() - self.mouse_down_timer
-                if elapsed_time < DRAG_THRESHOLD and isinstance(self.held_card, Card):
-                    self.select_card(self.held_card)
+            # Released before the drag started, so it was a click
+            if animator.cancel(self.drag_timer) and isinstance(self.held_card, Card):
+                self.select_card(self.held_card)
+            self.drag_timer = None
             if self.held_card and self.held_card.follow_mouse:
                 dropped_x = event.pos[0]
                 self.sort_by_custom(dropped_x)
@@ -319,8 +342,11 @@ class Gameplay(StateBase):
 
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
+                animator.cancel(self.drag_timer)
+                self.drag_timer = None
                 if self.held_card:
-                    self.held_card.toggle_mouse_follow()
+                    if self.held_card.follow_mouse:
+                        self.held_card.toggle_mouse_follow()
                     self.held_card = None
                 Pause(self.game)
             if event.key == pygame.K_UP:
@@ -340,34 +366,28 @@ class Gameplay(StateBase):
         else:
             self.exit_state()
 
-    def convert_to_card_data(self, card: Card) -> CardData:
+    def start_drag(self) -> None:
         """
-        Gets CardData in hand that matches the GUI Card
+        Makes the held card follow the mouse. Called once the mouse has been
+        held down for DRAG_THRESHOLD, or moved off the card before then
         """
-        ###TODO: Will need to change this bevuase you can have copies of the same card
-        ### Will probably need to use indexing and sort the cards in game_logic
-        suit, rank = card.suit, card.rank
-        for card_data in self.game_logic.hand:
-            if card_data.get_suit == suit and card_data.get_rank == rank:
-                return card_data
-        raise ValueError("Matching card not found in hand")
+        animator.cancel(self.drag_timer)
+        self.drag_timer = None
+        if self.held_card:
+            self.held_card.toggle_mouse_follow()
 
     def update(self, dt: float) -> None:
-        # checks if card is dragged or clicked
-        dragged = False
-        if self.mouse_down_timer is not None and self.held_card:
-            if not self.held_card.rect.collidepoint(pygame.mouse.get_pos()):
-                dragged = True  # if user drags the card away even before the threshold
-            elapsed = time.time() - self.mouse_down_timer
-            if elapsed >= DRAG_THRESHOLD:
-                dragged = True
-            if dragged:
-                self.mouse_down_timer = None  # Reset timer
-                self.held_card.toggle_mouse_follow()
+        mouse_pos = pygame.mouse.get_pos()  # The step's one mouse sample
+        animator.step(dt, mouse_pos)
+        # if user drags the card away even before the threshold
+        if self.drag_timer is not None and self.held_card:
+            if not self.held_card.rect.collidepoint(mouse_pos):
+                self.start_drag()
 
+        self.hovered = self.pick(mouse_pos)
         for button in self.buttons.sprites():
             if isinstance(button, Button):
-                button.update(dt)
+                button.hovered = button is self.hovered
         self.hand.update(dt)
         self.jokers.update(dt)
         self.deck.update(dt, self.game_logic.deck_remaining)
@@ -381,7 +401,32 @@ class Gameplay(StateBase):
                 self.side_panel.update_hand_type(HandType.EMPTY)
                 self.discard(just_played=True)
 
-        self.side_panel.update(dt)
+        self.side_panel.update(dt, mouse_pos)
+
+    def busy(self) -> bool:
+        return self.scoring_animation is not None or self.held_card is not None
+
+    def dirty_rects(self) -> list[pygame.Rect]:
+        rects = []
+        holders: list[CardHolder] = [self.hand, self.jokers, self.deck]
+        for holder in holders:
+            rects += holder.dirty_rects()
+            rects += holder.cards.dirty_rects()
+        for button in self.buttons.sprites():
+            if isinstance(button, Button):
+                rects += button.dirty_rects()
+        rects += self.side_panel.dirty_rects()
+        if self.scoring_animation is not None:
+            rects += self.scoring_animation.dirty_rects()
+        if self.drawn_animation is not self.scoring_animation:
+            if self.drawn_animation is not None:
+                rects.append(self.drawn_animation.rect.copy())
+            self.drawn_animation = self.scoring_animation
+        deck_shown = bool(self.game_logic.deck)
+        if deck_shown != self.deck_shown:
+            self.deck_shown = deck_shown
+            rects.append(self.deck.rect.copy())
+        return rects
 
     def draw(self, screen: pygame.surface.Surface) -> None:
         screen.fill("darkgreen")
@@ -5,6 +5,7 @@ import pygame
 
 from assets.balatro_cards_data import CARD_HEI, CARD_WID
 from state_logic.game_manager import GameManagerLogic
+from states.gui_elements.animation import animator
 from states.gui_elements.button import Button
 from states.gui_elements.side_panel import SidePanel
 from states.gui_elements.card import Joker
@@ -79,12 +80,22 @@ class BlindSelect(StateBase):
         Gameplay(self.game, self.side_panel, self.jokers)
 
     def update(self, dt: float) -> None:
+        mouse_pos = pygame.mouse.get_pos()  # The step's one mouse sample
+        animator.step(dt, mouse_pos)
         for button in self.buttons.sprites():
             if isinstance(button, Button):
-                button.update(dt)
-        self.side_panel.update(dt)
+                button.update(dt, mouse_pos)
+        self.side_panel.update(dt, mouse_pos)
         self.jokers.update(dt)
 
+    def dirty_rects(self) -> list[pygame.Rect]:
+        rects = self.jokers.dirty_rects() + self.jokers.cards.dirty_rects()
+        for button in self.buttons.sprites():
+            if isinstance(button, Button):
+                rects += button.dirty_rects()
+        rects += self.side_panel.dirty_rects()
+        return rects
+
     def draw(self, screen: pygame.surface.Surface) -> None:
         screen.fill("darkgreen")
         self.buttons.draw(screen)
@@ -97,4 +108,3 @@ class BlindSelect(StateBase):
             (400, 150),
             pygame.Color("white"),
         )
-        pygame.display.flip()
@@ -0,0 +1,339 @@
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+import pygame
+
+if TYPE_CHECKING:
+    from states.gui_elements.card import GUICardBase
+
+# Every moving card and timed animation, advanced together once a step. Cards
+# keep their positions, targets and offsets in shared arrays, so a step moves
+# all of them in one vectorized pass instead of each card building vectors.
+# Timed tweens run on the animator's own clock, which only moves while a state
+# steps it, so a paused game pauses its animations too. Game steps states by a
+# fixed dt, so this clock is the game time every state reads, and animations
+# play out the same however fast frames are drawn
+
+CARD_SPEED = 10  # Fraction of the remaining distance covered per second
+MIN_STEP = 5  # Slowest a moving card goes per step, in pixels
+SNAP_DISTANCE = 5  # Cards closer than this to their target jump onto it
+
+EASES: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "linear": lambda t: t,
+    "in_quad": lambda t: t * t,
+    "out_quad": lambda t: t * (2 - t),
+    "in_out": lambda t: t * t * (3 - 2 * t),
+    "pulse": lambda t: np.sin(np.pi * t),  # Rises to 1 halfway, back to 0
+}
+EASE_NAMES = list(EASES)
+
+
+class Animator:
+    """
+    Moves cards toward their targets and runs timed tweens. Cards are added
+    while they're in a sprite group, which is when they used to be updated
+    """
+
+    now: float  # Seconds stepped so far
+    # Cards, by slot
+    sprites: list["GUICardBase | None"]
+    pos: np.ndarray  # (slots, 2) float centers
+    prev: np.ndarray  # (slots, 2) centers before the last step, to interpolate
+    target: np.ndarray  # (slots, 2) rest centers
+    offset: np.ndarray  # (slots, 2) drawn offset from pos, set by tweens
+    follow: np.ndarray  # (slots,) True if following the mouse
+    stale: np.ndarray  # (slots,) True if the rect needs rewriting
+    free_slots: list[int]
+    cards_moving: bool  # True if a card moved or followed the mouse last step
+    moved: set["GUICardBase"]  # Cards whose rects were rewritten, until taken
+    # Timed tweens, by slot
+    tween_ids: list[int | None]
+    start: np.ndarray  # (slots,) clock time the tween started
+    duration: np.ndarray  # (slots,)
+    begin: np.ndarray  # (slots,) value at the start
+    change: np.ndarray  # (slots,) end value minus begin
+    ease: np.ndarray  # (slots,) index into EASE_NAMES
+    on_update: list[Callable[[float], None] | None]
+    on_done: list[Callable[[], None] | None]
+    free_tweens: list[int]
+    tween_slots: dict[int, int]  # Live tween ids to their slots
+    next_id: int
+
+    def __init__(self, capacity: int = 64):
+        self.now = 0.0
+        self.sprites = []
+        self.pos = np.zeros((capacity, 2))
+        self.prev = np.zeros((capacity, 2))
+        self.target = np.zeros((capacity, 2))
+        self.offset = np.zeros((capacity, 2))
+        self.follow = np.zeros(capacity, dtype=bool)
+        self.stale = np.zeros(capacity, dtype=bool)
+        self.free_slots = []
+        self.cards_moving = False
+        self.moved = set()
+        self.tween_ids = []
+        self.start = np.zeros(capacity)
+        self.duration = np.zeros(capacity)
+        self.begin = np.zeros(capacity)
+        self.change = np.zeros(capacity)
+        self.ease = np.zeros(capacity, dtype=np.intp)
+        self.on_update = []
+        self.on_done = []
+        self.free_tweens = []
+        self.tween_slots = {}
+        self.next_id = 0
+
+    @staticmethod
+    def _grown(array: np.ndarray, size: int) -> np.ndarray:
+        """Copies array into one with room for at least size rows"""
+        if size <= len(array):
+            return array
+        grown = np.zeros((max(size, 2 * len(array)),) + array.shape[1:], array.dtype)
+        grown[: len(array)] = array
+        return grown
+
+    def add(self, sprite: "GUICardBase") -> None:
+        """
+        Starts moving sprite, from where its rect is toward its target_pos
+        """
+        if sprite.anim_slot is not None:
+            return
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.sprites[slot] = sprite
+        else:
+            slot = len(self.sprites)
+            self.sprites.append(sprite)
+            for name in ("pos", "prev", "target", "offset", "follow", "stale"):
+                setattr(self, name, self._grown(getattr(self, name), slot + 1))
+        sprite.anim_slot = slot
+        self.pos[slot] = self.prev[slot] = sprite.rect.center
+        self.target[slot] = sprite.target_pos
+        self.offset[slot] = 0
+        self.follow[slot] = sprite.follow_mouse
+        self.stale[slot] = False
+
+    def remove(self, sprite: "GUICardBase") -> None:
+        """Stops moving sprite, leaving it where it is"""
+        slot = sprite.anim_slot
+        if slot is None:
+            return
+        sprite.anim_slot = None
+        self.sprites[slot] = None
+        self.follow[slot] = False
+        self.target[slot] = self.prev[slot] = self.pos[slot]
+        self.offset[slot] = 0
+        self.stale[slot] = False
+        self.free_slots.append(slot)
+
+    def reset(self) -> None:
+        """
+        Drops every card and tween and starts the clock over, for a new Game
+        in the same process, like the rendering benchmark's repeats
+        """
+        for sprite in self.sprites:
+            if sprite is not None:
+                sprite.anim_slot = None
+        self.__init__()  # type: ignore[misc]
+
+    def set_target(self, sprite: "GUICardBase", pos: tuple[int, int]) -> None:
+        if sprite.anim_slot is not None:
+            self.target[sprite.anim_slot] = pos
+
+    def set_follow(self, sprite: "GUICardBase", follow: bool) -> None:
+        if sprite.anim_slot is not None:
+            self.follow[sprite.anim_slot] = follow
+
+    def set_offset(self, sprite: "GUICardBase", offset: tuple[float, float]) -> None:
+        """Draws sprite offset from where it is, without moving it"""
+        if sprite.anim_slot is not None:
+            self.offset[sprite.anim_slot] = offset
+            self.stale[sprite.anim_slot] = True
+
+    def tween(
+        self,
+        duration: float,
+        on_update: Callable[[float], None] | None = None,
+        on_done: Callable[[], None] | None = None,
+        begin: float = 0.0,
+        end: float = 1.0,
+        ease: str = "linear",
+    ) -> int:
+        """
+        Starts a timed tween of a value
+
+        Args:
+            duration (float): seconds the tween runs for
+            on_update (Callable[[float], None], optional): called with the
+                eased value every step, and once with its end value
+            on_done (Callable[[], None], optional): called once it's over
+            begin (float, optional): value at the start. Defaults to 0
+            end (float, optional): value at the end. Defaults to 1
+            ease (str, optional): name of a curve in EASES. Defaults to linear
+
+        Returns (int): id of the tween, for cancel
+        """
+        if self.free_tweens:
+            slot = self.free_tweens.pop()
+        else:
+            slot = len(self.tween_ids)
+            self.tween_ids.append(None)
+            self.on_update.append(None)
+            self.on_done.append(None)
+            for name in ("start", "duration", "begin", "change", "ease"):
+                setattr(self, name, self._grown(getattr(self, name), slot + 1))
+        tween_id = self.next_id
+        self.next_id += 1
+        self.tween_ids[slot] = tween_id
+        self.tween_slots[tween_id] = slot
+        self.start[slot] = self.now
+        self.duration[slot] = duration
+        self.begin[slot] = begin
+        self.change[slot] = end - begin
+        self.ease[slot] = EASE_NAMES.index(ease)
+        self.on_update[slot] = on_update
+        self.on_done[slot] = on_done
+        return tween_id
+
+    def after(self, delay: float, callback: Callable[[], None]) -> int:
+        """
+        Calls callback once delay seconds have been stepped
+
+        Returns (int): id of the timer, for cancel
+        """
+        return self.tween(delay, on_done=callback)
+
+    def cancel(self, tween_id: int | None) -> bool:
+        """
+        Stops a tween or timer without calling its callbacks
+
+        Returns (bool): True if it hadn't finished yet
+        """
+        slot = self.tween_slots.pop(tween_id, None) if tween_id is not None else None
+        if slot is None:
+            return False
+        self.tween_ids[slot] = None
+        self.on_update[slot] = None
+        self.on_done[slot] = None
+        self.free_tweens.append(slot)
+        return True
+
+    def is_running(self, tween_id: int | None) -> bool:
+        return tween_id in self.tween_slots
+
+    def busy(self) -> bool:
+        """True if anything is animating, so frames should be drawn often"""
+        return self.cards_moving or bool(self.tween_slots)
+
+    def step(self, dt: float, mouse_pos: tuple[int, int] | None = None) -> None:
+        """
+        Advances the clock, every card and every tween by dt seconds
+
+        Args:
+            dt (float): seconds to advance
+            mouse_pos (tuple[int, int], optional): where cards following the
+                mouse go. Defaults to None, reading the mouse if any card is
+        """
+        self.now += dt
+        self._step_tweens()
+        self._step_cards(dt, mouse_pos)
+
+    def take_moved(self) -> set["GUICardBase"]:
+        """Gets the cards whose rects changed since the last call"""
+        moved = self.moved
+        self.moved = set()
+        return moved
+
+    def _step_cards(self, dt: float, mouse_pos: tuple[int, int] | None) -> None:
+        count = len(self.sprites)
+        self.cards_moving = False
+        if count == 0:
+            return
+        pos = self.pos[:count]
+        self.prev[:count] = pos
+        target = self.target[:count]
+        follow = self.follow[:count]
+        if follow.any():
+            target = target.copy()
+            target[follow] = mouse_pos if mouse_pos is not None else pygame.mouse.get_pos()
+        delta = target - pos
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        moving = dist > 0
+        if moving.any():
+            step = np.clip(CARD_SPEED * dist * dt, MIN_STEP, dist)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scale = np.where(dist < SNAP_DISTANCE, 1.0, step / dist)
+            pos += delta * np.where(moving, scale, 0.0)[:, None]
+        self.cards_moving = bool(moving.any() or follow.any())
+        moved = moving | self.stale[:count]
+        if not moved.any():
+            return
+        self.stale[:count] = False
+        drawn = np.rint(pos + self.offset[:count]).astype(int).tolist()
+        for slot in np.flatnonzero(moved).tolist():
+            sprite = self.sprites[slot]
+            if sprite is not None:
+                sprite.rect.center = drawn[slot]
+                self.moved.add(sprite)
+
+    def interpolate(self, alpha: float) -> None:
+        """
+        Puts cards that moved last step alpha of the way from where they were
+        to where they are, so frames drawn between steps move smoothly. Those
+        cards are put back on their real positions by the next step
+
+        Args:
+            alpha (float): fraction of a step since the last one, 0 to 1
+        """
+        count = len(self.sprites)
+        if count == 0:
+            return
+        pos = self.pos[:count]
+        prev = self.prev[:count]
+        moved = (pos != prev).any(axis=1)
+        if not moved.any():
+            return
+        self.stale[:count] |= moved
+        drawn = np.rint(prev + (pos - prev) * alpha + self.offset[:count])
+        drawn = drawn.astype(int).tolist()
+        for slot in np.flatnonzero(moved).tolist():
+            sprite = self.sprites[slot]
+            if sprite is not None:
+                sprite.rect.center = drawn[slot]
+                self.moved.add(sprite)
+
+    def _step_tweens(self) -> None:
+        count = len(self.tween_ids)
+        if not self.tween_slots:
+            return
+        live = np.array([tween_id is not None for tween_id in self.tween_ids])
+        duration = self.duration[:count]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            progress = np.where(
+                duration > 0, (self.now - self.start[:count]) / duration, 1.0
+            )
+        progress = np.clip(progress, 0.0, 1.0)
+        eased = progress.copy()
+        ease = self.ease[:count]
+        for index in np.unique(ease[live]).tolist():
+            picked = ease == index
+            eased[picked] = EASES[EASE_NAMES[index]](progress[picked])
+        values = (self.begin[:count] + self.change[:count] * eased).tolist()
+        finished = (progress >= 1.0).tolist()
+        # Callbacks can start and cancel tweens, so ids are checked as they run
+        ids = list(self.tween_ids)
+        for slot in np.flatnonzero(live).tolist():
+            tween_id = ids[slot]
+            if self.tween_ids[slot] != tween_id:
+                continue  # Cancelled by an earlier callback
+            on_update = self.on_update[slot]
+            if on_update is not None:
+                on_update(values[slot])
+            if finished[slot] and self.tween_ids[slot] == tween_id:
+                on_done = self.on_done[slot]
+                self.cancel(tween_id)
+                if on_done is not None:
+                    on_done()
+
+
+animator = Animator()
@@ -30,6 +30,7 @@ class Button(pygame.sprite.Sprite):
         self.text_color = text_color
         self.font = font or pygame.font.SysFont("Arial", 20)
         self.hovered = False
+        self.dirty = True
 
         # Create an image surface for the button
         self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA)
@@ -49,14 +50,30 @@ class Button(pygame.sprite.Sprite):
             center=(self.rect.width // 2, self.rect.height // 2)
         )
         self.image.blit(text_surf, text_rect)
+        self.dirty = True
 
-    def update(self, dt: float):
+    def update(self, dt: float, mouse_pos: tuple[int, int] | None = None):
         """
         Update the button state (e.g., hover state) every frame.
+
+        Args:
+            dt (float): seconds since the last update
+            mouse_pos (tuple[int, int], optional): the frame's mouse sample.
+                Defaults to None, reading the mouse
         """
-        mouse_pos = pygame.mouse.get_pos()
+        if mouse_pos is None:
+            mouse_pos = pygame.mouse.get_pos()
         self.hovered = self.rect.collidepoint(mouse_pos)
 
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """
+        Gets the button's rect if it was rendered since the last call
+        """
+        if not self.dirty:
+            return []
+        self.dirty = False
+        return [self.rect.copy()]
+
     def callback(self) -> None:
         self.callback_f()
         return
@@ -1,14 +1,36 @@
 import pygame
 
-import time
-import assets.balatro_cards_data as assets
+import assets.card_atlas as atlas
 from assets.balatro_cards_data import CARD_HEI, CARD_WID
+from render_backend import card_batch
+from state_logic.carddata import CardData
 from state_logic.jokerdata import JokerData
-from typing import Generic, TypeVar
+from states.gui_elements.animation import animator
+from typing import Callable, Generic, TypeVar
 from enums import Rank, Suit
 
 CARD_WID = 71
 CARD_HEI = 95
+SHADOW_OFFSET = 10  # How far a held card's shadow falls down and right
+SCORE_HOP = 20  # How far a scoring joker jumps up
+SCORE_HOP_TIME = 1.0
+
+# Card decorations, drawn once per card size and shared by every card
+_shadows: dict[tuple[int, int], pygame.surface.Surface] = {}
+
+
+def get_shadow(size: tuple[int, int]) -> pygame.surface.Surface:
+    """
+    Gets the shared drop shadow for a held card of size. Never draw on it
+    """
+    shadow = _shadows.get(size)
+    if shadow is None:
+        shadow = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(
+            shadow, (0, 0, 0, 150), shadow.get_rect(), border_radius=10
+        )
+        _shadows[size] = shadow
+    return shadow
 
 class GUICardBase(pygame.sprite.Sprite):
 
@@ -19,6 +41,9 @@ class GUICardBase(pygame.sprite.Sprite):
     shown: bool
     target_pos: tuple[int, int]
     follow_mouse: bool
+    drawn_rect: pygame.Rect | None  # Footprint at the last dirty_rects call
+    drawn_image: pygame.surface.Surface | None
+    anim_slot: int | None  # Slot in the animator, while in a group
 
     def __init__(
         self,
@@ -28,47 +53,45 @@ class GUICardBase(pygame.sprite.Sprite):
         shown: bool = True,
         *groups: pygame.sprite.OrderedUpdates,
     ):
-        super().__init__(*groups)
-        self.image = pygame.Surface((CARD_WID, CARD_HEI), pygame.SRCALPHA)
-        self.image.fill((0, 0, 0, 0))
-        wid, hei = self.image.get_size()[0], self.image.get_size()[1]
-        card_image = pygame.Rect(0, 0, wid, hei)
-        pygame.draw.rect(
-            self.image, pygame.Color("grey90"), card_image, border_radius=7
-        )
-        pygame.draw.rect(
-            self.image, pygame.Color("grey70"), card_image, width=1, border_radius=7
-        )
+        """
+        Args:
+            front (pygame.surface.Surface): framed face, usually shared from
+                the card atlas. Never drawn on
+            back (pygame.surface.Surface): framed back, same as front
+        """
+        super().__init__()
         self.front = front
         self.back = back
+        self.image = front if shown else back
         self.rect = self.image.get_rect()
         self.rect.center = pos
         self.target_pos = pos
         self.follow_mouse = False
-        self.shown = not shown
-        self.toggle_show()
+        self.shown = shown
+        self.drawn_rect = None
+        self.drawn_image = None
+        self.anim_slot = None
+        self.add(*groups)  # Once it has a rect for the animator
 
     def toggle_show(self) -> None:
         """
         Toggles if card is shown (as in whether front vs back of card is displayed)
         """
         self.shown = not self.shown
-        self.image.fill((0, 0, 0, 0))
-        wid, hei = self.image.get_size()[0], self.image.get_size()[1]
-        card_image = pygame.Rect(0, 0, wid, hei)
-        pygame.draw.rect(
-            self.image, pygame.Color("grey90"), card_image, border_radius=7
-        )
-        pygame.draw.rect(
-            self.image, pygame.Color("grey70"), card_image, width=1, border_radius=7
-        )
-        if self.shown:
-            self.image.blit(self.front, (0, 0))
-        else:
-            self.image.blit(self.back, (0, 0))
+        self.image = self.front if self.shown else self.back
 
     def toggle_mouse_follow(self) -> None:
         self.follow_mouse = not self.follow_mouse
+        animator.set_follow(self, self.follow_mouse)
+
+    def add_internal(self, group) -> None:
+        super().add_internal(group)
+        animator.add(self)
+
+    def remove_internal(self, group) -> None:
+        super().remove_internal(group)
+        if not self.groups():
+            animator.remove(self)
 
 
     def draw(self, screen: pygame.surface.Surface) -> None:
@@ -81,50 +104,38 @@ class GUICardBase(pygame.sprite.Sprite):
             is_held (bool, optional): True if card is currently held. Defaults
                 to True
         """
+        x, y = self.rect.topleft
         if self.follow_mouse:
-            shadow = self.rect.copy()
-            shadow.y += 10
-            shadow.x += 10
-            trans_surf = pygame.Surface((shadow.width, shadow.height), pygame.SRCALPHA)
-            pygame.draw.rect(
-                trans_surf,
-                (0, 0, 0, 150),
-                (0, 0, shadow.width, shadow.height),
-                border_radius=10,
-            )
-            screen.blit(trans_surf, (shadow.x, shadow.y))
-        screen.blit(self.image, (self.rect.x, self.rect.y))
-
-    def update(self, dt: float) -> None:
-        if self.rect.center != self.target_pos or self.follow_mouse:
-            self.rect.center = self.smooth_animation(dt)
-
-    def smooth_animation(self, dt: float) -> tuple[int, int]:
-        """
-        Smooths movement of card from its location to target location
+            shadow = get_shadow(self.image.get_size())
+            screen.blit(shadow, (x + SHADOW_OFFSET, y + SHADOW_OFFSET))
+        batch = card_batch()  # Drawn later in one call, when rendering with GL
+        if batch is None or not batch.add(self.image, (x, y)):
+            screen.blit(self.image, (x, y))
 
-        Args:
-            dt (float): delta time
+    def footprint(self) -> pygame.Rect:
+        """
+        Gets the area the card covers when drawn, shadow included
         """
-        # https://stackoverflow.com/questions/64087982/how-to-make-smooth-movement-in-pygame
-        # used above thread to create the smooth animation
-        Vector2 = pygame.math.Vector2
-        target_x, target_y = self.target_pos
+        # draw blits the whole image at rect's corner, whatever rect's size
+        drawn = pygame.Rect(self.rect.topleft, self.image.get_size())
         if self.follow_mouse:
-            target_x, target_y = pygame.mouse.get_pos()
-        target_vector = Vector2(target_x, target_y)
-        follower_vector = Vector2(self.rect.centerx, self.rect.centery)
-        distance = follower_vector.distance_to(target_vector)
-        if distance < 5:
-            return (target_x, target_y)
-        # Calculate the normalized direction vector from the current position to the target
-        direction_vector = (target_vector - follower_vector).normalize()
-        # Compute the step distance (using 10 as a speed multiplier; adjust as needed)
-        step_distance = 10 * distance * dt
-        # Ensure we don't move farther than the remaining distance
-        step_distance = max(min(step_distance, distance), 5)
-        new_follower_vector = follower_vector + direction_vector * step_distance
-        return (int(new_follower_vector.x), int(new_follower_vector.y))
+            return drawn.union(drawn.move(SHADOW_OFFSET, SHADOW_OFFSET))
+        return drawn
+
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """
+        Gets where the card was and where it is now if it moved, flipped or
+        was picked up since the last call. Empty if nothing changed
+        """
+        footprint = self.footprint()
+        if footprint == self.drawn_rect and self.image is self.drawn_image:
+            return []
+        rects = [footprint]
+        if self.drawn_rect is not None:
+            rects.append(self.drawn_rect)
+        self.drawn_rect = footprint
+        self.drawn_image = self.image
+        return rects
 
     def set_target_pos(self, pos: tuple[int, int]) -> None:
         """
@@ -134,54 +145,39 @@ class GUICardBase(pygame.sprite.Sprite):
             pos (tuple[int, int]): x, y position for card
         """
         self.target_pos = pos
+        animator.set_target(self, pos)
 
 
 Alpha = TypeVar('Alpha', bound=GUICardBase)
 
 class Joker(GUICardBase):
-    anim_start_time: float | None
 
     def __init__(self, jokerdata: JokerData, pos: tuple[int, int], shown: bool = True, *groups):
         self.name = jokerdata.name
         self.jokerdata = jokerdata
-        self.anim_start_time = None
-        front, back = assets.get_joker_sprites()
+        front, back = atlas.joker_sprites()
         super().__init__(pos, front, back, shown, *groups)
-        self.width, self.height = self.rect.size
 
 
-    def score_anim(self) -> bool:
-        if self.anim_start_time is None:
-            self.anim_start_time = time.time()
-        print("animating")
-        duration = 0.5
-        current_time = time.time()
-        elapsed_time = current_time - self.anim_start_time
-        print(elapsed_time)
+    def score_anim(self, on_done: Callable[[], None] | None = None) -> None:
+        """
+        Hops the joker up and back down to show it scored
 
+        Args:
+            on_done (Callable[[], None], optional): called once it lands
+        """
 
-        if elapsed_time < duration:
-            # Calculate scale factor as a function of time
-            scale_factor = ((elapsed_time - duration) / duration)  # Scales up initially
-        elif elapsed_time < duration * 2:
-            # Scale factor should decrease after max size is reached
-            scale_factor = 1 - ((elapsed_time - duration) / duration)
-        else:
-            # Reset the card to its original size after animation ends
-            self.rect.width = self.width
-            self.rect.height = self.height
-            self.anim_start_time = None
-            return False
+        def hop(height: float) -> None:
+            animator.set_offset(self, (0, -height))
 
-        # Apply the scale factor
-        self.rect = self.rect.scale_by(1 * scale_factor, 1 * scale_factor)
-        return True
+        animator.tween(SCORE_HOP_TIME, hop, on_done, end=SCORE_HOP, ease="pulse")
 
     def __repr__(self):
         return f"Joker: {self.name.capitalize()}"
 
 
 class Card(GUICardBase):
+    card_data: CardData  # The card this shows, so it maps back in O(1)
     suit: Suit
     rank: Rank
     front: pygame.surface.Surface
@@ -192,19 +188,23 @@ class Card(GUICardBase):
 
     def __init__(
         self,
-        suit: Suit,
-        rank: Rank,
-        chips: int,
+        card_data: CardData,
         pos: tuple[int, int],
         shown: bool = True,
         *groups: pygame.sprite.OrderedUpdates,
     ):
-        self.suit = suit
-        self.rank = rank
-        self.chips = chips
+        """
+        Args:
+            card_data (CardData): card to show. Cards are compared by
+                identity, so duplicate cards are separate sprites
+        """
+        self.card_data = card_data
+        self.suit = card_data.get_suit
+        self.rank = card_data.get_rank
+        self.chips = card_data.chips
         self.selected = False
-        front = assets.get_cardf_sprite(self.suit, self.rank)
-        back = assets.get_cardb_sprite()
+        front = atlas.card_front(self.suit, self.rank)
+        back = atlas.card_back()
         super().__init__(pos, front, back, shown, *groups)
 
 
@@ -219,23 +219,40 @@ class Card(GUICardBase):
     def __repr__(self):
         return f"Card: {self.rank.name.capitalize()} of {self.suit.name.capitalize()}s"
 
-    def __eq__(self, value):
-        if isinstance(value, Card):
-            return self.rank == value.rank and self.suit == value.suit
-        else:
-            return False
-
-    def __hash__(self):
-        """
-        Needed to add if i added an __eq__ method
-        """
-        return hash((self.suit, self.rank))
-
 class CardGroup(pygame.sprite.OrderedUpdates, Generic[Alpha]):
     """
     pygame Group class that allows extra functionality
     """
 
+    lost: list[pygame.Rect]  # Where removed cards were last drawn
+    version: int  # Bumped whenever cards are added, removed or reordered
+
+    def __init__(self, *cards: Alpha):
+        self.lost = []
+        self.version = 0
+        super().__init__(*cards)
+
+    def add_internal(self, sprite: Alpha, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        self.version += 1
+
+    def remove_internal(self, sprite: Alpha) -> None:
+        super().remove_internal(sprite)
+        self.version += 1
+        if sprite.drawn_rect is not None:
+            self.lost.append(sprite.drawn_rect)
+
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """
+        Gets the areas the cards changed since the last call, including where
+        removed cards were. Reordering cards counts as removing them
+        """
+        rects = self.lost
+        self.lost = []
+        for card in self.sprites():
+            rects += card.dirty_rects()
+        return rects
+
     # Only reason for this overwrite is to enforce return type of Card for mypy
     def sprites(self) -> list[Alpha]:
         return super().sprites()
@@ -1,6 +1,7 @@
 import pygame
 
 from states.gui_elements.card import CARD_HEI, CARD_WID, Card, Joker, CardGroup, Alpha
+from states.gui_elements.fonts import get_font
 
 from typing import Generic
 
@@ -15,6 +16,8 @@ class CardHolder(pygame.sprite.Sprite, Generic[Alpha]):
     pos: tuple[int, int]
     text_pos: tuple[int, int]
     font: pygame.font.Font
+    drawn_text: pygame.Rect | None  # Text's rect at the last dirty_rects call
+    drawn_text_image: pygame.surface.Surface | None
 
     def __init__(
         self, w: int, center_pos: tuple[int, int], num_slots: int, text_side: str
@@ -32,6 +35,8 @@ class CardHolder(pygame.sprite.Sprite, Generic[Alpha]):
         self.rect.center = center_pos
         self.cards = CardGroup[Alpha]()
         self.num_slots = num_slots
+        self.drawn_text = None
+        self.drawn_text_image = None
         self.set_text(text_side)
 
     def set_text(self, text_side: str) -> None:
@@ -48,7 +53,7 @@ class CardHolder(pygame.sprite.Sprite, Generic[Alpha]):
         elif text_side == "right":
             text_x = self.rect.right
         self.text_pos = (text_x, text_y)
-        self.font = pygame.font.Font("assets/balatro.ttf", 15)
+        self.font = get_font(15)
         text = f"{len(self.cards.sprites())}/{self.num_slots}"
         self.text_image = self.font.render(text, True, "white")
         if text_side == "center":  # middles text if text is in center
@@ -62,6 +67,22 @@ class CardHolder(pygame.sprite.Sprite, Generic[Alpha]):
         screen.blit(self.image, self.rect.topleft)
         screen.blit(self.text_image, self.text_pos)
 
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """
+        Gets the holder's rect the first call, then the card count text's
+        old and new rects whenever it changes. Cards report their own
+        """
+        if self.drawn_text is None:
+            self.drawn_text = self.text_image.get_rect(topleft=self.text_pos)
+            self.drawn_text_image = self.text_image
+            return [self.rect.copy(), self.drawn_text.copy()]
+        if self.text_image is self.drawn_text_image:
+            return []
+        old = self.drawn_text
+        self.drawn_text = self.text_image.get_rect(topleft=self.text_pos)
+        self.drawn_text_image = self.text_image
+        return [old, self.drawn_text.copy()]
+
     def add_card(self, card: Alpha) -> None:
         """
         Adds card to card holder
@@ -82,10 +103,8 @@ class CardHolder(pygame.sprite.Sprite, Generic[Alpha]):
 
     def update(self, dt: float, ctx: int | None = None) -> None:
         """
-        Updates cards and card count text
+        Updates card count text. Cards are moved by the animator
         """
-        for card in self.cards.sprites():
-            card.update(dt)
         count = 0
         for card in self.cards.sprites():
             if self.rect.collidepoint(card.target_pos):
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from typing import Any
+
+import pygame
+
+FONT_PATH = "assets/balatro.ttf"
+TEXT_CACHE_SIZE = 256  # Rendered surfaces kept per font
+
+
+class CachedFont(pygame.font.Font):
+    """
+    Font that keeps its most recently rendered text surfaces, so text that
+    is redrawn every frame is only rasterized once. Surfaces are shared
+    between callers, so never draw on one returned by render
+    """
+
+    rasterized: int = 0  # Surfaces rendered by every CachedFont, cached or not
+
+    path: str
+    point_size: int
+    _rendered: OrderedDict[tuple[Any, Any, bool], pygame.surface.Surface]
+
+    def __init__(self, path: str, size: int):
+        super().__init__(path, size)
+        self.path = path
+        self.point_size = size
+        self._rendered = OrderedDict()
+
+    def render(
+        self, text, antialias, color, background=None
+    ) -> pygame.surface.Surface:
+        if background is not None:
+            CachedFont.rasterized += 1
+            return super().render(text, antialias, color, background)
+        if isinstance(color, pygame.Color):
+            color = tuple(color)  # pygame.Color isn't hashable
+        key = (text, color, bool(antialias))
+        surface = self._rendered.get(key)
+        if surface is None:
+            CachedFont.rasterized += 1
+            surface = super().render(text, antialias, color)
+            self._rendered[key] = surface
+            if len(self._rendered) > TEXT_CACHE_SIZE:
+                self._rendered.popitem(last=False)
+        else:
+            self._rendered.move_to_end(key)
+        return surface
+
+
+_fonts: dict[tuple[str, int], CachedFont] = {}
+
+
+def get_font(size: int, path: str = FONT_PATH) -> CachedFont:
+    """
+    Gets the shared font for a file and point size, loading it the first time
+    it's asked for. pygame.font must be initialized first
+    """
+    font = _fonts.get((path, size))
+    if font is None:
+        font = _fonts[(path, size)] = CachedFont(path, size)
+    return font
@@ -0,0 +1,125 @@
+from typing import Hashable, Protocol
+
+import pygame
+
+# Finds what's under the mouse without scanning every card and button. Every
+# element is kept in each grid cell its rect touches, so a point only checks
+# the few elements in its own cell. Elements sit on layers, and within a layer
+# later elements are on top, like sprite group draw order
+
+CELL_SIZE = 64  # Pixels per side of a grid cell
+
+
+class Pickable(Hashable, Protocol):
+    rect: pygame.Rect
+
+
+class PickIndex:
+    """
+    Uniform grid of interactive elements, answering which one is on top at a
+    point. Elements that move have to be moved in the index too
+    """
+
+    cells: dict[tuple[int, int], set[Pickable]]
+    placed: dict[Pickable, tuple[tuple[int, int, int, int], list[tuple[int, int]]]]
+    z: dict[Pickable, tuple[int, int]]  # Layer, then order in the layer
+    layers: dict[int, set[Pickable]]
+    layer_versions: dict[int, object]  # Version of the group each layer came from
+
+    def __init__(self):
+        self.cells = {}
+        self.placed = {}
+        self.z = {}
+        self.layers = {}
+        self.layer_versions = {}
+
+    def __len__(self) -> int:
+        return len(self.z)
+
+    def place(self, element: Pickable, layer: int, order: int = 0) -> None:
+        """
+        Adds element to the index, or moves it to another layer or order
+
+        Args:
+            element (Pickable): anything with a rect
+            layer (int): higher layers are on top
+            order (int, optional): higher orders are on top within the
+                layer. Defaults to 0
+        """
+        old = self.z.get(element)
+        if old is not None and old[0] != layer:
+            self.layers[old[0]].discard(element)
+        self.z[element] = (layer, order)
+        self.layers.setdefault(layer, set()).add(element)
+        self.move(element)
+
+    def move(self, element: Pickable) -> None:
+        """Puts element in the cells under its rect. Ignored if not placed"""
+        if element not in self.z:
+            return
+        rect = element.rect
+        key = (rect.x, rect.y, rect.w, rect.h)
+        old = self.placed.get(element)
+        if old is not None:
+            if old[0] == key:
+                return
+            for cell in old[1]:
+                self.cells[cell].discard(element)
+        cells = [
+            (col, row)
+            for col in range(rect.left // CELL_SIZE, (rect.right - 1) // CELL_SIZE + 1)
+            for row in range(rect.top // CELL_SIZE, (rect.bottom - 1) // CELL_SIZE + 1)
+        ]
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(element)
+        self.placed[element] = (key, cells)
+
+    def remove(self, element: Pickable) -> None:
+        z = self.z.pop(element, None)
+        if z is None:
+            return
+        self.layers[z[0]].discard(element)
+        _, cells = self.placed.pop(element)
+        for cell in cells:
+            self.cells[cell].discard(element)
+
+    def sync_layer(
+        self, layer: int, elements: list[Pickable], version: object = None
+    ) -> None:
+        """
+        Makes a layer hold exactly elements, ordered bottom to top. Skipped
+        if version is given and the same as the last sync's
+
+        Args:
+            layer (int): layer to fill
+            elements (list[Pickable]): the layer's elements in draw order
+            version (object, optional): changes whenever elements do, like
+                CardGroup.version. Defaults to None, always syncing
+        """
+        if version is not None and self.layer_versions.get(layer) == version:
+            return
+        self.layer_versions[layer] = version
+        kept = set(elements)
+        for element in list(self.layers.get(layer, ())):
+            if element not in kept:
+                self.remove(element)
+        for order, element in enumerate(elements):
+            self.place(element, layer, order)
+
+    def pick(self, pos: tuple[int, int]) -> Pickable | None:
+        """
+        Gets the topmost element whose rect holds pos
+
+        Returns (Pickable | None): the element, None if there's nothing there
+        """
+        candidates = self.cells.get((pos[0] // CELL_SIZE, pos[1] // CELL_SIZE))
+        if not candidates:
+            return None
+        top = None
+        top_z = None
+        for element in candidates:
+            if element.rect.collidepoint(pos):
+                z = self.z[element]
+                if top_z is None or z > top_z:
+                    top, top_z = element, z
+        return top
@@ -1,11 +1,13 @@
-import time
 import pygame
+from states.gui_elements.animation import animator
 from states.gui_elements.card import Card, Joker, CARD_WID, CARD_HEI
+from states.gui_elements.fonts import get_font
 from states.gui_elements.side_panel import SidePanel
 from utils import get_play_anim_start_x
-from enums import AbilCategory
 
 ANIMATION_START_DELAY = 0.7
+CARD_REVEAL_INTERVAL = 0.5
+COMPLETION_DELAY = 1.0
 
 
 class ScoreAnimation:
@@ -15,11 +17,10 @@ class ScoreAnimation:
     font: pygame.font.Font
     displayed_score: int
     current_card_index: int
-    start_delay_timer: float
-    card_display_timer: float
-    completion_delay_timer: float | None
+    timer: int | None  # Animator timer for the next step, if one is waiting
     playing: bool
-    joker_anim: bool | None
+    rect: pygame.Rect  # Band the card scores are drawn in
+    drawn: tuple[int, bool] | None
 
     def __init__(
         self,
@@ -37,9 +38,7 @@ class ScoreAnimation:
             card.chips for card in cards
         ]  # List of chips each card earned
         self.card_points_images = []
-        self.font = pygame.font.Font(
-            "assets/balatro.ttf", 20
-        )  # Font for rendering text
+        self.font = get_font(20)  # Font for rendering text
         for i in range(len(self.card_points)):
             text_surface = self.font.render(
                 f"+{self.card_points[i]}", True, pygame.Color("dodgerblue2")
@@ -48,53 +47,52 @@ class ScoreAnimation:
         self.initial_score = current  # Score before any calculations
         self.displayed_score = current  # Score shown on screen
         self.current_card_index = 0  # Track which card's points are being revealed
-        self.start_delay_timer = time.time()  # Timer for pre animation delay
-        self.card_display_timer = time.time()  # Time tracker for card animation
-        self.completion_delay_timer = None  # Timer for post animation delay
         self.playing = True  # Is animation running?
-        self.joker_anim = None
+        screen_w, screen_h = side_panel.screen.get_size()
+        self.rect = pygame.Rect(
+            (0, screen_h // 2 - CARD_HEI), (screen_w, self.font.get_height())
+        )
+        self.drawn = None
+        self.timer = animator.after(ANIMATION_START_DELAY, self.reveal_card)
+
+    def reveal_card(self) -> None:
+        """Reveals the next card's score, then waits to reveal the one after"""
+        self.current_card_index += 1
+        self.chips += self.card_points[self.current_card_index - 1]
+        if self.current_card_index < len(self.card_points):
+            self.timer = animator.after(CARD_REVEAL_INTERVAL, self.reveal_card)
+        else:
+            self.timer = None
+            # Animate Jokers that triggered, once all cards score
+            self.animate_jokers([joker for joker in self.jokers if joker.jokerdata.scored])
+
+    def animate_jokers(self, jokers: list[Joker]) -> None:
+        """Animates each joker in turn, starting the next as one lands"""
+        if jokers:
+            jokers[0].score_anim(lambda: self.animate_jokers(jokers[1:]))
+
+    def finish(self) -> None:
+        self.timer = None
+        self.playing = False
 
     def update(self, dt: float):
         """Update the animation frame by frame."""
         if not self.playing:
             return
-        if time.time() - self.start_delay_timer >= ANIMATION_START_DELAY:
-            self.start_delay_timer = ANIMATION_START_DELAY
-
-            if (
-                self.current_card_index == len(self.card_points)
-                and self.displayed_score < self.final_score
-            ):
+        if self.current_card_index == len(self.card_points):
+            if self.displayed_score < self.final_score:
                 self.side_panel.set_played_score(self.final_score - self.initial_score)
                 difference = self.final_score - self.displayed_score
                 increment = max(1, difference // 20)
                 self.displayed_score = min(
                     self.final_score, self.displayed_score + increment
                 )
+            elif self.timer is None:
+                # Stop animation a moment after displayed score reaches final score
+                self.timer = animator.after(COMPLETION_DELAY, self.finish)
 
-            # Reveal next card’s score every 0.5s
-            if self.current_card_index < len(self.card_points):
-                if time.time() - self.card_display_timer > 0.5:
-                    self.current_card_index += 1
-                    self.chips += self.card_points[self.current_card_index - 1]
-                    self.card_display_timer = time.time()
-
-            # Animate Jokers that activate after all cards score
-            if self.current_card_index == len(self.card_points):
-                indies = [joker for joker in self.jokers if AbilCategory.INDIE in joker.jokerdata.ability_category]
-                for joker in indies:
-                    if joker.jokerdata.scored:
-                        if self.joker_anim is None or self.joker_anim == True:
-                            self.joker_anim = joker.score_anim()
-
-            # Stop animation when displayed score reaches final score
-            if (self.displayed_score >= self.final_score
-                and self.current_card_index == len(self.card_points)
-                and not self.completion_delay_timer):
-                self.completion_delay_timer = time.time()
-            if (self.completion_delay_timer
-                and time.time() - self.completion_delay_timer > 1):
-                self.playing = False
+        # Show the dynamically updating score
+        self.side_panel.update_score(self.displayed_score, self.chips, self.mult)
 
     def draw(self, screen: pygame.surface.Surface):
         """Draw the animation elements."""
@@ -108,8 +106,16 @@ class ScoreAnimation:
             screen.blit(text_surface, (x_offset, screen.get_size()[1] // 2 - CARD_HEI))
             x_offset += CARD_WID + 30  # Space out the numbers
 
-        # Draw the dynamically updating score
-        self.side_panel.update_score(self.displayed_score, self.chips, self.mult)
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """
+        Gets the card scores' band if a score was revealed or the animation
+        ended since the last call
+        """
+        shown = (self.current_card_index, self.playing)
+        if shown == self.drawn:
+            return []
+        self.drawn = shown
+        return [self.rect.copy()]
 
     def is_done(self):
         """Check if the animation has finished."""
@@ -2,6 +2,7 @@ import pygame
 from typing import Callable
 from assets.balatro_cards_data import CARD_HEI, CARD_WID
 from states.gui_elements.button import Button
+from states.gui_elements.fonts import get_font
 from state_logic.blind_logic import BlindLogic
 from state_logic.game_manager import GameManagerLogic
 from enums import HandType
@@ -18,6 +19,12 @@ class SidePanel:
     buttons: pygame.sprite.OrderedUpdates
     _blind_logic: BlindLogic | None
     manager: GameManagerLogic
+    surface: pygame.surface.Surface | None  # Panel as last drawn, made on first draw
+    shown: list[tuple | None]  # What each part of surface shows, by section
+    areas: list[list[pygame.Rect]]  # Where each part was drawn, by section
+    num_hands: int
+    num_discards: int
+    score: int
 
     def __init__(
         self,
@@ -27,9 +34,9 @@ class SidePanel:
     ):
         self.screen = screen
         self.manager = manager
-        self.font10 = pygame.font.Font("assets/balatro.ttf", 10)
-        self.font15 = pygame.font.Font("assets/balatro.ttf", 15)
-        self.font24 = pygame.font.Font("assets/balatro.ttf", 24)
+        self.font10 = get_font(10)
+        self.font15 = get_font(15)
+        self.font24 = get_font(24)
         self.pause_func = pause_func
         screen_w, screen_h = screen.get_size()
         self.rect = pygame.Rect((screen_w // 15, 0), (screen_w // 6, screen_h))
@@ -43,6 +50,11 @@ class SidePanel:
         self.O = self.font24.render("0", True, pygame.Color("white"))
         self._blind_logic = None
         self.played_score = None
+        self.surface = None
+        self.shown = []
+        self.areas = []
+        # Set here too, since the panel can be drawn before its first update
+        self.num_hands, self.num_discards, self.score = 4, 4, 0
         self._create_buttons()
 
     def pause(self) -> None:
@@ -71,12 +83,17 @@ class SidePanel:
         text: str | None = None,
         txt_color: str = "white",
         has_small_box: bool = True,
-    ) -> None:
+    ) -> pygame.Rect:
+        """
+        Draws a box with num in it and text over it
+
+        Returns (pygame.Rect): area drawn over
+        """
         num_image = self.font24.render(num, True, pygame.Color(color))
         box = self.box_temp.copy()
         box.w, box.h = int(box.w * scale[0]), int(box.h * scale[1])
         box.center = pos
-        pygame.draw.rect(screen, pygame.Color("grey10"), box, border_radius=5)
+        area = pygame.draw.rect(screen, pygame.Color("grey10"), box, border_radius=5)
         if text:
             text_color = pygame.Color(txt_color)
             text_image = self.font10.render(text, True, text_color)
@@ -84,7 +101,9 @@ class SidePanel:
             if has_small_box:
                 small_box = box.scale_by(0.85, 0.65)
                 small_box.center = box.centerx, box.centery + text_size_y - 5
-            screen.blit(text_image, (box.centerx - text_size_x // 2, box.y))
+            area.union_ip(
+                screen.blit(text_image, (box.centerx - text_size_x // 2, box.y))
+            )
         else:
             if has_small_box:
                 small_box = box.scale_by(0.9, 0.85)
@@ -97,116 +116,222 @@ class SidePanel:
         num_x, num_y = num_image.get_size()
         x -= num_x // 2
         y -= num_y // 2
-        screen.blit(num_image, (x, y))
+        return area.union(screen.blit(num_image, (x, y)))
 
-    def draw(self, screen: pygame.surface.Surface) -> None:
-        pygame.draw.rect(screen, pygame.Color("grey20"), self.rect)
-        self.draw_box(
-            screen,
-            (self.rect.centerx, 430),
-            "",
-            "white",
-            scale=(3.3, 1),
-            has_small_box=False,
-        )
-        self.draw_box(
-            screen,
-            (self.rect.centerx, 385),
-            f"{self.hand_type.name}",
-            "white",
-            scale=(3.3, 1.5),
-            has_small_box=False,
-        )
-        pygame.draw.rect(
-            screen,
-            pygame.Color("dodgerblue2"),
-            pygame.Rect((self.rect.left + 10, 405), (self.rect.width // 2.5, 40)),
-            border_radius=5,
-        )
-        pygame.draw.rect(
-            screen,
-            pygame.Color("crimson"),
-            pygame.Rect(
-                (self.rect.right - self.rect.width // 2.5 - 10, 405),
-                (self.rect.width // 2.5, 40),
-            ),
-            border_radius=5,
-        )
-        screen.blit(self.X, (184, 410))
-        if self.chips and self.mult:
-            screen.blit(self.chips, (150, 410))
-            screen.blit(self.mult, (220, 410))
-        else:
-            screen.blit(self.O, (150, 410))
-            screen.blit(self.O, (220, 410))
-        if self.played_score:
+    def sections(self) -> list[tuple[tuple, Callable[[pygame.surface.Surface], list]]]:
+        """
+        Gets each part of the panel as what it shows and what draws it. A part
+        is only redrawn when what it shows changes, and parts don't overlap
+
+        Returns (list[tuple[tuple, Callable]]): values shown and a function
+            drawing them that returns the rects it drew over, per part
+        """
+        blind = self._blind_logic.blind if self._blind_logic else 0
+        manager = self.manager
+        # Rendered surfaces are compared by identity, and fonts reuse them
+        return [
+            ((blind,), self._draw_blind),
+            ((self.score,), self._draw_score),
+            ((self.hand_type, self.chips, self.mult, self.played_score), self._draw_hand),
+            ((self.num_hands,), self._draw_hands),
+            ((self.num_discards,), self._draw_discards),
+            ((manager.money,), self._draw_money),
+            ((manager.ante,), self._draw_ante),
+            ((manager.round,), self._draw_round),
+        ]
+
+    def _draw_blind(self, screen: pygame.surface.Surface) -> list[pygame.Rect]:
+        blind = self._blind_logic.blind if self._blind_logic else 0
+        return [
+            self.draw_box(
+                screen,
+                (self.rect.centerx, 200),
+                f"{blind}",
+                "crimson",
+                text="Score At Least:",
+                txt_color="crimson",
+                scale=(3.1, 2),
+            )
+        ]
+
+    def _draw_score(self, screen: pygame.surface.Surface) -> list[pygame.Rect]:
+        return [
+            self.draw_box(
+                screen,
+                (self.rect.centerx, 300),
+                f"{self.score}",
+                "white",
+                text="Round Score",
+                scale=(3.1, 1),
+            )
+        ]
+
+    def _draw_hand(self, screen: pygame.surface.Surface) -> list[pygame.Rect]:
+        rects = [
             self.draw_box(
                 screen,
-                (self.rect.centerx, 380),
+                (self.rect.centerx, 430),
                 "",
                 "white",
                 scale=(3.3, 1),
                 has_small_box=False,
+            ),
+            self.draw_box(
+                screen,
+                (self.rect.centerx, 385),
+                f"{self.hand_type.name}",
+                "white",
+                scale=(3.3, 1.5),
+                has_small_box=False,
+            ),
+        ]
+        rects.append(
+            pygame.draw.rect(
+                screen,
+                pygame.Color("dodgerblue2"),
+                pygame.Rect((self.rect.left + 10, 405), (self.rect.width // 2.5, 40)),
+                border_radius=5,
             )
-            screen.blit(
-                self.played_score,
-                (self.rect.centerx - self.played_score.get_size()[0] // 2, 365),
-            )
-        self.draw_box(
-            screen,
-            (self.rect.right - 100, 500),
-            str(self.num_hands),
-            "dodgerblue2",
-            text="Hands",
-        )
-        self.draw_box(
-            screen,
-            (self.rect.right - 35, 500),
-            str(self.num_discards),
-            "crimson",
-            text="Discards",
-        )
-        blind = self._blind_logic.blind if self._blind_logic else 0
-        self.draw_box(
-            screen,
-            (self.rect.centerx, 200),
-            f"{blind}",
-            "crimson",
-            text="Score At Least:",
-            txt_color="crimson",
-            scale=(3.1, 2),
-        )
-        self.draw_box(
-            screen,
-            (self.rect.centerx, 300),
-            f"{self.score}",
-            "white",
-            text="Round Score",
-            scale=(3.1, 1),
         )
-        self.draw_box(
-            screen,
-            (self.rect.right - 67, 560),
-            f"${self.manager.money}",
-            "goldenrod3",
-            scale=(2.1, 1),
-        )
-        self.draw_box(
-            screen,
-            (self.rect.right - 100, 620),
-            f"{self.manager.ante}/8",
-            "goldenrod3",
-            text="Ante",
-        )
-        self.draw_box(
-            screen,
-            (self.rect.right - 35, 620),
-            str(self.manager.round),
-            "goldenrod3",
-            text="Round",
+        rects.append(
+            pygame.draw.rect(
+                screen,
+                pygame.Color("crimson"),
+                pygame.Rect(
+                    (self.rect.right - self.rect.width // 2.5 - 10, 405),
+                    (self.rect.width // 2.5, 40),
+                ),
+                border_radius=5,
+            )
         )
+        rects.append(screen.blit(self.X, (184, 410)))
+        if self.chips and self.mult:
+            rects.append(screen.blit(self.chips, (150, 410)))
+            rects.append(screen.blit(self.mult, (220, 410)))
+        else:
+            rects.append(screen.blit(self.O, (150, 410)))
+            rects.append(screen.blit(self.O, (220, 410)))
+        if self.played_score:
+            rects.append(
+                self.draw_box(
+                    screen,
+                    (self.rect.centerx, 380),
+                    "",
+                    "white",
+                    scale=(3.3, 1),
+                    has_small_box=False,
+                )
+            )
+            rects.append(
+                screen.blit(
+                    self.played_score,
+                    (self.rect.centerx - self.played_score.get_size()[0] // 2, 365),
+                )
+            )
+        return rects
+
+    def _draw_hands(self, screen: pygame.surface.Surface) -> list[pygame.Rect]:
+        return [
+            self.draw_box(
+                screen,
+                (self.rect.right - 100, 500),
+                str(self.num_hands),
+                "dodgerblue2",
+                text="Hands",
+            )
+        ]
+
+    def _draw_discards(self, screen: pygame.surface.Surface) -> list[pygame.Rect]:
+        return [
+            self.draw_box(
+                screen,
+                (self.rect.right - 35, 500),
+                str(self.num_discards),
+                "crimson",
+                text="Discards",
+            )
+        ]
+
+    def _draw_money(self, screen: pygame.surface.Surface) -> list[pygame.Rect]:
+        return [
+            self.draw_box(
+                screen,
+                (self.rect.right - 67, 560),
+                f"${self.manager.money}",
+                "goldenrod3",
+                scale=(2.1, 1),
+            )
+        ]
+
+    def _draw_ante(self, screen: pygame.surface.Surface) -> list[pygame.Rect]:
+        return [
+            self.draw_box(
+                screen,
+                (self.rect.right - 100, 620),
+                f"{self.manager.ante}/8",
+                "goldenrod3",
+                text="Ante",
+            )
+        ]
+
+    def _draw_round(self, screen: pygame.surface.Surface) -> list[pygame.Rect]:
+        return [
+            self.draw_box(
+                screen,
+                (self.rect.right - 35, 620),
+                str(self.manager.round),
+                "goldenrod3",
+                text="Round",
+            )
+        ]
+
+    def refresh(self) -> list[pygame.Rect]:
+        """
+        Redraws the parts of the cached panel whose values changed. A changed
+        part is cleared where it was last drawn before it's drawn again
+
+        Returns (list[pygame.Rect]): screen areas that changed, both where
+            changed parts were and where they are now
+        """
+        sections = self.sections()
+        if self.surface is None:
+            # Reaches from the screen's origin, so parts draw with screen
+            # coordinates. Only the panel's rect of it is ever shown
+            self.surface = pygame.Surface(self.rect.bottomright)
+            self.surface.fill(pygame.Color("grey20"), self.rect)
+            self.shown = [None] * len(sections)
+            self.areas = [[] for _ in sections]
+        changed = []
+        for idx, (shown, draw) in enumerate(sections):
+            if shown == self.shown[idx]:
+                continue
+            for area in self.areas[idx]:
+                self.surface.fill(pygame.Color("grey20"), area)
+            changed += self.areas[idx]
+            self.shown[idx] = shown
+            self.areas[idx] = [area.clip(self.rect) for area in draw(self.surface)]
+            changed += self.areas[idx]
+        return changed
+
+    def draw(self, screen: pygame.surface.Surface) -> None:
+        self.refresh()
+        assert self.surface is not None
+        screen.blit(self.surface, self.rect, self.rect)
         self.buttons.draw(screen)
 
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """
+        Gets the parts of the panel that changed since the last call
+        """
+        rects = []
+        for button in self.buttons.sprites():
+            if isinstance(button, Button):
+                rects += button.dirty_rects()
+        if self.surface is None:
+            self.refresh()
+            return rects + [self.rect.copy()]
+        return rects + self.refresh()
+
     def set_blind_logic(self, blind_logic: BlindLogic) -> None:
         """
         Sets the blind logic attribute in order to render the stats and info
@@ -241,10 +366,10 @@ class SidePanel:
         self.num_hands = 4
         self.num_discards = 4
 
-    def update(self, dt: float) -> None:
+    def update(self, dt: float, mouse_pos: tuple[int, int] | None = None) -> None:
         for button in self.buttons:
             if isinstance(button, Button):
-                button.update(dt)
+                button.update(dt, mouse_pos)
         if self._blind_logic:
             self.num_hands = self._blind_logic.num_hands
             self.num_discards = self._blind_logic.num_discards
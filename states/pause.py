@@ -17,7 +17,9 @@ class Pause(StateBase):
             (0, 0, wid, hei),
         )
         self.shadow = shadow
-        self.game.prev_state.draw(self.game.screen)
+        # Drawn once, so cards are blitted under the shadow even with GL
+        with self.game.backend.software():
+            self.game.prev_state.draw(self.game.screen)
         self.game.screen.blit(self.shadow, (0, 0))
 
     def handle_event(self, event: pygame.event.Event) -> None:
@@ -33,5 +35,8 @@ class Pause(StateBase):
     def update(self, dt) -> None:
         pass
 
+    def dirty_rects(self) -> list[pygame.Rect]:
+        return []  # Screen is drawn once, when paused
+
     def draw(self, screen: pygame.surface.Surface) -> None:
-        pygame.display.flip()
+        pass
@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Any
 import pygame
 
+from states.gui_elements.fonts import get_font
+
 if TYPE_CHECKING:
     from game import Game  # Import only for type checking
 
@@ -12,12 +14,11 @@ class StateBase(ABC):
 
     def __init__(self, game: "Game"):
         self.game = game
-        self.font10 = pygame.font.Font("assets/balatro.ttf", 10)
-        self.font15 = pygame.font.Font("assets/balatro.ttf", 15)
-        self.font24 = pygame.font.Font("assets/balatro.ttf", 24)
-        self.font200 = pygame.font.Font("assets/balatro.ttf", 200)
-        # TODO: figure out if there is a better method of resizing fonts
-        # if so, implement that wherever needed like self.draw_text()
+        # Shared between every state, so entering one doesn't reload fonts
+        self.font10 = get_font(10)
+        self.font15 = get_font(15)
+        self.font24 = get_font(24)
+        self.font200 = get_font(200)
         self.ctx = {}
         self.enter_state()
 
@@ -42,6 +43,23 @@ class StateBase(ABC):
         """
         raise NotImplementedError
 
+    def busy(self) -> bool:
+        """
+        True if the state is showing something that changes every step
+        without the animator, so Game keeps drawing frames at its full rate
+        """
+        return False
+
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """
+        Gets the areas of the screen that changed since the last call, for
+        dirty rect rendering. States that don't track their changes redraw
+        the whole screen every frame
+
+        Returns (list[pygame.Rect]): changed areas, empty if nothing changed
+        """
+        return [self.game.screen.get_rect()]
+
     def draw_text(
         self,
         text: str,
@@ -18,7 +18,7 @@ class Title(StateBase):
         self.rect = pygame.Rect(0, 0, 800, 400)
         self.rect.center = self.screen_center
         self.ctx = {
-            "manager": GameManagerLogic()
+            "manager": GameManagerLogic(game.rng)
         }  ###TODO: this means everytime the title screen is created, a new "Profile" is made
 
     def handle_event(self, event: pygame.event.Event) -> None:
@@ -34,8 +34,10 @@ class Title(StateBase):
     def update(self, dt) -> None:
         pass
 
+    def dirty_rects(self) -> list[pygame.Rect]:
+        return []  # Title never changes after its first frame
+
     def draw(self, screen: pygame.surface.Surface) -> None:
         screen.fill("darkgreen")
         pygame.draw.rect(screen, "red", self.rect)
         screen.blit(self.title, self.title.get_rect(center=self.screen_center))
-        pygame.display.flip()